@@ -8,7 +8,8 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flasgger import Swagger
 from api.config import Config
-from api.routes import api_bp
+from api.json_provider import FragmentJSONProvider
+from api.routes import api_bp, book_repository
 from api.auth.routes import auth_bp
 from api.scraping_routes import scraping_bp
 from api.swagger_config import swagger_config, swagger_template
@@ -21,6 +22,9 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Compact JSON assembled from the books' pre-encoded fragments
+    app.json = FragmentJSONProvider(app)
+    
     # Enable CORS
     CORS(app)
     
@@ -52,6 +56,13 @@ def create_app(config_class=Config):
             'message': 'Request does not contain an access token'
         }), 401
     
+    # Watch the books data file in the background so requests never stat() it
+    if app.config.get('DATA_WATCH_ENABLED', True):
+        book_repository.start_watching(
+            poll_interval=app.config.get('DATA_WATCH_INTERVAL', 2.0),
+            backend=app.config.get('DATA_WATCH_BACKEND', 'auto')
+        )
+    
     # Register blueprints
     app.register_blueprint(api_bp, url_prefix='/api/v1')
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
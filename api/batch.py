@@ -0,0 +1,143 @@
+"""
+Batch - Several read requests answered in one HTTP round trip
+
+A batch names read endpoints of the API by path (e.g. `/stats`,
+`/books?limit=100`). They are dispatched in-process, inside one
+consistent view of the repository, so every sub-response is computed from
+the same loaded data even if a reload happens meanwhile. Authentication,
+validators and compression apply to the batch request as a whole; the
+sub-requests call the views directly and their JSON bodies are embedded
+without being decoded.
+"""
+import inspect
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode
+from flask import current_app, request
+from werkzeug.exceptions import HTTPException
+from api.json_provider import RawJSON
+from api.repositories.base_repository import BaseBookRepository
+
+# Endpoints a batch may call: GET reads returning JSON (exports stream and are excluded)
+BATCH_ENDPOINTS = frozenset({
+    'api.get_books',
+    'api.get_book',
+    'api.search_books',
+    'api.get_stats',
+    'api.get_categories',
+    'api.get_category_books'
+})
+
+# Scalar types accepted as query parameter values
+_PARAM_TYPES = (str, int, float, bool)
+
+
+def parse_batch(payload: Any, max_requests: int) -> List[Dict[str, Any]]:
+    """
+    Validate a batch body
+    
+    Args:
+        payload: Decoded JSON body, {"requests": [{"id": ..., "path": ..., "params": {...}}]}
+        max_requests: Maximum number of sub-requests
+    
+    Returns:
+        Sub-requests as dicts with 'id', 'path' and 'query' (list of pairs);
+        a missing id defaults to the position in the batch
+    
+    Raises:
+        ValueError: If the body is not a valid batch
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('requests'), list):
+        raise ValueError("Invalid body: expected a JSON object with a 'requests' list")
+    
+    items = payload['requests']
+    if not items:
+        raise ValueError("requests must not be empty")
+    if len(items) > max_requests:
+        raise ValueError(f"Too many requests: {len(items)}. Maximum is {max_requests}")
+    
+    sub_requests = []
+    for index, item in enumerate(items):
+        invalid = f"Invalid request at position {index}"
+        path = item.get('path') if isinstance(item, dict) else None
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise ValueError(f"{invalid}: 'path' must be an absolute path")
+        
+        sub_id = item.get('id', index)
+        if isinstance(sub_id, bool) or not isinstance(sub_id, (str, int)):
+            raise ValueError(f"{invalid}: 'id' must be a string or integer")
+        
+        params = item.get('params') or {}
+        if not isinstance(params, dict):
+            raise ValueError(f"{invalid}: 'params' must be an object")
+        
+        path, _, query = item['path'].partition('?')
+        pairs = parse_qsl(query, keep_blank_values=True)
+        for name, value in params.items():
+            values = value if isinstance(value, list) else [value]
+            if not all(isinstance(v, _PARAM_TYPES) for v in values):
+                raise ValueError(f"{invalid}: parameter '{name}' must be a scalar")
+            pairs.extend((name, str(v).lower() if isinstance(v, bool) else str(v)) for v in values)
+        
+        sub_requests.append({'id': sub_id, 'path': path, 'query': pairs})
+    return sub_requests
+
+
+def run_batch(
+    repository: BaseBookRepository,
+    sub_requests: List[Dict[str, Any]],
+    prefix: str
+) -> Dict[str, Any]:
+    """
+    Run sub-requests against one consistent view of the repository
+    
+    Args:
+        repository: Repository the endpoints read from
+        sub_requests: Output of parse_batch
+        prefix: URL prefix of the API (paths may omit it)
+    
+    Returns:
+        Dictionary with the data 'version' and the 'responses' in request
+        order, each with 'id', 'status' and 'body' (embedded as is)
+    """
+    adapter = current_app.create_url_adapter(request)
+    
+    with repository.consistent_view():
+        responses = []
+        for sub_request in sub_requests:
+            path = sub_request['path']
+            if not path.startswith(f"{prefix}/"):
+                path = f"{prefix}{path}"
+            status, body = _run_sub_request(adapter, path, sub_request['query'])
+            responses.append({'id': sub_request['id'], 'status': status, 'body': body})
+        
+        return {'version': repository.version, 'responses': responses}
+
+
+def _run_sub_request(adapter, path: str, query: List[Tuple[str, str]]) -> Tuple[int, Any]:
+    """
+    Dispatch one sub-request to its view (private function)
+    
+    Args:
+        adapter: URL adapter bound to the batch request
+        path: Full path of the endpoint
+        query: Query parameters as (name, value) pairs
+    
+    Returns:
+        Tuple (status code, RawJSON body or error dict)
+    """
+    try:
+        endpoint, view_args = adapter.match(path, method='GET')
+    except HTTPException as e:
+        return e.code, {'error': e.name, 'message': f"{path}: {e.description}"}
+    
+    if endpoint not in BATCH_ENDPOINTS:
+        return 400, {'error': 'Bad Request', 'message': f"{path} cannot be used in a batch"}
+    
+    # Authentication, validators and compression belong to the batch request
+    view = inspect.unwrap(current_app.view_functions[endpoint])
+    with current_app.test_request_context(path, method='GET', query_string=urlencode(query)):
+        try:
+            response = current_app.make_response(view(**view_args))
+        except HTTPException as e:
+            return e.code, {'error': e.name, 'message': e.description}
+        return response.status_code, RawJSON(response.get_data())
@@ -15,8 +15,33 @@ class Config:
     PORT = int(os.environ.get('API_PORT', 5000))
     DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     
+    # Data file watcher (detects new scrapes without per-request stat() calls)
+    DATA_WATCH_ENABLED = os.environ.get('DATA_WATCH_ENABLED', 'True').lower() == 'true'
+    DATA_WATCH_BACKEND = os.environ.get('DATA_WATCH_BACKEND', 'auto')  # auto, inotify or poll
+    # Polling interval (seconds)
+    DATA_WATCH_INTERVAL = float(os.environ.get('DATA_WATCH_INTERVAL', 2.0))
+    
+    # Controller result cache (entries are dropped whenever the data version changes)
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))  # 0 disables the cache
+    RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 300))  # Seconds, 0: until reload
+    
+    # HTTP caching of read endpoints (ETag/Last-Modified follow the loaded data)
+    # Clients always revalidate
+    HTTP_CACHE_CONTROL = os.environ.get('HTTP_CACHE_CONTROL', 'private, no-cache')
+    
+    # gzip for clients sending Accept-Encoding (bodies compressed once per data version)
+    GZIP_ENABLED = os.environ.get('GZIP_ENABLED', 'True').lower() == 'true'
+    GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))  # 1 (fastest) to 9 (smallest)
+    GZIP_MIN_SIZE = int(os.environ.get('GZIP_MIN_SIZE', 500))  # Bytes; smaller ones sent as is
+    COMPRESSED_CACHE_SIZE = int(os.environ.get('COMPRESSED_CACHE_SIZE', 128))  # Cached gzip bodies
+    
+    # POST /api/v1/batch (read sub-requests served from one consistent view of the data)
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+    
     # Database
     DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///bookstore.db')
+    # json (in-memory) or sqlite (DATABASE_URL)
+    BOOK_REPOSITORY = os.environ.get('BOOK_REPOSITORY', 'json')
     
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
@@ -26,9 +51,9 @@ class Config:
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
     
-    # API Settings
+    # API Settings (JSON output: see api/json_provider.py)
     JSON_SORT_KEYS = False
-    JSONIFY_PRETTYPRINT_REGULAR = True
+    JSONIFY_PRETTYPRINT_REGULAR = False  # Compact responses; ?pretty=1 for humans
 
 
 class DevelopmentConfig(Config):
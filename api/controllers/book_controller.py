@@ -3,13 +3,18 @@ Book Controller - Business logic for book operations
 
 Follows SOLID principles:
 - SRP: Responsible ONLY for business logic
-- DIP: Depends on BookRepository abstraction, not concrete data source
+- DIP: Depends on BaseBookRepository abstraction, not concrete data source
 - OCP: Extensible without modification
 
 Read-Only API: No create/update/delete methods (handled by scraping only)
 """
-from typing import Dict, Any, List
-from api.repositories.book_repository import BookRepository
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from api.repositories.base_repository import BaseBookRepository
+from api.repositories.book_query import BookQuery
+from api.repositories.encoded_book import FieldProjection
+from api.controllers.book_export import EXPORT_FORMATS, export_csv, export_ndjson
+from api.controllers.cursor import decode_cursor, encode_cursor, query_fingerprint
+from api.controllers.result_cache import ResultCache
 
 
 class BookController:
@@ -21,33 +26,118 @@ class BookController:
     - Search and filtering
     - Statistics calculation
     - Data transformation for API responses
+    - Caching results per loaded-data version
     """
     
-    def __init__(self, repository: BookRepository):
+    # Maximum number of ids resolved by one get_books_by_ids call
+    MAX_BATCH_IDS = 500
+    
+    def __init__(self, repository: BaseBookRepository, cache: Optional[ResultCache] = None):
         """
         Initialize controller with repository (Dependency Injection)
         
         Args:
-            repository: BookRepository instance for data access
+            repository: Book repository (in-memory JSON or SQLite) for data access
+            cache: Result cache (defaults to a 256-entry, 5-minute LRU cache)
         """
         self.repository = repository
+        self.cache = cache if cache is not None else ResultCache()
+    
+    def _cached(self, key: tuple, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Serve a result from the cache, keyed on the loaded-data version (private method)
+        
+        The version is read and the result computed inside one consistent
+        view, so a reload in between cannot cache new data under the old
+        version (or the reverse).
+        
+        Args:
+            key: Operation name followed by its normalized parameters
+            compute: Callable producing the result on a miss
+        
+        Returns:
+            Result dictionary (shared between callers: do not mutate)
+        """
+        with self.repository.consistent_view():
+            return self.cache.get_or_compute(self.repository.version, key, compute)
     
-    def get_all_books(self, page: int = 1, limit: int = 10, search: str = '') -> Dict[str, Any]:
+    def get_all_books(
+        self,
+        page: int = 1,
+        limit: int = 10,
+        search: str = '',
+        search_mode: str = 'substring',
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        rating_min: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        availability_min: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Get all books with pagination and search
         
+        Two pagination styles are supported:
+        - page/limit: returns total and total_pages (cost grows with page depth)
+        - cursor: pass an empty cursor for the first page, then the returned
+          next_cursor; each page resumes where the previous one stopped and
+          the cursor is rejected if the data was reloaded in between
+        
         Args:
-            page: Page number (1-indexed, must be >= 1)
+            page: Page number (1-indexed, must be >= 1; ignored with a cursor)
             limit: Books per page (must be > 0, max 100)
             search: Search term for title/author
+            search_mode: 'substring' (catalog order) or 'ranked' (full-text
+                search over title/author/description, most relevant first)
+            cursor: Keyset cursor ('' for the first page, None for page/limit)
+            sort: 'price', 'rating' or 'title', '-' prefix for descending
+                (default: catalog order, or relevance for ranked searches)
+            price_min: Minimum price (inclusive)
+            price_max: Maximum price (inclusive)
+            rating_min: Minimum rating (inclusive)
+            in_stock: Only books in stock (True) or out of stock (False)
+            availability_min: Minimum available copies (inclusive)
         
         Returns:
             Dictionary with paginated books and metadata
         
         Raises:
-            ValueError: If page < 1 or limit <= 0 or limit > 100
+            ValueError: If page < 1 or limit <= 0 or limit > 100, search_mode
+                or sort is unknown, a range filter is invalid, or the cursor is
+                invalid or expired
         """
         # Input validation (Fail Fast principle)
+        self._validate_page(page, limit)
+        
+        search = search or ''
+        filters = self._range_filters(price_min, price_max, rating_min, in_stock, availability_min)
+        if sort:
+            filters['sort'] = sort
+        
+        if cursor is not None:
+            return self._cached(
+                ('books_after', cursor, limit, search, search_mode, tuple(filters.items())),
+                lambda: self._get_books_after(cursor, limit, search, search_mode, filters)
+            )
+        
+        return self._cached(
+            ('books', page, limit, search, search_mode, tuple(filters.items())),
+            lambda: self._get_books_page(page, limit, search, search_mode, filters)
+        )
+    
+    @staticmethod
+    def _validate_page(page: int, limit: int) -> None:
+        """
+        Validate page/limit pagination parameters (private method)
+        
+        Args:
+            page: Page number (1-indexed)
+            limit: Books per page
+        
+        Raises:
+            ValueError: If page < 1 or limit <= 0 or limit > 100
+        """
         if page < 1:
             raise ValueError(f"Invalid page number: {page}. Page must be >= 1")
         
@@ -56,35 +146,131 @@ class BookController:
         
         if limit > 100:
             raise ValueError(f"Invalid limit: {limit}. Maximum limit is 100")
+    
+    @staticmethod
+    def _range_filters(
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        rating_min: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        availability_min: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate and normalize range filters (private method)
+        
+        Returns:
+            Filters that are set, as BookQuery keyword arguments (fixed order)
+        
+        Raises:
+            ValueError: If a bound is negative or price_min > price_max
+        """
+        filters = {
+            'price_min': price_min,
+            'price_max': price_max,
+            'rating_min': rating_min,
+            'in_stock': in_stock,
+            'availability_min': availability_min
+        }
+        filters = {name: value for name, value in filters.items() if value is not None}
         
-        all_books = self.repository.find_all()
-        filtered_books = all_books
+        for name in ('price_min', 'price_max', 'rating_min', 'availability_min'):
+            if filters.get(name, 0) < 0:
+                raise ValueError(f"Invalid {name}: {filters[name]}. Must be >= 0")
         
-        # Apply search filter
-        if search:
-            search_lower = search.lower()
-            filtered_books = [
-                book for book in all_books
-                if search_lower in book.get('title', '').lower() or 
-                   search_lower in book.get('author', '').lower()
-            ]
+        if price_min is not None and price_max is not None and price_min > price_max:
+            raise ValueError(
+                f"Invalid price range: price_min ({price_min}) > price_max ({price_max})"
+            )
         
+        return filters
+    
+    def _get_books_page(
+        self,
+        page: int,
+        limit: int,
+        search: str,
+        search_mode: str,
+        filters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Get one page/limit page of books (private method)
+        
+        Args:
+            page: Page number (validated)
+            limit: Books per page (validated)
+            search: Search term
+            search_mode: 'substring' or 'ranked'
+            filters: Range filters (see _range_filters) and sort
+        
+        Returns:
+            Dictionary with paginated books and metadata
+        """
         # Calculate pagination
         start = (page - 1) * limit
-        end = start + limit
-        paginated_books = filtered_books[start:end]
+        
+        # Filtering and pagination are pushed down to the repository
+        paginated_books, total = self.repository.find_page(
+            BookQuery(search=search, offset=start, limit=limit, search_mode=search_mode, **filters)
+        )
         
         # Calculate total pages safely (limit is guaranteed > 0 here)
-        total_pages = (len(filtered_books) + limit - 1) // limit if len(filtered_books) > 0 else 0
+        total_pages = (total + limit - 1) // limit if total > 0 else 0
         
         return {
             'books': paginated_books,
-            'total': len(filtered_books),
+            'total': total,
             'page': page,
             'limit': limit,
             'total_pages': total_pages
         }
     
+    def _get_books_after(
+        self,
+        cursor: str,
+        limit: int,
+        search: str,
+        search_mode: str,
+        filters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Get the page following a keyset cursor (private method)
+        
+        Args:
+            cursor: Cursor from the previous page ('' for the first page)
+            limit: Books per page
+            search: Search term
+            search_mode: 'substring' or 'ranked'
+            filters: Range filters (see _range_filters) and sort
+        
+        Returns:
+            Dictionary with books, limit and next_cursor (None on the last page)
+        
+        Raises:
+            ValueError: If the cursor is invalid or the data was reloaded since it was issued
+        """
+        fingerprint = query_fingerprint(search or '', search_mode, sorted(filters.items()))
+        version, after = decode_cursor(cursor, fingerprint) if cursor else (None, None)
+        
+        with self.repository.consistent_view():
+            # Check the version before find_next does any work
+            if version is not None and version != self.repository.version:
+                raise ValueError(
+                    "Cursor expired: the catalog was reloaded, restart from the first page"
+                )
+            
+            books, next_key, served_version = self.repository.find_next(BookQuery(
+                search=search, limit=limit, search_mode=search_mode, after=after, **filters
+            ))
+        
+        next_cursor = None
+        if next_key is not None:
+            next_cursor = encode_cursor(served_version, next_key, fingerprint)
+        return {
+            'books': books,
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
+    
     def get_book_by_id(self, book_id: str) -> Dict[str, Any]:
         """
         Get a specific book by ID (UUID4)
@@ -102,6 +288,41 @@ class BookController:
         
         return {'book': book}
     
+    def get_books_by_ids(self, book_ids: List[Any]) -> Dict[str, Any]:
+        """
+        Get several books by ID in one call
+        
+        Ids are resolved through the repository's primary-key index from one
+        consistent view of the data; duplicates are resolved once.
+        
+        Args:
+            book_ids: Book identifiers (strings or integers, at most MAX_BATCH_IDS)
+        
+        Returns:
+            Dictionary with found books (request order), missing ids and count
+        
+        Raises:
+            ValueError: If book_ids is not a non-empty list of ids or is too long
+        """
+        if not isinstance(book_ids, list) or not book_ids:
+            raise ValueError("Invalid ids: expected a non-empty list of book ids")
+        
+        if len(book_ids) > self.MAX_BATCH_IDS:
+            raise ValueError(f"Too many ids: {len(book_ids)}. Maximum is {self.MAX_BATCH_IDS}")
+        
+        for book_id in book_ids:
+            if isinstance(book_id, bool) or not isinstance(book_id, (str, int)):
+                raise ValueError(f"Invalid id: {book_id!r}. Ids must be strings or integers")
+        
+        unique_ids = list(dict.fromkeys(str(book_id) for book_id in book_ids))
+        books, missing = self.repository.find_by_ids(unique_ids)
+        
+        return {
+            'books': books,
+            'missing': missing,
+            'total': len(books)
+        }
+    
     def get_statistics(self) -> Dict[str, Any]:
         """
         Calculate statistics about the book collection
@@ -109,30 +330,57 @@ class BookController:
         Returns:
             Dictionary with statistics (total, average price, categories)
         """
-        books = self.repository.find_all()
+        return self._cached(('stats',), self._compute_statistics)
+    
+    def _compute_statistics(self) -> Dict[str, Any]:
+        """
+        Build the statistics response (private method)
         
-        if not books:
+        Returns:
+            Dictionary with statistics (total, average price, categories)
+        """
+        stats = self.repository.statistics()
+        
+        if not stats['total']:
             return {
                 'total_books': 0,
                 'average_price': 0,
-                'categories': {}
+                'categories': {},
+                'price': {},
+                'ratings': {}
             }
         
-        total = len(books)
-        avg_price = sum(book.get('price', 0) for book in books) / total
-        
-        # Count books per category
-        categories: Dict[str, int] = {}
-        for book in books:
-            category = book.get('category', 'General')
-            categories[category] = categories.get(category, 0) + 1
-        
+        # Aggregates are precomputed by the repository when the data is loaded
         return {
-            'total_books': total,
-            'average_price': round(avg_price, 2),
-            'categories': categories
+            'total_books': stats['total'],
+            'average_price': round(stats['average_price'], 2),
+            'categories': stats['category_counts'],
+            'price': {name: round(value, 2) for name, value in stats['price_stats'].items()},
+            'ratings': stats['rating_distribution']
         }
     
+    def get_encoded(self, operation: str, encode: Callable[[Dict[str, Any]], bytes]) -> bytes:
+        """
+        Encoded response of a parameterless read, encoded once per data version
+        
+        Args:
+            operation: 'stats' or 'categories'
+            encode: Serializer producing the response body
+        
+        Returns:
+            Encoded response body
+        
+        Raises:
+            ValueError: If the operation is unknown
+        """
+        operations = {'stats': self.get_statistics, 'categories': self.get_categories}
+        if operation not in operations:
+            raise ValueError(
+                f"Invalid operation: {operation}. Must be one of: {', '.join(operations)}"
+            )
+        
+        return self._cached((operation, 'encoded'), lambda: encode(operations[operation]()))
+    
     def get_categories(self) -> Dict[str, Any]:
         """
         Get all unique book categories with book counts
@@ -140,19 +388,24 @@ class BookController:
         Returns:
             Dictionary with category list and total count
         """
-        books = self.repository.find_all()
+        return self._cached(('categories',), self._compute_categories)
+    
+    def _compute_categories(self) -> Dict[str, Any]:
+        """
+        Build the categories response (private method)
+        
+        Returns:
+            Dictionary with category list and total count
+        """
+        stats = self.repository.statistics()
         
-        if not books:
+        if not stats['total']:
             return {
                 'categories': [],
                 'total': 0
             }
         
-        # Extract and count categories
-        category_counts: Dict[str, int] = {}
-        for book in books:
-            category = book.get('category', 'General')
-            category_counts[category] = category_counts.get(category, 0) + 1
+        category_counts = stats['category_counts']
         
         # Build sorted category details
         category_details = sorted([
@@ -165,41 +418,164 @@ class BookController:
             'total': len(category_details)
         }
     
-    def search_books(self, title: str = None, category: str = None) -> Dict[str, Any]:
+    def get_books_by_category(
+        self,
+        category: str,
+        page: int = 1,
+        limit: int = 10,
+        sort: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of the books of a category
+        
+        Answered from the repository's category index (posting lists in
+        memory, an indexed column in SQLite) rather than by comparing every
+        record's category.
+        
+        Args:
+            category: Category name (case-insensitive)
+            page: Page number (1-indexed, must be >= 1)
+            limit: Books per page (must be > 0, max 100)
+            sort: 'price', 'rating' or 'title', '-' prefix for descending
+        
+        Returns:
+            Dictionary with category name, paginated books and metadata, or
+            error message if the category does not exist
+        
+        Raises:
+            ValueError: If page < 1 or limit <= 0 or limit > 100, or sort is unknown
+        """
+        self._validate_page(page, limit)
+        folded = (category or '').casefold()
+        return self._cached(
+            ('category_books', folded, page, limit, sort or ''),
+            lambda: self._category_books(folded, page, limit, sort or None)
+        )
+    
+    def _category_books(
+        self,
+        category: str,
+        page: int,
+        limit: int,
+        sort: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Build the category books response (private method)
+        
+        Args:
+            category: Case-folded category name
+            page: Page number (validated)
+            limit: Books per page (validated)
+            sort: Sort order (None for catalog order)
+        
+        Returns:
+            Dictionary with category name, paginated books and metadata, or error message
+        """
+        counts = self.repository.statistics()['category_counts']
+        names = [name for name in counts if name.casefold() == category]
+        if not names:
+            return {'error': 'Category not found'}
+        
+        books, total = self.repository.find_page(
+            BookQuery(category=category, offset=(page - 1) * limit, limit=limit, sort=sort)
+        )
+        
+        return {
+            'category': names[0],
+            'books': books,
+            'total': total,
+            'page': page,
+            'limit': limit,
+            'total_pages': (total + limit - 1) // limit
+        }
+    
+    def search_books(
+        self,
+        title: str = None,
+        category: str = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        rating_min: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        availability_min: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
-        Search books by title and/or category
+        Search books by title, category and/or numeric ranges
         
         Args:
             title: Partial title search (case-insensitive)
             category: Exact category match (case-insensitive)
+            price_min: Minimum price (inclusive)
+            price_max: Maximum price (inclusive)
+            rating_min: Minimum rating (inclusive)
+            in_stock: Only books in stock (True) or out of stock (False)
+            availability_min: Minimum available copies (inclusive)
+        
+        Returns:
+            Dictionary with filtered books and count
+        
+        Raises:
+            ValueError: If a range filter is invalid
+        """
+        title, category = title or '', category or ''
+        filters = self._range_filters(price_min, price_max, rating_min, in_stock, availability_min)
+        return self._cached(
+            ('search', title, category, tuple(filters.items())),
+            lambda: self._search(title, category, filters)
+        )
+    
+    def _search(self, title: str, category: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the search response (private method)
+        
+        Args:
+            title: Partial title search
+            category: Exact category match
+            filters: Range filters (see _range_filters)
         
         Returns:
             Dictionary with filtered books and count
         """
-        books = self.repository.find_all()
-        filtered_books = books
-        
-        # Filter by title (partial match)
-        if title:
-            title_lower = title.lower()
-            filtered_books = [
-                book for book in filtered_books
-                if title_lower in book.get('title', '').lower()
-            ]
-        
-        # Filter by category (exact match)
-        if category:
-            category_lower = category.lower()
-            filtered_books = [
-                book for book in filtered_books
-                if book.get('category', 'General').lower() == category_lower
-            ]
+        filtered_books, total = self.repository.find_page(
+            BookQuery(title=title, category=category, **filters)
+        )
         
         return {
             'books': filtered_books,
-            'total': len(filtered_books)
+            'total': total
         }
     
+    def export_books(
+        self,
+        export_format: str = 'ndjson',
+        fields: Optional[str] = None
+    ) -> Tuple[str, Iterator[bytes]]:
+        """
+        Stream the whole catalog as NDJSON or CSV
+        
+        Parameters are validated before streaming starts; the books are then
+        read from one consistent view of the data and encoded chunk by chunk
+        (constant memory, no page size limit).
+        
+        Args:
+            export_format: 'ndjson' or 'csv'
+            fields: Comma-separated field projection (None for every field)
+        
+        Returns:
+            Tuple (response mimetype, iterator over encoded chunks)
+        
+        Raises:
+            ValueError: If the format or a field name is invalid
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Invalid format: {export_format}. Must be one of: {', '.join(EXPORT_FORMATS)}"
+            )
+        
+        projection = FieldProjection.parse(fields)
+        encode = export_ndjson if export_format == 'ndjson' else export_csv
+        return EXPORT_FORMATS[export_format], encode(self.repository.iter_books(), projection)
+    
     def reload_books(self) -> None:
         """
         Reload books from data source
@@ -207,3 +583,13 @@ class BookController:
         Useful after scraping operations that update the data file
         """
         self.repository.reload()
+        self.cache.clear()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Result cache counters for monitoring
+        
+        Returns:
+            Dictionary with cache size, limits and hit/miss/eviction counters
+        """
+        return self.cache.stats()
@@ -0,0 +1,123 @@
+"""
+Book Export - Streaming encoders for full-catalog exports
+
+Books are consumed from a repository iterator and written out in buffered
+chunks, so an export of any size runs in constant memory: nothing but the
+current chunk is ever held.
+"""
+import io
+import csv
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+from api.repositories.encoded_book import EncodedBook, FieldProjection, encode_book
+
+# Export format -> response mimetype
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'  # Flask appends charset=utf-8 to text types
+}
+
+# Bytes accumulated before a chunk is handed to the server
+FLUSH_SIZE = 64 * 1024
+
+
+def export_ndjson(
+    books: Iterable[Dict[str, Any]],
+    projection: Optional[FieldProjection] = None
+) -> Iterator[bytes]:
+    """
+    Encode books as newline-delimited JSON
+    
+    Without a projection, pre-encoded fragments are written verbatim.
+    
+    Args:
+        books: Book records
+        projection: Fields to keep (None for every field)
+    
+    Yields:
+        Chunks of NDJSON
+    """
+    buffer = bytearray()
+    for book in books:
+        if projection is not None:
+            buffer += projection.encode(book)
+        elif isinstance(book, EncodedBook):
+            buffer += book.fragment
+        else:
+            buffer += encode_book(book)
+        buffer += b'\n'
+        
+        if len(buffer) >= FLUSH_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    
+    if buffer:
+        yield bytes(buffer)
+
+
+def export_csv(
+    books: Iterable[Dict[str, Any]],
+    projection: Optional[FieldProjection] = None
+) -> Iterator[bytes]:
+    """
+    Encode books as CSV with a header row
+    
+    Without a projection, columns are the fields of the first book (scraped
+    records share one schema). Nested values are written as JSON.
+    
+    Args:
+        books: Book records
+        projection: Columns (None for the fields of the first book)
+    
+    Yields:
+        Chunks of UTF-8 CSV
+    """
+    fields = projection.fields if projection is not None else None
+    text = io.StringIO()
+    writer = None
+    for book in books:
+        if writer is None:
+            writer = csv.writer(text)
+            if fields is None:
+                fields = tuple(book)
+            writer.writerow(fields)
+        
+        writer.writerow([_csv_value(book.get(name)) for name in fields])
+        
+        if text.tell() >= FLUSH_SIZE:
+            yield text.getvalue().encode('utf-8')
+            text.seek(0)
+            text.truncate()
+    
+    if writer is None and fields is not None:
+        csv.writer(text).writerow(fields)  # Empty catalog: header only
+    
+    if text.tell():
+        yield text.getvalue().encode('utf-8')
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks into one gzip member, chunk by chunk
+    
+    Args:
+        chunks: Uncompressed chunks
+        level: Compression level (1-9)
+    
+    Yields:
+        Compressed chunks
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _csv_value(value: Any) -> Any:
+    """Flatten nested values for a CSV cell"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return '' if value is None else value
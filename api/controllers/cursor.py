@@ -0,0 +1,89 @@
+"""
+Page Cursor - Opaque tokens for keyset pagination
+
+A cursor records the data version it was issued for, the repository resume
+key and a fingerprint of the query, so a page can only be continued with
+the same query over the same loaded data.
+"""
+import json
+import base64
+import hashlib
+import binascii
+from typing import Any, Dict, Tuple
+from api.repositories.book_query import ResumeKey
+
+
+def query_fingerprint(*parts: Any) -> str:
+    """
+    Short hash identifying the query a cursor belongs to
+    
+    Args:
+        parts: Normalized query parameters (e.g. search term and mode)
+    
+    Returns:
+        Hex fingerprint
+    """
+    payload = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def encode_cursor(version: str, key: ResumeKey, fingerprint: str) -> str:
+    """
+    Build an opaque cursor
+    
+    Args:
+        version: Version of the data the page was read from
+        key: Repository resume key (see BaseBookRepository.find_next)
+        fingerprint: Query fingerprint
+    
+    Returns:
+        URL-safe cursor string
+    """
+    payload: Dict[str, Any] = {'v': version, 'k': key, 'q': fingerprint}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> Tuple[str, ResumeKey]:
+    """
+    Decode and validate a cursor
+    
+    Args:
+        cursor: Cursor received from the client
+        fingerprint: Fingerprint of the current query
+    
+    Returns:
+        Tuple (data version, resume key)
+    
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another query
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        version, key, cursor_fingerprint = payload['v'], payload['k'], payload['q']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    
+    if not _valid_key(key):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    
+    if cursor_fingerprint != fingerprint:
+        raise ValueError("Invalid cursor: it was issued for a different search")
+    
+    return version, key
+
+
+def _is_position(value: Any) -> bool:
+    """Whether a value is a non-negative integer"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _valid_key(key: Any) -> bool:
+    """Whether a decoded key is a rank or a [sort value or score, position] pair"""
+    if isinstance(key, list):
+        return (
+            len(key) == 2 and _is_position(key[1])
+            and isinstance(key[0], (int, float, str)) and not isinstance(key[0], bool)
+        )
+    return _is_position(key)
@@ -0,0 +1,126 @@
+"""
+Result Cache - Bounded LRU/TTL cache for controller results
+
+Entries are tied to the version of the loaded data: as soon as a lookup
+sees a new version (a reload happened), every entry is dropped, so cached
+responses never outlive the catalog they were computed from.
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with per-entry TTL
+    
+    Responsibilities:
+    - Store computed results keyed by normalized query parameters
+    - Invalidate everything when the data version changes
+    - Evict the least recently used entries beyond max_entries
+    - Count hits, misses, evictions, expirations and invalidations
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize cache
+        
+        Args:
+            max_entries: Maximum number of cached results (0 disables caching)
+            ttl: Seconds an entry stays valid (0 for no expiry besides reloads)
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def get_or_compute(self, version: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for a key, computing and storing it on a miss
+        
+        The computation runs outside the lock, so a slow query never blocks
+        hits on other keys. Exceptions are propagated and not cached.
+        
+        Args:
+            version: Version of the currently loaded data
+            key: Normalized query parameters
+            compute: Callable producing the result
+        
+        Returns:
+            Cached or freshly computed result
+        """
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                    self._entries.clear()
+                self._version = version
+            
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if not self.ttl or expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            
+            self.misses += 1
+        
+        value = compute()
+        
+        with self._lock:
+            if self.max_entries > 0 and version == self._version:
+                self._entries[key] = (self._clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        
+        return value
+    
+    def clear(self) -> None:
+        """
+        Drop every entry (counted as an invalidation)
+        """
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters for monitoring
+        
+        Returns:
+            Dictionary with size, limits, counters and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'data_version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
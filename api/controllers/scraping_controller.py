@@ -3,17 +3,34 @@ Scraping Controller - Handle web scraping operations
 """
 import logging
 from threading import Thread
-from scraper.book_scraper import BookScraper
+from typing import Any
+from scraper.factory import ENGINES, create_book_scraper
+from scraper.host_scheduler import HostScheduler
+from scraper.page_cache import PageCache
 from scraper.data_processor import DataProcessor
 
 logger = logging.getLogger(__name__)
 
 
+def _is_int(value: Any, low: int, high: int) -> bool:
+    """Whether value is an integer (not a bool) between low and high"""
+    return isinstance(value, int) and not isinstance(value, bool) and low <= value <= high
+
+
+def _is_number(value: Any, low: float, high: float) -> bool:
+    """Whether value is a number (not a bool) between low and high"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and low <= value <= high
+
+
 class ScrapingController:
     """
     Controller for scraping operations
     """
     
+    # Persistent page cache shared by the jobs (unchanged pages are revalidated, not downloaded)
+    PAGE_CACHE_PATH = 'data/cache/pages.sqlite3'
+    PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    
     def __init__(self):
         self.active_jobs = {}
         self.job_counter = 0
@@ -28,6 +45,19 @@ class ScrapingController:
                 - pages: Number of pages to scrape (default: 2)
                 - format: Output format - json, csv, both (default: both)
                 - output: Output filename (default: books)
+                - engine: Scraping engine - threads, asyncio (default: threads)
+                - workers: Concurrency - detail fetch threads, or requests in
+                  flight per host for asyncio (default: engine default)
+                - delay: Minimum seconds between requests to the site (default: 1.0)
+                - rate: Requests per second to the site (default: 1 / delay)
+                - burst: Requests that may start back to back (default: 1)
+                - max_in_flight: Concurrent requests to the site (default: 0, unlimited)
+                - adaptive: Adapt the concurrency to the site's latency and
+                  errors with AIMD (default: false)
+                - min_concurrency: Lower bound of the adaptive concurrency (default: 1)
+                - max_concurrency: Upper bound of the adaptive concurrency (default: workers)
+                - cache: Revalidate pages stored by previous jobs instead of
+                  downloading them again (default: false)
         
         Returns:
             Dictionary with job information
@@ -37,6 +67,16 @@ class ScrapingController:
         pages = params.get('pages', 2)
         output_format = params.get('format', 'both')
         output_name = params.get('output', 'books')
+        engine = params.get('engine', 'threads')
+        workers = params.get('workers')
+        delay = params.get('delay', 1.0)
+        rate = params.get('rate')
+        burst = params.get('burst', 1)
+        max_in_flight = params.get('max_in_flight', 0)
+        adaptive = params.get('adaptive', False)
+        min_concurrency = params.get('min_concurrency', 1)
+        max_concurrency = params.get('max_concurrency')
+        use_cache = params.get('cache', False)
         
         # Validate parameters
         if not isinstance(pages, int) or pages < 1 or pages > 50:
@@ -51,6 +91,90 @@ class ScrapingController:
                 'message': 'Format must be one of: json, csv, both'
             }, 400
         
+        if engine not in ENGINES:
+            return {
+                'error': 'Invalid engine parameter',
+                'message': f"Engine must be one of: {', '.join(ENGINES)}"
+            }, 400
+        
+        scraper_class = ENGINES[engine]
+        if workers is None:
+            workers = scraper_class.DEFAULT_WORKERS
+        if not _is_int(workers, 1, scraper_class.MAX_WORKERS):
+            return {
+                'error': 'Invalid workers parameter',
+                'message': (
+                    f'Workers must be an integer between 1 and {scraper_class.MAX_WORKERS} '
+                    f'for the {engine} engine'
+                )
+            }, 400
+        
+        if not _is_number(delay, 0, 60):
+            return {
+                'error': 'Invalid delay parameter',
+                'message': 'Delay must be a number of seconds between 0 and 60'
+            }, 400
+        
+        if rate is not None and (not _is_number(rate, 0, 1000) or rate == 0):
+            return {
+                'error': 'Invalid rate parameter',
+                'message': (
+                    'Rate must be a number of requests per second greater than 0 and at most 1000'
+                )
+            }, 400
+        
+        if not _is_int(burst, 1, 100):
+            return {
+                'error': 'Invalid burst parameter',
+                'message': 'Burst must be an integer between 1 and 100'
+            }, 400
+        
+        if not _is_int(max_in_flight, 0, 256):
+            return {
+                'error': 'Invalid max_in_flight parameter',
+                'message': 'Max in flight must be an integer between 0 (unlimited) and 256'
+            }, 400
+        
+        if not isinstance(adaptive, bool):
+            return {
+                'error': 'Invalid adaptive parameter',
+                'message': 'Adaptive must be a boolean'
+            }, 400
+        
+        if not _is_int(min_concurrency, 1, workers):
+            return {
+                'error': 'Invalid min_concurrency parameter',
+                'message': f'Min concurrency must be an integer between 1 and workers ({workers})'
+            }, 400
+        
+        if max_concurrency is None:
+            max_concurrency = workers
+        if not _is_int(max_concurrency, min_concurrency, workers):
+            return {
+                'error': 'Invalid max_concurrency parameter',
+                'message': (
+                    'Max concurrency must be an integer between min_concurrency '
+                    f'and workers ({workers})'
+                )
+            }, 400
+        
+        if not isinstance(use_cache, bool):
+            return {
+                'error': 'Invalid cache parameter',
+                'message': 'Cache must be a boolean'
+            }, 400
+        
+        # Per-host politeness, shared by the job's fetchers (live counters in the job status)
+        limits = {
+            'burst': burst,
+            'max_in_flight': max_in_flight,
+            'adaptive': (min_concurrency, max_concurrency) if adaptive else None
+        }
+        if rate is None:
+            scheduler = HostScheduler.from_delay(delay, **limits)
+        else:
+            scheduler = HostScheduler(rate=rate, **limits)
+        
         # Create job ID
         self.job_counter += 1
         job_id = f"job_{self.job_counter}"
@@ -62,6 +186,17 @@ class ScrapingController:
             'pages': pages,
             'format': output_format,
             'output': output_name,
+            'engine': engine,
+            'workers': workers,
+            'delay': delay,
+            'rate': scheduler.rate,
+            'burst': burst,
+            'max_in_flight': max_in_flight,
+            'adaptive': adaptive,
+            'min_concurrency': min_concurrency,
+            'max_concurrency': max_concurrency,
+            'cache': use_cache,
+            'scheduler': scheduler,
             'results': None,
             'error': None
         }
@@ -69,7 +204,10 @@ class ScrapingController:
         # Start scraping in background
         thread = Thread(
             target=self._run_scraping,
-            args=(job_id, url, pages, output_format, output_name)
+            args=(
+                job_id, url, pages, output_format, output_name, engine, workers, scheduler,
+                use_cache
+            )
         )
         thread.daemon = True
         thread.start()
@@ -81,25 +219,60 @@ class ScrapingController:
                 'url': url,
                 'pages': pages,
                 'format': output_format,
-                'output': output_name
+                'output': output_name,
+                'engine': engine,
+                'workers': workers,
+                'delay': delay,
+                'rate': scheduler.rate,
+                'burst': burst,
+                'max_in_flight': max_in_flight,
+                'adaptive': adaptive,
+                'min_concurrency': min_concurrency,
+                'max_concurrency': max_concurrency,
+                'cache': use_cache
             }
         }, 202
     
-    def _run_scraping(self, job_id, url, pages, output_format, output_name):
+    def _run_scraping(
+        self,
+        job_id,
+        url,
+        pages,
+        output_format,
+        output_name,
+        engine='threads',
+        workers=None,
+        scheduler=None,
+        use_cache=False
+    ):
         """
         Run scraping job in background
         """
+        cache = None
         try:
             logger.info(f"Starting scraping job {job_id}")
             self.active_jobs[job_id]['status'] = 'running'
             
-            # Create scraper
-            scraper = BookScraper(base_url=url, delay=1.0)
+            # Create scraper (with its own cache counters on the shared page store)
+            if use_cache:
+                cache = PageCache(self.PAGE_CACHE_PATH, self.PAGE_CACHE_MAX_BYTES)
+            scraper = create_book_scraper(
+                engine, base_url=url, workers=workers, scheduler=scheduler, cache=cache
+            )
             
             # Scrape data with detailed information (UPC, category, ISBN, etc.)
-            logger.info(f"Scraping {pages} pages with detailed information enabled")
+            logger.info(
+                f"Scraping {pages} pages with detailed information enabled "
+                f"({engine} engine, {workers} workers)"
+            )
             books = scraper.scrape(max_pages=pages, fetch_details=True)
             scraper.close()
+            concurrency = self._concurrency_summary(scraper.scheduler, scraper.workers)
+            cache_stats = cache.stats() if cache else None
+            if cache_stats:
+                logger.info(
+                    f"Page cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses"
+                )
             
             logger.info(f"Scraped {len(books)} books with complete details")
             
@@ -107,7 +280,9 @@ class ScrapingController:
                 self.active_jobs[job_id]['status'] = 'completed'
                 self.active_jobs[job_id]['results'] = {
                     'books_count': 0,
-                    'message': 'No books found'
+                    'message': 'No books found',
+                    'concurrency': concurrency,
+                    'http_cache': cache_stats
                 }
                 return
             
@@ -127,24 +302,32 @@ class ScrapingController:
             
             # Generate report
             report = processor.generate_report(cleaned_books)
+            report['http_cache'] = cache_stats  # Pages revalidated (hits) vs downloaded (misses)
             
             # Update job status
             self.active_jobs[job_id]['status'] = 'completed'
             self.active_jobs[job_id]['results'] = {
                 'books_count': len(cleaned_books),
                 'files': saved_files,
-                'report': report
+                'report': report,
+                'concurrency': concurrency
             }
             
             logger.info(f"Scraping job {job_id} completed successfully")
             logger.info(f"Saved {len(cleaned_books)} books to {saved_files}")
             
             # INSTANT RELOAD: Force repository to reload data immediately after scraping
-            # This ensures data is available instantly without waiting for next HTTP request
+            # This ensures data is available instantly without waiting for next HTTP request.
+            # The new data is loaded in this background thread and published atomically
+            # (snapshot swap in memory, single transaction in SQLite), so in-flight
+            # requests keep reading the previous catalog meanwhile.
             try:
                 from api.routes import book_repository
                 book_repository.reload()
-                logger.info(f"✅ INSTANT RELOAD: BookRepository reloaded - {len(cleaned_books)} books now available in API")
+                logger.info(
+                    f"✅ INSTANT RELOAD: BookRepository reloaded - {book_repository.count()} books "
+                    f"now available in API (version {book_repository.version})"
+                )
             except Exception as e:
                 logger.warning(f"Could not force immediate reload (will auto-reload on next request): {e}")
             
@@ -152,6 +335,36 @@ class ScrapingController:
             logger.error(f"Scraping job {job_id} failed: {e}")
             self.active_jobs[job_id]['status'] = 'failed'
             self.active_jobs[job_id]['error'] = str(e)
+        finally:
+            if cache:
+                cache.close()
+    
+    @staticmethod
+    def _concurrency_summary(scheduler, workers):
+        """
+        Concurrency the job ran with, per host
+        
+        Args:
+            scheduler: The job's HostScheduler
+            workers: Concurrent fetchers of the scraper
+        
+        Returns:
+            Dictionary with 'adaptive' and 'hosts' (host -> final 'limit',
+            plus the AIMD bounds and decreases when adaptive, and the
+            'throttled' responses)
+        """
+        hosts = {}
+        for host, stats in scheduler.stats().items():
+            if 'concurrency' in stats:
+                summary = dict(stats['concurrency'])
+            else:
+                summary = {'limit': min(workers, stats['max_in_flight'] or workers)}
+            summary['throttled'] = stats['throttled']
+            hosts[host] = summary
+        return {
+            'adaptive': scheduler.adaptive is not None,
+            'hosts': hosts
+        }
     
     def get_job_status(self, job_id):
         """
@@ -178,8 +391,19 @@ class ScrapingController:
                 'url': job['url'],
                 'pages': job['pages'],
                 'format': job['format'],
-                'output': job['output']
-            }
+                'output': job['output'],
+                'engine': job['engine'],
+                'workers': job['workers'],
+                'delay': job['delay'],
+                'rate': job['rate'],
+                'burst': job['burst'],
+                'max_in_flight': job['max_in_flight'],
+                'adaptive': job['adaptive'],
+                'min_concurrency': job['min_concurrency'],
+                'max_concurrency': job['max_concurrency'],
+                'cache': job['cache']
+            },
+            'scheduler': job['scheduler'].stats()  # Live per-host counters
         }
         
         if job['status'] == 'completed' and job['results']:
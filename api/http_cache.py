@@ -0,0 +1,163 @@
+"""
+HTTP Cache - Conditional GET for read endpoints
+
+Responses only change when a new catalog is loaded, so validators are
+derived from the loaded-data version instead of from the response body:
+a strong ETag hashes the data version, the path and the normalized query
+string, and Last-Modified is the modification time of the data source
+(the same in every worker). Matching If-None-Match / If-Modified-Since
+requests get 304 Not Modified before the view runs, skipping controller
+work and serialization entirely.
+
+Clients accepting gzip get compressed bodies. For the same reason these are
+compressed once per (path, query, data version) and served from a bounded
+cache until the next reload.
+"""
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Optional, Tuple
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+from api.controllers.result_cache import ResultCache
+from api.repositories.base_repository import BaseBookRepository
+
+
+def normalized_query() -> str:
+    """
+    Query string of the current request with parameters sorted
+    
+    Returns:
+        Normalized query string
+    """
+    return '&'.join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+
+
+def request_etag(version: str) -> str:
+    """
+    Strong ETag for the current request over a given data version
+    
+    Query parameters are sorted, so equivalent URLs share one ETag.
+    
+    Args:
+        version: Version id of the loaded data
+    
+    Returns:
+        Unquoted entity tag
+    """
+    payload = f"{version}\n{request.path}\n{normalized_query()}".encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=12).hexdigest()
+
+
+def accepts_gzip() -> bool:
+    """
+    Whether the client accepts gzip-encoded responses
+    
+    Returns:
+        True if Accept-Encoding lists gzip with a non-zero quality
+    """
+    return request.accept_encodings.quality('gzip') > 0
+
+
+def compress_body(body: bytes, level: int, min_size: int) -> Tuple[bytes, bool]:
+    """
+    Gzip a response body if it is worth it
+    
+    The gzip timestamp is fixed, so equal bodies compress to equal bytes.
+    
+    Args:
+        body: Response body
+        level: Compression level (1-9)
+        min_size: Bodies smaller than this are kept as is
+    
+    Returns:
+        Tuple (body, whether it was compressed)
+    """
+    if len(body) < min_size:
+        return body, False
+    return gzip.compress(body, compresslevel=level, mtime=0), True
+
+
+def conditional_get(
+    repository: BaseBookRepository,
+    compressed: Optional[ResultCache] = None,
+    streams_gzip: bool = False
+):
+    """
+    Decorator adding ETag/Last-Modified validation and Cache-Control to a read endpoint
+    Use after @jwt_required(), so unauthenticated requests never get a 304
+    
+    Args:
+        repository: Repository whose loaded data the endpoint serves
+        compressed: Cache of gzip bodies (None disables compression)
+        streams_gzip: The view compresses its own (streamed) body when
+            accepts_gzip() is true; only validators are handled here
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            # Validators and body come from one data version, even if a reload
+            # is published meanwhile
+            with repository.consistent_view():
+                version = repository.version
+                negotiates = compressed is not None or streams_gzip
+                use_gzip = negotiates and accepts_gzip()
+                # Each encoding is its own representation, with its own ETag
+                etag = request_etag(version) + ('-gz' if use_gzip else '')
+                last_modified = datetime.fromtimestamp(
+                    int(repository.last_modified), tz=timezone.utc
+                )
+                cache_control = current_app.config.get('HTTP_CACHE_CONTROL', 'private, no-cache')
+                
+                modified = is_resource_modified(
+                    request.environ, etag=etag, last_modified=last_modified
+                )
+                if not modified:
+                    response = current_app.response_class(status=304)
+                elif use_gzip and compressed is not None:
+                    response = _gzip_response(compressed, version, lambda: fn(*args, **kwargs))
+                else:
+                    response = current_app.make_response(fn(*args, **kwargs))
+            
+            if negotiates:
+                response.vary.add('Accept-Encoding')
+            if response.status_code not in (200, 304):
+                return response
+            
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return decorator
+    return wrapper
+
+
+def _gzip_response(compressed: ResultCache, version: str, view: Callable):
+    """
+    Serve the gzip body of the current request, compressing it once per data version
+    
+    Args:
+        compressed: Cache of encoded bodies
+        version: Version id of the loaded data
+        view: Calls the endpoint (only on a cache miss)
+    
+    Returns:
+        Flask response
+    """
+    def render():
+        response = current_app.make_response(view())
+        body, encoded = compress_body(
+            response.get_data(),
+            current_app.config.get('GZIP_LEVEL', 6),
+            current_app.config.get('GZIP_MIN_SIZE', 500)
+        )
+        return response.status_code, response.mimetype, body, encoded
+    
+    status, mimetype, body, encoded = compressed.get_or_compute(
+        version, (request.path, normalized_query()), render
+    )
+    response = current_app.response_class(body, status=status, mimetype=mimetype)
+    if encoded:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,184 @@
+"""
+JSON Provider - Compact JSON responses assembled from pre-encoded fragments
+
+Book records returned by the repositories carry their compact JSON encoding
+(see EncodedBook). This provider writes those fragments verbatim into the
+response buffer and only encodes the small envelope around them (counts,
+pagination metadata), so list, search and by-id responses never
+re-serialize a book. With a field projection (`?fields=`), only the
+selected values of each book are encoded, by the compiled projection.
+Already encoded documents (RawJSON, e.g. batch sub-responses) are embedded
+as they are.
+
+Responses are compact, debug mode included; pretty-printing is opt-in for
+humans (`?pretty=1`) and is never cached.
+"""
+import json
+from typing import Any, Dict, Optional
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from api.repositories.encoded_book import EncodedBook, FieldProjection
+
+PRETTY_VALUES = ('1', 'true', 'yes')
+
+
+class RawJSON:
+    """
+    Already encoded JSON document, written verbatim into a response
+    """
+    
+    __slots__ = ('body',)
+    
+    def __init__(self, body: bytes):
+        """
+        Wrap an encoded document
+        
+        Args:
+            body: UTF-8 JSON bytes of exactly one value
+        """
+        self.body = body.strip()
+
+
+class FragmentJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider joining pre-encoded book fragments
+    
+    Responsibilities:
+    - Encode response objects to compact UTF-8 JSON bytes
+    - Reuse the fragment of every EncodedBook instead of encoding it
+    - Embed RawJSON documents verbatim
+    - Pretty-print only on request (query parameter)
+    """
+    
+    # Key order and non-ASCII text are kept as stored, like the fragments
+    sort_keys = False
+    ensure_ascii = False
+    
+    def encode(self, obj: Any, projection: Optional[FieldProjection] = None) -> bytes:
+        """
+        Compact JSON encoding of a response object
+        
+        Args:
+            obj: Response object (dicts, lists and JSON scalars; EncodedBook
+                records are written from their fragment, RawJSON as is)
+            projection: Fields to keep in every EncodedBook (None for all)
+        
+        Returns:
+            UTF-8 JSON bytes
+        """
+        buffer = bytearray()
+        self._write(obj, buffer, projection)
+        return bytes(buffer)
+    
+    def pretty(self) -> bool:
+        """
+        Whether the current response should be pretty-printed
+        
+        Returns:
+            True if the request asked for it (?pretty=1) or compact is disabled
+        """
+        if self.compact is False:
+            return True
+        return has_request_context() and request.args.get('pretty', '').lower() in PRETTY_VALUES
+    
+    def response(self, *args: Any, **kwargs: Any):
+        """
+        Serialize the arguments as JSON (what jsonify calls)
+        
+        Args:
+            args: A single value to serialize, or several values to serialize as a list
+            kwargs: Treat as a dict to serialize
+        
+        Returns:
+            Flask response
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.pretty():
+            return self._pretty_response(obj)
+        return self.raw_response(self.encode(obj))
+    
+    def raw_response(self, body: bytes):
+        """
+        Response for an already encoded compact body (e.g. cached bytes)
+        
+        Args:
+            body: Compact JSON produced by encode
+        
+        Returns:
+            Flask response (re-indented if pretty output was requested)
+        """
+        if self.pretty():
+            return self._pretty_response(json.loads(body))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+    
+    def _pretty_response(self, obj: Any):
+        """
+        Indented response for humans (private method)
+        
+        Args:
+            obj: Response object
+        
+        Returns:
+            Flask response
+        """
+        body = self.dumps(obj, indent=2, default=self._pretty_default)
+        return self._app.response_class(f"{body}\n", mimetype=self.mimetype)
+    
+    def _pretty_default(self, obj: Any) -> Any:
+        """Decode RawJSON documents so they are re-indented with the rest (private method)"""
+        if isinstance(obj, RawJSON):
+            return json.loads(obj.body)
+        return self.default(obj)
+    
+    def _write(
+        self,
+        obj: Any,
+        buffer: bytearray,
+        projection: Optional[FieldProjection] = None
+    ) -> None:
+        """
+        Append the encoding of obj to buffer (private method)
+        
+        Args:
+            obj: Value to encode
+            buffer: Output buffer
+            projection: Fields to keep in EncodedBook records
+        """
+        if isinstance(obj, EncodedBook):
+            buffer += obj.fragment if projection is None else projection.encode(obj)
+        elif isinstance(obj, RawJSON):
+            buffer += obj.body
+        elif isinstance(obj, dict) and all(isinstance(key, str) for key in obj):
+            self._write_object(obj, buffer, projection)
+        elif isinstance(obj, (list, tuple)):
+            buffer += b'['
+            for index, item in enumerate(obj):
+                if index:
+                    buffer += b','
+                self._write(item, buffer, projection)
+            buffer += b']'
+        else:
+            buffer += self.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    def _write_object(
+        self,
+        obj: Dict[str, Any],
+        buffer: bytearray,
+        projection: Optional[FieldProjection]
+    ) -> None:
+        """
+        Append a JSON object, recursing into its values (private method)
+        
+        Args:
+            obj: Dictionary with string keys
+            buffer: Output buffer
+            projection: Fields to keep in EncodedBook records
+        """
+        buffer += b'{'
+        for index, (key, value) in enumerate(obj.items()):
+            if index:
+                buffer += b','
+            buffer += json.dumps(key, ensure_ascii=False).encode('utf-8')
+            buffer += b':'
+            self._write(value, buffer, projection)
+        buffer += b'}'
@@ -5,7 +5,19 @@ Following SOLID principles:
 - Single Responsibility: Each repository handles one data type
 - Dependency Inversion: Controllers depend on repositories, not concrete data sources
 """
+from api.repositories.base_repository import BaseBookRepository
+from api.repositories.book_query import BookQuery
 from api.repositories.book_repository import BookRepository
+from api.repositories.catalog_snapshot import CatalogSnapshot
+from api.repositories.sqlite_book_repository import SqliteBookRepository
+from api.repositories.factory import create_book_repository
 
-__all__ = ['BookRepository']
+__all__ = [
+    'BaseBookRepository',
+    'BookQuery',
+    'BookRepository',
+    'CatalogSnapshot',
+    'SqliteBookRepository',
+    'create_book_repository'
+]
 
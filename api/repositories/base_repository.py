@@ -0,0 +1,163 @@
+"""
+Base Book Repository - Abstract contract shared by all book repositories
+
+Controllers depend on this abstraction (DIP), so the in-memory JSON
+repository and the SQLite repository can be swapped via configuration.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+from api.repositories.book_query import BookQuery, ResumeKey
+
+# Demo books served when no scraped data is available
+DEFAULT_BOOKS = (
+    {
+        'id': 1,
+        'title': 'Python Machine Learning',
+        'author': 'Sebastian Raschka',
+        'isbn': '978-1789955750',
+        'price': 44.99,
+        'category': 'Technology'
+    },
+    {
+        'id': 2,
+        'title': 'Clean Code',
+        'author': 'Robert C. Martin',
+        'isbn': '978-0132350884',
+        'price': 39.99,
+        'category': 'Technology'
+    }
+)
+
+
+class BaseBookRepository(ABC):
+    """
+    Abstract base class for book repositories
+    """
+    
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        """
+        Version id of the currently loaded data
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def loaded_at(self) -> float:
+        """
+        Unix time at which the currently served data was loaded
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def last_modified(self) -> float:
+        """
+        Unix time at which the currently served data last changed at its
+        source (the same in every worker, unlike loaded_at)
+        """
+        pass
+    
+    @abstractmethod
+    def consistent_view(self) -> ContextManager[None]:
+        """
+        Context manager pinning the loaded data for the calling thread, so
+        every read inside it sees the same version even if a reload publishes
+        new data meanwhile (nested use joins the outer view)
+        """
+        pass
+    
+    @abstractmethod
+    def find_all(self) -> Sequence[Dict[str, Any]]:
+        """
+        Retrieve all books
+        """
+        pass
+    
+    @abstractmethod
+    def iter_books(self, chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all books in catalog order, from one consistent view of
+        the data, without materializing the whole catalog
+        """
+        pass
+    
+    @abstractmethod
+    def find_by_id(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a specific book by ID, or None if not found
+        """
+        pass
+    
+    @abstractmethod
+    def find_by_ids(self, book_ids: Sequence[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Find several books by ID through the primary-key index
+        
+        Returns:
+            Tuple (found books in request order, ids that were not found)
+        """
+        pass
+    
+    @abstractmethod
+    def find_page(self, query: BookQuery) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Find the books matching a query
+        
+        Returns:
+            Tuple (books in the requested window, total number of matches)
+        """
+        pass
+    
+    @abstractmethod
+    def find_next(self, query: BookQuery) -> Tuple[List[Dict[str, Any]], Optional[ResumeKey], str]:
+        """
+        Find the next page of matches after query.after (keyset pagination)
+        
+        Unlike find_page, the work done does not grow with the page depth
+        (no rows are skipped: the page resumes from the key of the last
+        returned book) and the total number of matches is not computed.
+        
+        Returns:
+            Tuple (up to query.limit books, resume key for the following page
+            or None when there are no more matches, version of the data served)
+        """
+        pass
+    
+    @abstractmethod
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Catalog aggregates
+        
+        Returns:
+            Dictionary with total, average_price, category_counts, price_stats
+            (min, p25, median, p75, p90, max) and rating_distribution
+        """
+        pass
+    
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Count total number of books
+        """
+        pass
+    
+    @abstractmethod
+    def reload(self) -> Any:
+        """
+        Force reload of books from the data source
+        """
+        pass
+    
+    def start_watching(self, poll_interval: float = 2.0, backend: str = 'auto') -> None:
+        """
+        Start watching the data source for changes (optional)
+        """
+        pass
+    
+    def stop_watching(self) -> None:
+        """
+        Stop watching the data source (optional)
+        """
+        pass
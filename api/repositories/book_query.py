@@ -0,0 +1,141 @@
+"""
+Book Query - Filter and pagination parameters passed to repositories
+
+Lets controllers describe what they need once, while each repository
+decides how to answer it (column masks in memory, SQL in SQLite).
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+SEARCH_MODES = ('substring', 'ranked')
+
+# Keyset resume key: a rank, or [sort value or score, position] of the last book
+ResumeKey = Union[int, List[Any]]
+
+# Sort fields; a leading '-' sorts in descending order
+SORT_FIELDS = ('price', 'rating', 'title')
+
+
+class BookQuery:
+    """
+    Read query over the book catalog
+    
+    Responsibilities:
+    - Carry filters (search, title, category, numeric ranges, stock)
+    - Carry the search mode (substring match or ranked full-text)
+    - Carry the requested window (offset, limit) or resume key (after, limit)
+    - Carry the requested order (sort)
+    """
+    
+    __slots__ = (
+        'search', 'title', 'category', 'offset', 'limit', 'search_mode', 'after',
+        'price_min', 'price_max', 'rating_min', 'in_stock', 'availability_min', 'sort'
+    )
+    
+    def __init__(
+        self,
+        search: Optional[str] = None,
+        title: Optional[str] = None,
+        category: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        search_mode: str = 'substring',
+        after: Optional[ResumeKey] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        rating_min: Optional[int] = None,
+        in_stock: Optional[bool] = None,
+        availability_min: Optional[int] = None,
+        sort: Optional[str] = None
+    ):
+        """
+        Initialize query
+        
+        Args:
+            search: Partial, case-insensitive match on title or author
+                (ranked mode: full-text match on title, author and description)
+            title: Partial, case-insensitive match on title
+            category: Exact, case-insensitive category match
+            offset: Number of matching books to skip
+            limit: Maximum number of books to return (None for all)
+            search_mode: 'substring' or 'ranked' (BM25 order instead of catalog order)
+            after: Resume key returned by find_next (None for the first page)
+            price_min: Minimum price (inclusive)
+            price_max: Maximum price (inclusive)
+            rating_min: Minimum rating (inclusive)
+            in_stock: Only books in stock (True) or out of stock (False)
+            availability_min: Minimum number of available copies (inclusive)
+            sort: Sort field ('price', 'rating', 'title'; '-' prefix for descending).
+                None keeps catalog order (relevance order for ranked searches)
+        
+        Raises:
+            ValueError: If search_mode or sort is unknown
+        """
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Invalid search_mode: {search_mode}. Expected one of {', '.join(SEARCH_MODES)}"
+            )
+        
+        self.search = search or None
+        self.title = title or None
+        self.category = category or None
+        self.offset = offset
+        self.limit = limit
+        self.search_mode = search_mode
+        self.after = after
+        self.price_min = price_min
+        self.price_max = price_max
+        self.rating_min = rating_min
+        self.in_stock = in_stock
+        self.availability_min = availability_min
+        self.sort = sort or None
+        
+        if self.sort and self.sort_field not in SORT_FIELDS:
+            raise ValueError(
+                f"Invalid sort: {sort}. Expected one of {', '.join(SORT_FIELDS)} "
+                "(prefix '-' for descending)"
+            )
+    
+    @property
+    def has_filters(self) -> bool:
+        """Whether any filter is set"""
+        return bool(self.search or self.title or self.category or self.ranges)
+    
+    @property
+    def ranges(self) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """
+        Numeric filters as inclusive (low, high) bounds per column
+        
+        Returns:
+            Column name -> bounds, only for the filters that are set
+        """
+        ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        if self.price_min is not None or self.price_max is not None:
+            ranges['price'] = (self.price_min, self.price_max)
+        if self.rating_min is not None:
+            ranges['rating'] = (self.rating_min, None)
+        if self.availability_min is not None:
+            ranges['availability'] = (self.availability_min, None)
+        if self.in_stock is not None:
+            ranges['in_stock'] = (bool(self.in_stock), bool(self.in_stock))
+        return ranges
+    
+    @property
+    def sort_field(self) -> Optional[str]:
+        """Field to sort by (None for catalog or relevance order)"""
+        if not self.sort:
+            return None
+        return self.sort[1:] if self.sort.startswith('-') else self.sort
+    
+    @property
+    def sort_descending(self) -> bool:
+        """Whether the sort is descending"""
+        return bool(self.sort) and self.sort.startswith('-')
+    
+    @property
+    def ranked(self) -> bool:
+        """Whether results are ranked by full-text relevance"""
+        return self.search_mode == 'ranked' and bool(self.search)
+    
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"BookQuery({fields})"
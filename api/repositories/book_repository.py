@@ -7,31 +7,152 @@ Follows Single Responsibility Principle (SRP):
 import json
 import os
 import logging
-from typing import List, Dict, Optional, Any
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence, Dict, Optional, Any, Tuple
+import numpy as np
+from api.repositories.base_repository import BaseBookRepository, DEFAULT_BOOKS, ResumeKey
+from api.repositories.book_query import BookQuery
+from api.repositories.catalog_columns import CatalogColumns
+from api.repositories.catalog_snapshot import CatalogSnapshot
+from api.repositories.encoded_book import EncodedBook
+from api.repositories.file_watcher import FileWatcher
+from scraper.binary_catalog import (
+    BinaryCatalog, binary_path_for, compute_version, open_binary_catalog
+)
 
 logger = logging.getLogger(__name__)
 
 
-class BookRepository:
+class BookRepository(BaseBookRepository):
     """
     Repository for book data access
     
     Separates data access from business logic (SRP)
     Allows easy swapping of data sources (DIP)
+    
+    Books are served from an immutable CatalogSnapshot. Reloads build a new
+    snapshot off to the side and publish it with a single reference swap,
+    so concurrent readers never block or see a partially loaded catalog.
+    
+    When watching is enabled (start_watching), data file changes are detected
+    by a background FileWatcher and the request path never touches the filesystem.
+    
+    If DataProcessor wrote a binary catalog next to the JSON file (books.bin)
+    and it is at least as recent, it is memory-mapped instead of parsing JSON:
+    workers share its page-cache pages and a load only decodes the book ids
+    (one linear pass); sort indexes and category postings are built on first use.
     """
     
-    def __init__(self, data_file: str = 'data/output/books.json'):
+    def __init__(self, data_file: str = 'data/output/books.json', use_binary: bool = True):
         """
         Initialize repository with data source
         
         Args:
             data_file: Path to JSON file containing books
+            use_binary: Prefer the memory-mapped binary catalog when available
         """
         self.data_file = data_file
-        self._books_cache: Optional[List[Dict[str, Any]]] = None
-        self._last_modified: Optional[float] = None  # Track file modification time
+        self.binary_file = binary_path_for(data_file) if use_binary else None
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._load_lock = threading.Lock()  # Serializes loaders only, never readers
+        self._failed_mtime: Optional[float] = None  # Modification time of last unreadable file
+        self._watcher: Optional[FileWatcher] = None
+        self._pinned = threading.local()  # Snapshot pinned by consistent_view, per thread
+    
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Get the current catalog snapshot
+        
+        Automatically reloads if the data file has been modified since last load.
+        While another thread is already loading, the current snapshot is returned
+        instead of waiting (only the very first load blocks).
+        
+        When the background watcher is running, freshness is its job and this
+        method returns the published snapshot without any filesystem access.
+        
+        Inside consistent_view, the snapshot pinned for the calling thread
+        is returned.
+        
+        Returns:
+            Current CatalogSnapshot
+        """
+        pinned = getattr(self._pinned, 'snapshot', None)
+        if pinned is not None:
+            return pinned
+        
+        snapshot = self._snapshot
+        
+        if snapshot is not None and self.watching:
+            return snapshot
+        
+        if snapshot is None or self._is_stale(snapshot):
+            if snapshot is None:
+                with self._load_lock:
+                    if self._snapshot is None:
+                        self._publish(self._load_snapshot())
+            elif self._load_lock.acquire(blocking=False):
+                try:
+                    if self._snapshot is snapshot:
+                        logger.info(f"Data file modified, reloading books from {self.data_file}")
+                        self._publish(self._load_snapshot(previous=snapshot))
+                finally:
+                    self._load_lock.release()
+            snapshot = self._snapshot
+        
+        return snapshot
+    
+    @contextmanager
+    def consistent_view(self) -> Iterator[None]:
+        """
+        Pin the current snapshot for the calling thread
+        
+        Reads inside the block all use the same snapshot, even if a reload
+        publishes a new one meanwhile. Nested use joins the outer view.
+        """
+        if getattr(self._pinned, 'snapshot', None) is not None:
+            yield
+            return
+        
+        self._pinned.snapshot = self.snapshot()
+        try:
+            yield
+        finally:
+            self._pinned.snapshot = None
+    
+    @property
+    def version(self) -> str:
+        """
+        Version id of the currently loaded data
+        
+        Returns:
+            Version string (content hash of the data file)
+        """
+        return self.snapshot().version
+    
+    @property
+    def loaded_at(self) -> float:
+        """
+        Unix time at which the current snapshot was loaded
+        
+        Returns:
+            Load timestamp of the published snapshot
+        """
+        return self.snapshot().loaded_at
+    
+    @property
+    def last_modified(self) -> float:
+        """
+        Unix time at which the current data files were last modified
+        
+        Returns:
+            Source mtime of the published snapshot (its load time for the
+            default books, which have no source file)
+        """
+        snapshot = self.snapshot()
+        return snapshot.source_mtime if snapshot.source_mtime is not None else snapshot.loaded_at
     
-    def find_all(self) -> List[Dict[str, Any]]:
+    def find_all(self) -> Sequence[Dict[str, Any]]:
         """
         Retrieve all books from data source
         
@@ -39,34 +160,220 @@ class BookRepository:
         This ensures fresh data after scraping operations.
         
         Returns:
-            List of book dictionaries
+            Read-only sequence of book dictionaries
         """
-        # Check if file was modified since last load
-        needs_reload = False
+        return self.snapshot().books
+    
+    def iter_books(self, chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all books of the current snapshot
         
-        if os.path.exists(self.data_file):
-            current_mtime = os.path.getmtime(self.data_file)
-            if self._last_modified is None or current_mtime > self._last_modified:
-                needs_reload = True
-                logger.info(f"Data file modified, reloading books from {self.data_file}")
+        The snapshot is taken when called, so a reload during the iteration
+        does not mix catalogs. Mapped records are decoded one at a time.
         
-        if self._books_cache is None or needs_reload:
-            self._load_books()
+        Args:
+            chunk_size: Unused (records are already in memory or mapped)
         
-        return self._books_cache or []
+        Returns:
+            Iterator over book records
+        """
+        return iter(self.snapshot().books)
     
     def find_by_id(self, book_id: str) -> Optional[Dict[str, Any]]:
         """
         Find a specific book by ID (UUID4)
         
+        Uses the primary-key index built on load, so lookups are O(1)
+        regardless of catalog size. Ids whose length matches no loaded id
+        (e.g. malformed UUIDs) are rejected without touching the index.
+        
         Args:
             book_id: Book identifier (UUID4 string)
         
         Returns:
             Book dictionary or None if not found
         """
-        books = self.find_all()
-        return next((book for book in books if book.get('id') == book_id), None)
+        return self.snapshot().get(book_id)
+    
+    def find_by_ids(self, book_ids: Sequence[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Find several books by ID, all from the same snapshot
+        
+        Each id is one lookup in the primary-key hash index.
+        
+        Args:
+            book_ids: Book identifiers
+        
+        Returns:
+            Tuple (found books in request order, ids that were not found)
+        """
+        snapshot = self.snapshot()
+        books, missing = [], []
+        for book_id in book_ids:
+            book = snapshot.get(book_id)
+            if book is None:
+                missing.append(book_id)
+            else:
+                books.append(book)
+        return books, missing
+    
+    def find_page(self, query: BookQuery) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Find the books matching a query
+        
+        The snapshot's QueryPlanner evaluates filters through the sorted
+        indexes and column masks and orders matches with presorted
+        permutations; only the records inside the requested window are
+        materialized. Ranked searches go through the inverted index.
+        
+        Args:
+            query: Filters, sort and window
+        
+        Returns:
+            Tuple (books in the requested window, total number of matches)
+        """
+        snapshot = self.snapshot()
+        end = None if query.limit is None else query.offset + query.limit
+        
+        if not query.has_filters and not query.sort:
+            return list(snapshot.books[query.offset:end]), snapshot.total
+        
+        if query.ranked:
+            positions = self._ranked_positions(snapshot, query)
+            if not query.sort:
+                return snapshot.take(positions[query.offset:end]), len(positions)
+            window, total = snapshot.planner.page(
+                query, query.offset, query.limit, candidates=positions
+            )
+        else:
+            window, total = snapshot.planner.page(query, query.offset, query.limit)
+        
+        return snapshot.take(window), total
+    
+    def find_next(self, query: BookQuery) -> Tuple[List[Dict[str, Any]], Optional[ResumeKey], str]:
+        """
+        Find the next page of matches after query.after (keyset pagination)
+        
+        The resume key locates the last returned book in the query order:
+        its record position in catalog order, its index in the presorted
+        permutation when sorted, its [score, position] in a ranked search.
+        The planner stops scanning as soon as the page is filled; a ranked
+        page keeps the matches past the key and selects the best ones
+        without ranking the whole result.
+        
+        Args:
+            query: Filters, sort, resume key and limit
+        
+        Returns:
+            Tuple (books, resume key for the following page or None, data version)
+        
+        Raises:
+            ValueError: If the resume key does not fit the query
+        """
+        snapshot = self.snapshot()
+        limit = query.limit if query.limit is not None else snapshot.total
+        
+        if query.ranked and not query.sort:
+            positions, scores = self._next_ranked(snapshot, query, limit + 1)
+            next_key = None
+            if len(positions) > limit:
+                next_key = [float(scores[limit - 1]), int(positions[limit - 1])]
+            return snapshot.take(positions[:limit]), next_key, snapshot.version
+        
+        if query.after is not None and not isinstance(query.after, int):
+            raise ValueError("Invalid cursor: it does not match this query")
+        start = 0 if query.after is None else query.after + 1
+        candidates = self._ranked_positions(snapshot, query) if query.ranked else None
+        positions, ranks = snapshot.planner.next(query, start, limit + 1, candidates=candidates)
+        next_key = int(ranks[limit - 1]) if len(positions) > limit else None
+        return snapshot.take(positions[:limit]), next_key, snapshot.version
+    
+    def _next_ranked(
+        self,
+        snapshot: CatalogSnapshot,
+        query: BookQuery,
+        needed: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best `needed` matches of a ranked search ranked after query.after (private method)
+        
+        Args:
+            snapshot: Snapshot to search
+            query: Ranked query, resume key [score, position] or None
+            needed: Number of matches wanted
+        
+        Returns:
+            Tuple (positions best-first, their scores)
+        
+        Raises:
+            ValueError: If the resume key is not a [score, position] pair
+        """
+        positions, scores = snapshot.search_index.matches(query.search)
+        if query.title or query.category or query.ranges:
+            keep = snapshot.planner.mask(query, positions)
+            positions, scores = positions[keep], scores[keep]
+        
+        if query.after is not None:
+            if not isinstance(query.after, list):
+                raise ValueError("Invalid cursor: it does not match this query")
+            score, position = scores.dtype.type(query.after[0]), query.after[1]
+            keep = (scores < score) | ((scores == score) & (positions > position))
+            positions, scores = positions[keep], scores[keep]
+        
+        if len(positions) > needed:
+            # Only matches scoring at least the needed-th best can make the page
+            threshold = np.partition(scores, len(scores) - needed)[len(scores) - needed]
+            keep = scores >= threshold
+            positions, scores = positions[keep], scores[keep]
+        
+        order = np.lexsort((positions, -scores))[:needed]
+        return positions[order], scores[order]
+    
+    def _ranked_positions(self, snapshot: CatalogSnapshot, query: BookQuery) -> np.ndarray:
+        """
+        Record positions of a ranked search, best match first (private method)
+        
+        Args:
+            snapshot: Snapshot to search
+            query: Ranked query
+        
+        Returns:
+            Positions matching the search and the remaining filters
+        """
+        positions, _ = snapshot.search_index.search(query.search)
+        if query.title or query.category or query.ranges:
+            # The remaining filters only narrow the ranking
+            positions = positions[snapshot.planner.mask(query, positions)]
+        return positions
+    
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Catalog aggregates (precomputed when the snapshot is built)
+        
+        Returns:
+            Dictionary with total, average_price, category_counts, price_stats
+            and rating_distribution
+        """
+        snapshot = self.snapshot()
+        return {
+            'total': snapshot.total,
+            'average_price': snapshot.average_price,
+            'category_counts': dict(snapshot.category_counts),
+            'price_stats': dict(snapshot.price_stats),
+            'rating_distribution': dict(snapshot.rating_distribution)
+        }
+    
+    def exists(self, book_id: str) -> bool:
+        """
+        Check whether a book with the given ID exists
+        
+        Args:
+            book_id: Book identifier (UUID4 string)
+        
+        Returns:
+            True if the book exists, False otherwise
+        """
+        return self.find_by_id(book_id) is not None
     
     def count(self) -> int:
         """
@@ -75,46 +382,209 @@ class BookRepository:
         Returns:
             Total book count
         """
-        return len(self.find_all())
+        return self.snapshot().total
     
-    def reload(self) -> None:
+    def reload(self) -> CatalogSnapshot:
         """
         Force reload of books from data source
         
         Useful after scraping operations that update the data file.
-        Resets cache and modification time to force fresh load.
+        The new snapshot is built while readers keep using the current
+        one, then published atomically.
+        
+        Returns:
+            The newly published CatalogSnapshot
         """
-        self._books_cache = None
-        self._last_modified = None
-        self._load_books()
+        with self._load_lock:
+            self._publish(self._load_snapshot(previous=self._snapshot))
+            return self._snapshot
     
-    def _load_books(self) -> None:
+    @property
+    def watching(self) -> bool:
+        """Whether a background watcher is keeping the snapshot fresh"""
+        return self._watcher is not None and self._watcher.running
+    
+    def start_watching(self, poll_interval: float = 2.0, backend: str = 'auto') -> None:
+        """
+        Start the background watcher for the data file (no-op if already watching)
+        
+        Args:
+            poll_interval: Seconds between checks when polling is used
+            backend: 'auto' (inotify where available), 'inotify' or 'poll'
         """
-        Load books from JSON file (private method)
+        if self.watching:
+            return
         
-        Uses default books if file doesn't exist.
-        Records file modification time for auto-reload detection.
+        self._watcher = FileWatcher(
+            [path for path in (self.data_file, self.binary_file) if path],
+            callback=self._on_data_file_changed,
+            poll_interval=poll_interval,
+            backend=backend
+        )
+        self._watcher.start()
+    
+    def stop_watching(self) -> None:
+        """
+        Stop the background watcher (requests fall back to mtime checks)
+        """
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+    
+    def _on_data_file_changed(self) -> None:
+        """
+        Watcher callback: rebuild and publish a new snapshot (private method)
         """
+        logger.info(f"Data file change detected, reloading books from {self.data_file}")
+        # Build the lazily-built indexes here, off the request path
+        self.reload().warm()
+    
+    def _publish(self, snapshot: CatalogSnapshot) -> None:
+        """
+        Publish a new snapshot (private method)
+        
+        A single attribute assignment is atomic, so readers see either the
+        previous snapshot or the new one, never a mix.
+        
+        Args:
+            snapshot: Fully built snapshot
+        """
+        self._snapshot = snapshot
+        logger.info(f"Published catalog snapshot {snapshot.version} ({snapshot.total} books)")
+    
+    def _is_stale(self, snapshot: CatalogSnapshot) -> bool:
+        """
+        Check if the data file changed since the snapshot was loaded (private method)
+        
+        Args:
+            snapshot: Snapshot to check
+        
+        Returns:
+            True if the data file was modified or created since loading
+        """
+        current_mtime = self._data_mtime()
+        if current_mtime is None:
+            return False
+        
+        if current_mtime == self._failed_mtime:
+            return False  # Same unreadable file, wait for the next write
+        
+        return snapshot.source_mtime is None or current_mtime > snapshot.source_mtime
+    
+    def _load_snapshot(self, previous: Optional[CatalogSnapshot] = None) -> CatalogSnapshot:
+        """
+        Load books into a new snapshot (private method)
+        
+        Maps the binary catalog when it is at least as recent as the JSON
+        file, otherwise parses the JSON file.
+        Uses default books if file doesn't exist. If the file exists but
+        cannot be read or decoded (e.g. a scrape is still writing it), the
+        previous snapshot is kept instead of falling back to default books.
+        
+        Args:
+            previous: Currently published snapshot, if any
+        
+        Returns:
+            CatalogSnapshot to publish
+        """
+        # Record modification time BEFORE loading
+        mtime = self._data_mtime()
+        
         try:
+            if self.binary_file and os.path.exists(self.binary_file):
+                binary_mtime = os.path.getmtime(self.binary_file)
+                json_mtime = None
+                if os.path.exists(self.data_file):
+                    json_mtime = os.path.getmtime(self.data_file)
+                
+                if json_mtime is None or binary_mtime >= json_mtime:
+                    catalog = open_binary_catalog(self.binary_file)
+                    if catalog is not None:
+                        return self._snapshot_from_binary(catalog, mtime)
+            
             if os.path.exists(self.data_file):
-                # Record modification time BEFORE loading
-                self._last_modified = os.path.getmtime(self.data_file)
+                with open(self.data_file, 'rb') as f:
+                    content = f.read()
+                books = json.loads(content)
                 
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self._books_cache = json.load(f)
-                logger.info(f"Loaded {len(self._books_cache)} books from {self.data_file}")
-            else:
-                logger.warning(f"Data file {self.data_file} not found, using default books")
-                self._books_cache = self._get_default_books()
-                self._last_modified = None
+                logger.info(f"Loaded {len(books)} books from {self.data_file}")
+                return CatalogSnapshot.build(
+                    books,
+                    version=compute_version(content),
+                    source=self.data_file,
+                    source_mtime=mtime
+                )
+            
+            logger.warning(f"Data file {self.data_file} not found, using default books")
         except json.JSONDecodeError as e:
             logger.error(f"Error decoding JSON from {self.data_file}: {e}")
-            self._books_cache = self._get_default_books()
-            self._last_modified = None
+            self._failed_mtime = mtime
+            if previous is not None:
+                return previous
         except Exception as e:
             logger.error(f"Error loading books from {self.data_file}: {e}")
-            self._books_cache = self._get_default_books()
-            self._last_modified = None
+            self._failed_mtime = mtime
+            if previous is not None:
+                return previous
+        
+        return CatalogSnapshot.build(self._get_default_books(), version='default')
+    
+    def _snapshot_from_binary(
+        self,
+        catalog: BinaryCatalog,
+        mtime: Optional[float]
+    ) -> CatalogSnapshot:
+        """
+        Build a snapshot over a memory-mapped binary catalog (private method)
+        
+        Columns are zero-copy views over the mapping and records are decoded
+        on access (keeping their stored bytes as the response fragment).
+        Each process still decodes every id into the primary-key dict (O(n));
+        the sorted indexes and category postings are deferred to first use.
+        
+        Args:
+            catalog: Opened binary catalog
+            mtime: Modification time of the data files
+        
+        Returns:
+            New CatalogSnapshot
+        """
+        records = catalog.records.decoded_with(EncodedBook.from_json)
+        columns = CatalogColumns(
+            records=records,
+            price=catalog.price,
+            rating=catalog.rating,
+            availability=catalog.availability,
+            in_stock=catalog.in_stock,
+            category_codes=catalog.category_codes,
+            categories=catalog.categories
+        )
+        
+        logger.info(f"Mapped {catalog.size} books from {catalog.path}")
+        return CatalogSnapshot.build(
+            records,
+            version=catalog.version,
+            source=catalog.path,
+            source_mtime=mtime,
+            columns=columns,
+            ids=catalog.ids()
+        )
+    
+    def _data_mtime(self) -> Optional[float]:
+        """
+        Latest modification time of the data files (private method)
+        
+        Returns:
+            Most recent mtime of the JSON/binary files, or None if none exists
+        """
+        mtimes = []
+        for path in (self.data_file, self.binary_file):
+            if path:
+                try:
+                    mtimes.append(os.path.getmtime(path))
+                except OSError:
+                    pass
+        return max(mtimes) if mtimes else None
     
     def _get_default_books(self) -> List[Dict[str, Any]]:
         """
@@ -123,22 +593,4 @@ class BookRepository:
         Returns:
             List of default book dictionaries
         """
-        return [
-            {
-                'id': 1,
-                'title': 'Python Machine Learning',
-                'author': 'Sebastian Raschka',
-                'isbn': '978-1789955750',
-                'price': 44.99,
-                'category': 'Technology'
-            },
-            {
-                'id': 2,
-                'title': 'Clean Code',
-                'author': 'Robert C. Martin',
-                'isbn': '978-0132350884',
-                'price': 39.99,
-                'category': 'Technology'
-            }
-        ]
-
+        return [dict(book) for book in DEFAULT_BOOKS]
@@ -0,0 +1,471 @@
+"""
+Catalog Columns - Columnar NumPy view of the book catalog
+
+Materialized once per catalog snapshot so that aggregates, filters and
+sorts run as vectorized NumPy operations instead of per-request loops over
+book dictionaries. The dictionaries are still kept for serialization.
+"""
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+from api.repositories.sorted_index import SortedIndex
+from scraper.binary_catalog import to_float, to_int
+
+# Rows a filter is evaluated on: a contiguous range or explicit record positions
+Rows = Union[slice, np.ndarray]
+
+# Inclusive (low, high) bounds per column, None meaning unbounded
+Ranges = Dict[str, Tuple[Optional[float], Optional[float]]]
+
+
+class LazyIndexes(Mapping):
+    """
+    Sorted indexes of the indexed columns, each built on first use
+    
+    Building an index argsorts its column (O(n log n)); deferring it keeps
+    snapshot loads linear and spares workers the indexes they never query.
+    Concurrent first uses may both build an index: they produce the same
+    result and one of them is kept.
+    """
+    
+    __slots__ = ('_columns', '_names', '_built')
+    
+    def __init__(self, columns: 'CatalogColumns', names: Sequence[str]):
+        self._columns = columns
+        self._names = tuple(names)
+        self._built: Dict[str, SortedIndex] = {}
+    
+    def __getitem__(self, name: str) -> SortedIndex:
+        index = self._built.get(name)
+        if index is None:
+            if name not in self._names:
+                raise KeyError(name)
+            index = self._built.setdefault(name, SortedIndex(getattr(self._columns, name)))
+        return index
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+    
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class CatalogColumns:
+    """
+    Column store for book records
+    
+    Columns (one entry per book, aligned with the snapshot records):
+    - price: float64
+    - rating: int8
+    - availability: int32
+    - in_stock: bool
+    - category_codes: int32 codes into `categories`
+    - titles / authors: lower-cased strings for substring search (lazy)
+    
+    Range filters on price, rating, availability and in_stock are answered
+    by sorted secondary indexes; category filters by per-category posting
+    lists (case-folded name -> record positions). Both are built on first
+    use, so creating the columns stays linear in the catalog size.
+    """
+    
+    INDEXED = ('price', 'rating', 'availability', 'in_stock')
+    SORTABLE = ('price', 'rating', 'title')
+    
+    def __init__(
+        self,
+        records: Sequence[Dict[str, Any]],
+        price: np.ndarray,
+        rating: np.ndarray,
+        availability: np.ndarray,
+        in_stock: np.ndarray,
+        category_codes: np.ndarray,
+        categories: Sequence[str]
+    ):
+        """
+        Initialize columns from prebuilt arrays (see from_records)
+        
+        Arrays may be read-only views (e.g. over a memory-mapped binary catalog).
+        
+        Args:
+            records: Book dictionaries the columns are aligned with
+            price: float64 prices
+            rating: int8 ratings
+            availability: int32 available copies
+            in_stock: bool stock flags
+            category_codes: int32 codes into categories
+            categories: Category names
+        """
+        self.size = len(records)
+        self.price = price
+        self.rating = rating
+        self.availability = availability
+        self.in_stock = in_stock
+        self.category_codes = category_codes
+        self.categories: Tuple[str, ...] = tuple(categories)
+        self._records = records
+        self._titles: Optional[Tuple[str, ...]] = None
+        self._authors: Optional[Tuple[str, ...]] = None
+        
+        # Case-folded category name -> codes (several spellings may fold together)
+        self._category_lookup: Dict[str, List[int]] = {}
+        for code, name in enumerate(self.categories):
+            self._category_lookup.setdefault(name.casefold(), []).append(code)
+        
+        columns = (self.price, self.rating, self.availability, self.in_stock, self.category_codes)
+        for column in columns:
+            column.flags.writeable = False
+        
+        self._postings: Optional[Dict[str, np.ndarray]] = None
+        self.indexes: Mapping[str, SortedIndex] = LazyIndexes(self, self.INDEXED)
+        self._sort_orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._sort_ranks: Dict[Tuple[str, bool], np.ndarray] = {}
+    
+    @classmethod
+    def from_records(cls, books: Sequence[Dict[str, Any]]) -> 'CatalogColumns':
+        """
+        Build columns from book records
+        
+        Args:
+            books: Book dictionaries
+        
+        Returns:
+            New CatalogColumns
+        """
+        size = len(books)
+        
+        # Categorical encoding (codes follow first-seen order)
+        category_index: Dict[str, int] = {}
+        codes = np.empty(size, dtype=np.int32)
+        for position, book in enumerate(books):
+            category = book.get('category', 'General')
+            codes[position] = category_index.setdefault(category, len(category_index))
+        
+        return cls(
+            records=books,
+            price=np.fromiter(
+                (to_float(book.get('price', 0)) for book in books), dtype=np.float64, count=size
+            ),
+            rating=np.fromiter(
+                (to_int(book.get('rating', 0)) for book in books), dtype=np.int8, count=size
+            ),
+            availability=np.fromiter(
+                (to_int(book.get('availability', 0)) for book in books), dtype=np.int32, count=size
+            ),
+            in_stock=np.fromiter(
+                (bool(book.get('in_stock', False)) for book in books), dtype=np.bool_, count=size
+            ),
+            category_codes=codes,
+            categories=tuple(category_index)
+        )
+    
+    @property
+    def titles(self) -> Tuple[str, ...]:
+        """Lower-cased titles (built on first use)"""
+        if self._titles is None:
+            self._titles = tuple(str(book.get('title', '')).lower() for book in self._records)
+        return self._titles
+    
+    @property
+    def authors(self) -> Tuple[str, ...]:
+        """Lower-cased authors (built on first use)"""
+        if self._authors is None:
+            self._authors = tuple(str(book.get('author', '')).lower() for book in self._records)
+        return self._authors
+    
+    def sort_order(self, field: str, descending: bool = False) -> np.ndarray:
+        """
+        Presorted permutation of the records (built once, then cached)
+        
+        Ties keep catalog order in both directions, matching
+        ORDER BY <field> [DESC], position.
+        
+        Args:
+            field: One of SORTABLE
+            descending: Largest values first
+        
+        Returns:
+            Record positions in sort order
+        """
+        key = (field, descending)
+        order = self._sort_orders.get(key)
+        if order is None:
+            if field in self.indexes and not descending:
+                order = self.indexes[field].order  # Stable argsort, shared with the range index
+            else:
+                values = self._sort_values(field)
+                order = np.argsort(-values if descending else values, kind='stable')
+                order = order.astype(np.int32)
+                order.flags.writeable = False
+            self._sort_orders[key] = order
+        return order
+    
+    def sort_rank(self, field: str, descending: bool = False) -> np.ndarray:
+        """
+        Inverse of sort_order: rank of each record position
+        
+        Args:
+            field: One of SORTABLE
+            descending: Largest values first
+        
+        Returns:
+            Rank per record position
+        """
+        key = (field, descending)
+        rank = self._sort_ranks.get(key)
+        if rank is None:
+            rank = np.empty(self.size, dtype=np.int32)
+            rank[self.sort_order(field, descending)] = np.arange(self.size, dtype=np.int32)
+            rank.flags.writeable = False
+            self._sort_ranks[key] = rank
+        return rank
+    
+    def _sort_values(self, field: str) -> np.ndarray:
+        """
+        Numeric sort key of a field (titles become ordinal codes)
+        
+        Args:
+            field: One of SORTABLE
+        
+        Returns:
+            Array whose order matches the field order
+        
+        Raises:
+            ValueError: If the field is not sortable
+        """
+        if field == 'title':
+            titles = self.titles
+            codes = np.empty(self.size, dtype=np.int32)
+            code, previous = -1, None
+            for position in sorted(range(self.size), key=titles.__getitem__):
+                if titles[position] != previous:
+                    code, previous = code + 1, titles[position]
+                codes[position] = code
+            return codes
+        
+        if field not in self.SORTABLE:
+            raise ValueError(
+                f"Invalid sort field: {field}. Must be one of: {', '.join(self.SORTABLE)}"
+            )
+        
+        return getattr(self, field).astype(np.float64)
+    
+    def category_counts(self) -> Dict[str, int]:
+        """
+        Count books per category
+        
+        Returns:
+            Mapping category name -> book count (first-seen order)
+        """
+        counts = np.bincount(self.category_codes, minlength=len(self.categories))
+        return {name: int(count) for name, count in zip(self.categories, counts)}
+    
+    def average_price(self) -> float:
+        """
+        Average book price
+        
+        Returns:
+            Mean price (0.0 for an empty catalog)
+        """
+        return float(self.price.mean()) if self.size else 0.0
+    
+    def price_stats(self) -> Dict[str, float]:
+        """
+        Price distribution summary
+        
+        Returns:
+            Dictionary with min, max and the 25th/50th/75th/90th percentiles
+            (all 0.0 for an empty catalog)
+        """
+        if not self.size:
+            return dict.fromkeys(('min', 'p25', 'median', 'p75', 'p90', 'max'), 0.0)
+        
+        p25, median, p75, p90 = np.percentile(self.price, [25, 50, 75, 90])
+        return {
+            'min': float(self.price.min()),
+            'p25': float(p25),
+            'median': float(median),
+            'p75': float(p75),
+            'p90': float(p90),
+            'max': float(self.price.max())
+        }
+    
+    def rating_distribution(self) -> Dict[str, int]:
+        """
+        Count books per rating
+        
+        Returns:
+            Mapping rating (as string, ascending) -> book count, for ratings present
+        """
+        ratings, counts = np.unique(self.rating, return_counts=True)
+        return {str(int(rating)): int(count) for rating, count in zip(ratings, counts)}
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        All catalog aggregates, computed in one place for every repository
+        
+        Returns:
+            Dictionary with total, average_price, category_counts, price_stats
+            and rating_distribution
+        """
+        return {
+            'total': self.size,
+            'average_price': self.average_price(),
+            'category_counts': self.category_counts(),
+            'price_stats': self.price_stats(),
+            'rating_distribution': self.rating_distribution()
+        }
+    
+    def category_positions(self, category: str) -> np.ndarray:
+        """
+        Posting list of a category (direct lookup, no scan)
+        
+        Args:
+            category: Category name (case-insensitive)
+        
+        Returns:
+            Positions of the category's books in catalog order (read-only;
+            empty for an unknown category)
+        """
+        positions = self._category_postings.get(category.casefold())
+        return positions if positions is not None else np.empty(0, dtype=np.int32)
+    
+    def category_size(self, category: str) -> int:
+        """
+        Number of books in a category
+        
+        Args:
+            category: Category name (case-insensitive)
+        
+        Returns:
+            Book count (0 for an unknown category)
+        """
+        positions = self._category_postings.get(category.casefold())
+        return 0 if positions is None else len(positions)
+    
+    @property
+    def _category_postings(self) -> Dict[str, np.ndarray]:
+        """Category posting lists (built on first use)"""
+        if self._postings is None:
+            self._postings = self._build_category_postings()
+        return self._postings
+    
+    def _build_category_postings(self) -> Dict[str, np.ndarray]:
+        """
+        Group record positions by case-folded category (private method)
+        
+        One stable argsort of the codes yields every posting list already
+        in catalog order; spellings folding to the same name are merged.
+        
+        Returns:
+            Mapping case-folded category name -> sorted positions
+        """
+        order = np.argsort(self.category_codes, kind='stable').astype(np.int32)
+        order.flags.writeable = False
+        sizes = np.bincount(self.category_codes, minlength=len(self.categories))
+        bounds = np.concatenate(([0], np.cumsum(sizes)))
+        
+        postings: Dict[str, np.ndarray] = {}
+        for name, codes in self._category_lookup.items():
+            if len(codes) == 1:
+                positions = order[bounds[codes[0]]:bounds[codes[0] + 1]]
+            else:
+                positions = np.sort(np.concatenate(
+                    [order[bounds[code]:bounds[code + 1]] for code in codes]
+                ))
+                positions.flags.writeable = False
+            postings[name] = positions
+        return postings
+    
+    def category_mask(self, category: str, rows: Rows = slice(None)) -> np.ndarray:
+        """
+        Exact, case-insensitive category filter
+        
+        Args:
+            category: Category name
+            rows: Records to evaluate (range or positions; all by default)
+        
+        Returns:
+            Boolean mask of matching books, aligned with rows
+        """
+        codes = self._category_lookup.get(category.casefold())
+        window = self.category_codes[rows]
+        if not codes:
+            return np.zeros(len(window), dtype=np.bool_)
+        return np.isin(window, codes)
+    
+    def text_mask(
+        self,
+        term: str,
+        include_authors: bool = False,
+        rows: Rows = slice(None)
+    ) -> np.ndarray:
+        """
+        Case-insensitive substring filter on titles (and optionally authors)
+        
+        Args:
+            term: Search term
+            include_authors: Also match the author column
+            rows: Records to evaluate (range or positions; all by default)
+        
+        Returns:
+            Boolean mask of matching books, aligned with rows
+        """
+        term = term.lower()
+        titles = self._select(self.titles, rows)
+        if include_authors:
+            authors = self._select(self.authors, rows)
+            matches = (term in title or term in author for title, author in zip(titles, authors))
+        else:
+            matches = (term in title for title in titles)
+        return np.fromiter(matches, dtype=np.bool_, count=len(titles))
+    
+    def range_mask(self, ranges: Ranges, rows: Rows = slice(None)) -> np.ndarray:
+        """
+        Inclusive range filters evaluated on column values
+        
+        Args:
+            ranges: Column name -> (low, high) bounds
+            rows: Records to evaluate (range or positions; all by default)
+        
+        Returns:
+            Boolean mask of matching books, aligned with rows
+        """
+        mask = np.ones(len(self.price[rows]), dtype=np.bool_)
+        for name, (low, high) in ranges.items():
+            values = getattr(self, name)[rows]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return mask
+    
+    def range_candidates(self, ranges: Ranges) -> np.ndarray:
+        """
+        Positions matching range filters, found through the sorted indexes
+        
+        Each range is counted with two binary searches; positions are taken
+        from the most selective index and intersected with the others.
+        
+        Args:
+            ranges: Column name -> (low, high) bounds (at least one)
+        
+        Returns:
+            Matching positions in catalog order
+        """
+        counts = {name: self.indexes[name].count(*bounds) for name, bounds in ranges.items()}
+        driver = min(counts, key=counts.get)
+        positions = np.sort(self.indexes[driver].positions(*ranges[driver]))
+        
+        others = {name: bounds for name, bounds in ranges.items() if name != driver}
+        if others and len(positions):
+            positions = positions[self.range_mask(others, positions)]
+        return positions
+    
+    @staticmethod
+    def _select(values: Tuple[str, ...], rows: Rows) -> Sequence[str]:
+        """Pick string column entries for a range or explicit positions"""
+        if isinstance(rows, slice):
+            return values[rows]
+        return [values[position] for position in rows]
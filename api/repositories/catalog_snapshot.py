@@ -0,0 +1,218 @@
+"""
+Catalog Snapshot - Immutable, fully-indexed view of the book catalog
+
+A snapshot is built off to the side (records + indexes + aggregates) and
+published by the repository with a single reference swap, so readers never
+block and never observe a half-loaded catalog.
+"""
+import time
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+from api.repositories.catalog_columns import CatalogColumns
+from api.repositories.encoded_book import EncodedBook
+from api.repositories.query_planner import QueryPlanner
+from api.search import SearchIndex
+from scraper.binary_catalog import MappedRecords
+
+
+class CatalogSnapshot:
+    """
+    Immutable catalog snapshot
+    
+    Responsibilities:
+    - Hold the loaded book records (read-only sequence of EncodedBook)
+    - Hold the primary-key index (id -> record position)
+    - Hold the columnar NumPy view used for scans and aggregates
+    - Hold the query planner and its selectivity statistics
+    - Hold aggregates precomputed at load time
+    - Hold the full-text search index (built once, on first ranked search)
+    - Identify the loaded data through a version id
+    """
+    
+    __slots__ = (
+        'books', 'by_id', 'id_lengths', 'columns', 'planner', 'total', 'average_price',
+        'category_counts', 'price_stats', 'rating_distribution',
+        'version', 'source', 'source_mtime', 'loaded_at',
+        '_search_index', '_search_lock'
+    )
+    
+    def __init__(
+        self,
+        books: Sequence[Dict[str, Any]],
+        by_id: Mapping[str, int],
+        columns: CatalogColumns,
+        version: str,
+        source: Optional[str] = None,
+        source_mtime: Optional[float] = None
+    ):
+        """
+        Initialize snapshot (use CatalogSnapshot.build instead)
+        
+        Args:
+            books: Book records (tuple, or records decoded on access)
+            by_id: Primary-key index (string id -> record position)
+            columns: Columnar view aligned with books
+            version: Version id of the loaded data
+            source: Path of the data file the snapshot was loaded from
+            source_mtime: Modification time of the data file when loaded
+        """
+        set_attr = object.__setattr__
+        set_attr(self, 'books', books)
+        set_attr(self, 'by_id', MappingProxyType(by_id))
+        set_attr(self, 'id_lengths', frozenset(len(key) for key in by_id))
+        set_attr(self, 'columns', columns)
+        set_attr(self, 'planner', QueryPlanner(columns))
+        summary = columns.summary()
+        set_attr(self, 'total', len(books))
+        set_attr(self, 'average_price', summary['average_price'])
+        set_attr(self, 'category_counts', MappingProxyType(summary['category_counts']))
+        set_attr(self, 'price_stats', MappingProxyType(summary['price_stats']))
+        set_attr(self, 'rating_distribution', MappingProxyType(summary['rating_distribution']))
+        set_attr(self, 'version', version)
+        set_attr(self, 'source', source)
+        set_attr(self, 'source_mtime', source_mtime)
+        set_attr(self, 'loaded_at', time.time())
+        set_attr(self, '_search_index', None)
+        set_attr(self, '_search_lock', threading.Lock())
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('CatalogSnapshot is immutable')
+    
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('CatalogSnapshot is immutable')
+    
+    def __repr__(self) -> str:
+        return f"CatalogSnapshot(version={self.version!r}, total={self.total})"
+    
+    @classmethod
+    def build(
+        cls,
+        books: Sequence[Dict[str, Any]],
+        version: str,
+        source: Optional[str] = None,
+        source_mtime: Optional[float] = None,
+        columns: Optional[CatalogColumns] = None,
+        ids: Optional[Sequence[Any]] = None
+    ) -> 'CatalogSnapshot':
+        """
+        Build a snapshot from loaded book records
+        
+        Ids are normalized to strings so that numeric ids (default books)
+        match the string ids received from URL parameters. Each record is
+        encoded to its compact JSON fragment here, once per load.
+        
+        Args:
+            books: Book dictionaries
+            version: Version id of the loaded data
+            source: Path of the data file
+            source_mtime: Modification time of the data file
+            columns: Prebuilt columns (e.g. mapped from a binary catalog)
+            ids: Book ids aligned with books (avoids decoding every record)
+        
+        Returns:
+            New CatalogSnapshot
+        """
+        if not isinstance(books, MappedRecords):
+            books = tuple(
+                book if isinstance(book, EncodedBook) else EncodedBook(book) for book in books
+            )
+        if ids is None:
+            ids = [book.get('id') for book in books]
+        
+        by_id: Dict[str, int] = {}
+        for position, book_id in enumerate(ids):
+            if book_id is not None and book_id != '':
+                by_id.setdefault(str(book_id), position)
+        
+        return cls(
+            books=books,
+            by_id=by_id,
+            columns=columns if columns is not None else CatalogColumns.from_records(books),
+            version=version,
+            source=source,
+            source_mtime=source_mtime
+        )
+    
+    @property
+    def search_index(self) -> SearchIndex:
+        """
+        Full-text index over the snapshot records
+        
+        Built on first use (concurrent callers wait for the same build) and
+        then shared for the snapshot's lifetime, since the records never change.
+        
+        Returns:
+            SearchIndex aligned with the record positions
+        """
+        index = self._search_index
+        if index is None:
+            with self._search_lock:
+                index = self._search_index
+                if index is None:
+                    index = SearchIndex(self.books)
+                    object.__setattr__(self, '_search_index', index)
+        return index
+    
+    def warm(self) -> 'CatalogSnapshot':
+        """
+        Build everything that is otherwise built on first use
+        
+        Meant for background threads (e.g. the data watcher), so that the
+        first search or sorted request after a reload does not pay for it.
+        
+        Returns:
+            This snapshot
+        """
+        self.search_index
+        self.columns.category_size('')  # Builds the category postings
+        for name in self.columns.indexes:
+            self.columns.indexes[name]
+        for field in self.columns.SORTABLE:
+            for descending in (False, True):
+                self.columns.sort_rank(field, descending)
+        return self
+    
+    def take(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """
+        Fetch book records by position
+        
+        Args:
+            positions: Record positions (e.g. from a column mask)
+        
+        Returns:
+            List of book dictionaries, in the given order
+        """
+        books = self.books
+        return [books[position] for position in positions]
+    
+    def get(self, book_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Look up a book by id
+        
+        Ids whose length matches no loaded id (e.g. malformed UUIDs) are
+        rejected without touching the index.
+        
+        Args:
+            book_id: Book identifier
+        
+        Returns:
+            Book dictionary or None if not found
+        """
+        position = self.position(book_id)
+        return None if position is None else self.books[position]
+    
+    def position(self, book_id: Any) -> Optional[int]:
+        """
+        Look up the record position of a book id
+        
+        Args:
+            book_id: Book identifier
+        
+        Returns:
+            Record position or None if not found
+        """
+        key = str(book_id)
+        if len(key) not in self.id_lengths:
+            return None
+        return self.by_id.get(key)
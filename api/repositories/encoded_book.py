@@ -0,0 +1,168 @@
+"""
+Encoded Book - Book record carrying its pre-encoded JSON fragment
+
+Repositories encode every record once when the catalog is loaded (or reuse
+the compact JSON already stored by the binary catalog and SQLite), so API
+responses can be assembled by joining fragments instead of re-serializing
+every book dictionary on every request. Field projections are compiled
+once and encode only the selected values.
+"""
+import re
+import json
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+
+def encode_book(book: Any) -> bytes:
+    """
+    Compact JSON encoding of a book record (or any JSON value)
+    
+    Same format as the records stored by the binary catalog and SQLite.
+    
+    Args:
+        book: Book dictionary
+    
+    Returns:
+        UTF-8 JSON bytes
+    """
+    return json.dumps(book, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class EncodedBook(dict):
+    """
+    Book dictionary with its compact JSON encoding attached
+    
+    Behaves as a plain dict everywhere; JSON responses write `fragment`
+    verbatim. Records are shared by every request: do not mutate.
+    """
+    
+    __slots__ = ('fragment',)
+    
+    def __init__(self, book: Dict[str, Any], fragment: Optional[bytes] = None):
+        """
+        Initialize record
+        
+        Args:
+            book: Book dictionary
+            fragment: Its encoding, if already available (encoded otherwise)
+        """
+        super().__init__(book)
+        self.fragment = fragment if fragment is not None else encode_book(book)
+    
+    @classmethod
+    def from_json(cls, raw: Union[bytes, str]) -> 'EncodedBook':
+        """
+        Decode a stored compact JSON record, keeping its bytes as the fragment
+        
+        Args:
+            raw: Compact JSON of one book (bytes or text)
+        
+        Returns:
+            New EncodedBook
+        """
+        fragment = raw.encode('utf-8') if isinstance(raw, str) else raw
+        return cls(json.loads(fragment), fragment)
+    
+    def __reduce__(self):
+        return EncodedBook, (dict(self), self.fragment)
+
+
+def _encode_string(value: str) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def _encode_number(value: Any) -> bytes:
+    return repr(value).encode('ascii') if math.isfinite(value) else encode_book(value)
+
+
+# Encoders for the JSON scalar types, picked by exact type (other values go through json.dumps)
+_VALUE_ENCODERS: Dict[type, Callable[[Any], bytes]] = {
+    str: _encode_string,
+    int: lambda value: str(value).encode('ascii'),
+    float: _encode_number,
+    bool: lambda value: b'true' if value else b'false',
+    type(None): lambda value: b'null'
+}
+
+
+class FieldProjection:
+    """
+    Compiled projection of book records onto a subset of fields
+    
+    The `"name":` prefix of every field is encoded once when the projection
+    is compiled; encoding a record then only encodes the selected values
+    (dispatched by type), without copying the record into a new dict.
+    Fields missing from a record are written as null.
+    """
+    
+    MAX_FIELDS = 50
+    FIELD_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+    
+    __slots__ = ('fields', '_prefixes')
+    
+    def __init__(self, fields: Sequence[str]):
+        """
+        Compile a projection (use FieldProjection.parse for client input)
+        
+        Args:
+            fields: Field names, in output order
+        """
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._prefixes = tuple(
+            (name, (b',' if index else b'{') + _encode_string(name) + b':')
+            for index, name in enumerate(self.fields)
+        )
+    
+    @classmethod
+    def parse(cls, fields: Optional[str]) -> Optional['FieldProjection']:
+        """
+        Parse and compile a comma-separated field list (compiled projections are reused)
+        
+        Args:
+            fields: e.g. 'id,title,price' (None or '' for every field)
+        
+        Returns:
+            FieldProjection in request order without duplicates, or None for every field
+        
+        Raises:
+            ValueError: If a name is not a valid field name or too many are requested
+        """
+        if not fields:
+            return None
+        
+        names = tuple(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+        for name in names:
+            if not cls.FIELD_PATTERN.match(name):
+                raise ValueError(f"Invalid field: {name}")
+        if len(names) > cls.MAX_FIELDS:
+            raise ValueError(f"Too many fields: {len(names)}. Maximum is {cls.MAX_FIELDS}")
+        return _compile_projection(names) if names else None
+    
+    def encode(self, book: Dict[str, Any]) -> bytes:
+        """
+        Compact JSON of the projected record
+        
+        Args:
+            book: Book dictionary
+        
+        Returns:
+            UTF-8 JSON bytes
+        """
+        parts = []
+        for name, prefix in self._prefixes:
+            value = book.get(name)
+            encoder = _VALUE_ENCODERS.get(type(value))
+            parts.append(prefix)
+            parts.append(encoder(value) if encoder is not None else encode_book(value))
+        parts.append(b'}')
+        return b''.join(parts)
+    
+    def __repr__(self) -> str:
+        return f"FieldProjection({','.join(self.fields)})"
+
+
+@lru_cache(maxsize=256)
+def _compile_projection(fields: Tuple[str, ...]) -> FieldProjection:
+    """Compile (or reuse) the projection for a field tuple"""
+    return FieldProjection(fields)
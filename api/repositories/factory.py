@@ -0,0 +1,41 @@
+"""
+Repository Factory - Builds the configured book repository
+
+Keeps the choice of data source (in-memory JSON or SQLite) out of routes
+and controllers (DIP).
+"""
+from api.repositories.base_repository import BaseBookRepository
+from api.repositories.book_repository import BookRepository
+from api.repositories.sqlite_book_repository import SqliteBookRepository
+
+BACKENDS = ('json', 'sqlite')
+
+
+def create_book_repository(
+    backend: str = 'json',
+    data_file: str = 'data/output/books.json',
+    database_url: str = 'sqlite:///bookstore.db'
+) -> BaseBookRepository:
+    """
+    Create the book repository for the configured backend
+    
+    Args:
+        backend: 'json' (in-memory snapshots of the scraped JSON) or 'sqlite'
+        data_file: Scraped JSON catalog
+        database_url: SQLite URL used by the 'sqlite' backend
+    
+    Returns:
+        Book repository instance
+    
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == 'json':
+        return BookRepository(data_file=data_file)
+    
+    if backend == 'sqlite':
+        return SqliteBookRepository(database_url=database_url, data_file=data_file)
+    
+    raise ValueError(
+        f"Invalid book repository backend: {backend}. Must be one of: {', '.join(BACKENDS)}"
+    )
@@ -0,0 +1,266 @@
+"""
+File Watcher - Background detection of data file changes
+
+Keeps filesystem checks off the request hot path: a daemon thread watches
+the data files (inotify on Linux, throttled stat() polling elsewhere) and
+invokes a callback when one of them changes.
+"""
+import os
+import sys
+import time
+import select
+import struct
+import logging
+import threading
+import ctypes
+import ctypes.util
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify constants (see <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+
+class FileWatcher:
+    """
+    Background watcher for one or more files
+    
+    Responsibilities:
+    - Detect file changes without per-request stat() calls
+    - Debounce bursts of filesystem events into a single callback
+    - Fall back to throttled polling when inotify is unavailable
+    """
+    
+    BACKENDS = ('auto', 'inotify', 'poll')
+    
+    def __init__(
+        self,
+        paths: List[str],
+        callback: Callable[[], None],
+        poll_interval: float = 2.0,
+        backend: str = 'auto',
+        debounce: float = 0.2
+    ):
+        """
+        Initialize the watcher
+        
+        Args:
+            paths: Files to watch (they do not need to exist yet)
+            callback: Function called (from the watcher thread) after a change
+            poll_interval: Seconds between stat() checks in polling mode
+            backend: 'auto' (inotify if available), 'inotify' or 'poll'
+            debounce: Seconds to wait for related events before calling back
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"Invalid watcher backend: {backend}. Must be one of: {', '.join(self.BACKENDS)}"
+            )
+        
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.callback = callback
+        self.poll_interval = max(0.1, poll_interval)
+        self.backend = backend
+        self.debounce = debounce
+        self.active_backend: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._watch_names: Dict[int, Set[bytes]] = {}  # inotify watch descriptor -> file names
+        self._watch_lost = False
+    
+    @property
+    def running(self) -> bool:
+        """Whether the watcher thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """
+        Start watching in a daemon thread (no-op if already running)
+        """
+        if self.running:
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='data-file-watcher', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the watcher thread
+        
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+    
+    def _run(self) -> None:
+        """
+        Watcher thread main loop (private method)
+        """
+        if self.backend in ('auto', 'inotify'):
+            inotify_fd = self._open_inotify()
+            if inotify_fd is not None:
+                self.active_backend = 'inotify'
+                logger.info(f"Watching {self.paths} for changes (inotify)")
+                try:
+                    self._watch_inotify(inotify_fd)
+                finally:
+                    os.close(inotify_fd)
+                
+                if self._stop_event.is_set():
+                    return
+                logger.warning("Watched directory removed, falling back to polling")
+            
+            if self.backend == 'inotify':
+                logger.warning("inotify not available, falling back to polling")
+        
+        self.active_backend = 'poll'
+        logger.info(f"Watching {self.paths} for changes (polling every {self.poll_interval}s)")
+        self._watch_poll()
+    
+    def _notify(self) -> None:
+        """
+        Invoke the callback, never letting it kill the watcher (private method)
+        """
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error(f"File watcher callback failed: {e}")
+    
+    def _stat_all(self) -> Dict[str, Optional[Tuple[int, int, int]]]:
+        """
+        Stat all watched files (private method)
+        
+        Returns:
+            Mapping path -> (mtime_ns, size, inode) or None if missing
+        """
+        signatures: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signatures[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except OSError:
+                signatures[path] = None
+        return signatures
+    
+    def _watch_poll(self) -> None:
+        """
+        Throttled stat() polling loop (private method)
+        """
+        last_signatures = self._stat_all()
+        
+        while not self._stop_event.wait(self.poll_interval):
+            signatures = self._stat_all()
+            if signatures != last_signatures:
+                last_signatures = signatures
+                self._notify()
+    
+    def _open_inotify(self) -> Optional[int]:
+        """
+        Create an inotify instance watching the parent directories (private method)
+        
+        Directories are watched instead of the files themselves so that
+        atomic replacements (write to temp file + rename) are detected.
+        
+        Returns:
+            inotify file descriptor, or None if inotify is unavailable
+        """
+        if not sys.platform.startswith('linux'):
+            return None
+        
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            logger.debug(f"inotify unavailable: {e}")
+            return None
+        
+        if fd < 0:
+            return None
+        
+        self._watch_names = {}
+        self._watch_lost = False
+        for directory in sorted({os.path.dirname(path) for path in self.paths}):
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                # Directory missing or not watchable: polling can cope with that
+                logger.debug(f"Cannot watch {directory} with inotify (errno {ctypes.get_errno()})")
+                os.close(fd)
+                return None
+            self._watch_names[wd] = {
+                os.fsencode(os.path.basename(path)) for path in self.paths
+                if os.path.dirname(path) == directory
+            }
+        
+        return fd
+    
+    def _read_events(self, fd: int) -> bool:
+        """
+        Drain pending inotify events (private method)
+        
+        Args:
+            fd: inotify file descriptor
+        
+        Returns:
+            True if any event concerns a watched file
+        """
+        relevant = False
+        
+        while True:
+            try:
+                buffer = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+            
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+                
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    relevant = True  # Watched directory went away
+                    self._watch_lost = True
+                elif name in self._watch_names.get(wd, ()):
+                    relevant = True
+        
+        return relevant
+    
+    def _watch_inotify(self, fd: int) -> None:
+        """
+        inotify event loop (private method)
+        
+        Args:
+            fd: inotify file descriptor
+        """
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([fd], [], [], 1.0)
+            if not ready or not self._read_events(fd):
+                continue
+            
+            # Debounce: coalesce the burst of events produced by a single write
+            deadline = time.monotonic() + self.debounce
+            while time.monotonic() < deadline and not self._stop_event.is_set():
+                ready, _, _ = select.select([fd], [], [], max(0.0, deadline - time.monotonic()))
+                if ready:
+                    self._read_events(fd)
+            
+            self._notify()
+            
+            if self._watch_lost:
+                return
@@ -0,0 +1,387 @@
+"""
+Query Planner - Chooses the access path for in-memory catalog queries
+
+One planner is built per catalog snapshot over the snapshot indexes, which
+also provide its selectivity statistics (sorted-index range counts,
+category posting-list sizes). For
+each query it picks one of three strategies:
+
+- index_scan: walk the presorted permutation (or catalog order) chunk by
+  chunk, evaluating filters as it goes, and stop once the page is filled
+- sort_matches: collect every match through the indexes first, then order
+  the (few) matches by their precomputed rank
+- bitmap_walk: collect every match into a bitmap, then walk the presorted
+  permutation and keep the members (many matches, no sorting needed)
+"""
+import math
+from typing import Optional, Tuple
+import numpy as np
+from api.repositories.book_query import BookQuery
+from api.repositories.catalog_columns import CatalogColumns, Rows
+
+
+class QueryPlan:
+    """
+    Strategy chosen for a query, with the estimate that led to it
+    """
+    
+    INDEX_SCAN = 'index_scan'
+    SORT_MATCHES = 'sort_matches'
+    BITMAP_WALK = 'bitmap_walk'
+    
+    __slots__ = ('strategy', 'estimated_matches')
+    
+    def __init__(self, strategy: str, estimated_matches: float):
+        self.strategy = strategy
+        self.estimated_matches = estimated_matches
+    
+    def __repr__(self) -> str:
+        return (
+            f"QueryPlan(strategy={self.strategy!r}, "
+            f"estimated_matches={self.estimated_matches:.0f})"
+        )
+
+
+class QueryPlanner:
+    """
+    Planner and executor for filtered, sorted queries over one snapshot
+    
+    Responsibilities:
+    - Evaluate filters (range indexes first, then text/category masks)
+    - Estimate how many records a query matches
+    - Pick the cheapest strategy for the requested window and run it
+    """
+    
+    # Records evaluated by the first pass of an index scan
+    SCAN_CHUNK = 4096
+    
+    # Assumed fraction of books matching a substring filter (no statistics for text)
+    TEXT_SELECTIVITY = 0.1
+    
+    def __init__(self, columns: CatalogColumns):
+        """
+        Initialize planner and its statistics
+        
+        Args:
+            columns: Snapshot columns (with sorted indexes)
+        """
+        self.columns = columns
+        self.size = columns.size
+    
+    def estimate(self, query: BookQuery) -> float:
+        """
+        Estimate the number of matching records
+        
+        Range and category selectivities are exact (index counts and
+        category sizes); filters are assumed independent.
+        
+        Args:
+            query: Filters
+        
+        Returns:
+            Estimated number of matches
+        """
+        if not self.size:
+            return 0.0
+        
+        selectivity = 1.0
+        for name, bounds in query.ranges.items():
+            selectivity *= self.columns.indexes[name].count(*bounds) / self.size
+        
+        if query.category:
+            selectivity *= self.columns.category_size(query.category) / self.size
+        
+        if query.search and not query.ranked:
+            selectivity *= self.TEXT_SELECTIVITY
+        
+        if query.title:
+            selectivity *= self.TEXT_SELECTIVITY
+        
+        return selectivity * self.size
+    
+    def plan(self, query: BookQuery, start: int, needed: int) -> QueryPlan:
+        """
+        Choose how to produce `needed` matches from rank `start` on
+        
+        The cost of an index scan is the number of records it must walk
+        to fill the page; collecting costs the records the filters are
+        evaluated on (the most selective range index narrows them) plus
+        ordering the matches.
+        
+        Args:
+            query: Filters and sort
+            start: First rank of the window
+            needed: Number of matches wanted
+        
+        Returns:
+            Chosen QueryPlan
+        """
+        estimated = self.estimate(query)
+        if not query.has_filters:
+            return QueryPlan(QueryPlan.INDEX_SCAN, estimated)
+        
+        density = max(estimated, 1.0) / max(self.size, 1)
+        scan_cost = min(self.size - start, needed / density)
+        
+        collect_cost = self._candidate_count(query)
+        if query.sort_field:
+            collect_cost += estimated * math.log2(estimated + 2)
+        
+        if scan_cost <= collect_cost:
+            return QueryPlan(QueryPlan.INDEX_SCAN, estimated)
+        return QueryPlan(self._collect_strategy(estimated), estimated)
+    
+    def mask(self, query: BookQuery, rows: Rows = slice(None)) -> np.ndarray:
+        """
+        Evaluate the column filters of a query over some records
+        
+        The search term is skipped in ranked mode (the search index handles it).
+        
+        Args:
+            query: Filters
+            rows: Records to evaluate (range or positions; all by default)
+        
+        Returns:
+            Boolean mask aligned with rows
+        """
+        columns = self.columns
+        ranges = query.ranges
+        if ranges:
+            mask = columns.range_mask(ranges, rows)
+        else:
+            mask = np.ones(len(columns.price[rows]), dtype=bool)
+        
+        if query.search and not query.ranked:
+            mask &= columns.text_mask(query.search, include_authors=True, rows=rows)
+        
+        if query.title:
+            mask &= columns.text_mask(query.title, rows=rows)
+        
+        if query.category:
+            mask &= columns.category_mask(query.category, rows=rows)
+        
+        return mask
+    
+    def matches(self, query: BookQuery) -> np.ndarray:
+        """
+        Positions of all records matching the filters, in catalog order
+        
+        Candidates come from the most selective index (category posting
+        list or sorted range index); the remaining filters only run on them.
+        
+        Args:
+            query: Filters
+        
+        Returns:
+            Matching positions
+        """
+        columns = self.columns
+        ranges = query.ranges
+        text = query.title or (query.search and not query.ranked)
+        
+        if query.category and columns.category_size(query.category) == self._candidate_count(query):
+            positions = columns.category_positions(query.category)
+            if len(positions) and (ranges or text):
+                positions = positions[self.mask(query, positions)]
+            return positions
+        
+        if not ranges:
+            return np.flatnonzero(self.mask(query))
+        
+        positions = columns.range_candidates(ranges)
+        if text or query.category:
+            positions = positions[self.mask(query, positions)]
+        return positions
+    
+    def page(
+        self,
+        query: BookQuery,
+        offset: int,
+        limit: Optional[int],
+        candidates: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Window of a page/limit query, with the total number of matches
+        
+        Args:
+            query: Filters and sort
+            offset: Matches to skip
+            limit: Window size (None for all)
+            candidates: Precomputed matches (e.g. a ranked search), in their own order
+        
+        Returns:
+            Tuple (positions in the window, total number of matches)
+        """
+        end = None if limit is None else offset + limit
+        order = self._order(query)
+        
+        if candidates is None and not query.has_filters:
+            if order is None:
+                stop = self.size if end is None else min(end, self.size)
+                return np.arange(offset, stop), self.size
+            return order[offset:end], self.size
+        
+        # The total needs every match anyway: collect, then order
+        matches = candidates if candidates is not None else self.matches(query)
+        if order is None:
+            return matches[offset:end], len(matches)
+        
+        return self._ordered(matches, order, query, offset, end), len(matches)
+    
+    def next(
+        self,
+        query: BookQuery,
+        start: int,
+        needed: int,
+        candidates: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Up to `needed` matches from rank `start` on (keyset pagination)
+        
+        Ranks index the sort order: catalog positions when unsorted,
+        positions in the presorted permutation otherwise.
+        
+        Args:
+            query: Filters and sort
+            start: First rank to consider
+            needed: Number of matches wanted
+            candidates: Precomputed matches (e.g. a ranked search)
+        
+        Returns:
+            Tuple (positions, their ranks), in order
+        """
+        order = self._order(query)
+        
+        if candidates is None:
+            plan = self.plan(query, start, needed)
+            if plan.strategy == QueryPlan.INDEX_SCAN:
+                ranks = self._scan(query, order, start, needed)
+                return (ranks if order is None else order[ranks]), ranks
+            candidates = self.matches(query)
+        
+        if order is None:
+            candidates = candidates[candidates >= start]
+            return candidates[:needed], candidates[:needed]
+        
+        if self._collect_strategy(len(candidates)) == QueryPlan.BITMAP_WALK:
+            member = np.zeros(self.size, dtype=bool)
+            member[candidates] = True
+            ranks = np.flatnonzero(member[order[start:]])[:needed] + start
+            return order[ranks], ranks
+        
+        ranks = self.columns.sort_rank(query.sort_field, query.sort_descending)[candidates]
+        keep = ranks >= start
+        candidates, ranks = candidates[keep], ranks[keep]
+        first = np.argsort(ranks, kind='stable')[:needed]
+        return candidates[first], ranks[first]
+    
+    def _scan(
+        self,
+        query: BookQuery,
+        order: Optional[np.ndarray],
+        start: int,
+        needed: int
+    ) -> np.ndarray:
+        """
+        Walk the sort order from `start`, filtering chunk by chunk (private method)
+        
+        Chunks grow geometrically: sparse filters need few passes, dense
+        ones stop early.
+        
+        Args:
+            query: Filters
+            order: Presorted permutation (None for catalog order)
+            start: First rank
+            needed: Number of matches wanted
+        
+        Returns:
+            Ranks of the first `needed` matches
+        """
+        if not query.has_filters:
+            return np.arange(start, min(start + needed, self.size))
+        
+        found = []
+        count = 0
+        chunk = max(4 * needed, self.SCAN_CHUNK)
+        while start < self.size and count < needed:
+            stop = min(start + chunk, self.size)
+            rows = slice(start, stop) if order is None else order[start:stop]
+            hits = np.flatnonzero(self.mask(query, rows)) + start
+            found.append(hits)
+            count += len(hits)
+            start, chunk = stop, chunk * 2
+        
+        return np.concatenate(found)[:needed] if found else np.empty(0, dtype=np.int64)
+    
+    def _ordered(
+        self,
+        matches: np.ndarray,
+        order: np.ndarray,
+        query: BookQuery,
+        offset: int,
+        end: Optional[int]
+    ) -> np.ndarray:
+        """
+        Order collected matches and cut the window (private method)
+        
+        Args:
+            matches: Matching positions
+            order: Presorted permutation
+            query: Sort
+            offset: Matches to skip
+            end: End of the window (None for all)
+        
+        Returns:
+            Positions in the window, in sort order
+        """
+        if self._collect_strategy(len(matches)) == QueryPlan.SORT_MATCHES:
+            rank = self.columns.sort_rank(query.sort_field, query.sort_descending)
+            return matches[np.argsort(rank[matches], kind='stable')][offset:end]
+        
+        member = np.zeros(self.size, dtype=bool)
+        member[matches] = True
+        return order[np.flatnonzero(member[order])[offset:end]]
+    
+    def _candidate_count(self, query: BookQuery) -> int:
+        """
+        Records the most selective index leaves to filter (private method)
+        
+        Args:
+            query: Filters
+        
+        Returns:
+            Smallest category or range-index count (catalog size without either)
+        """
+        indexes = self.columns.indexes
+        counts = [indexes[name].count(*bounds) for name, bounds in query.ranges.items()]
+        if query.category:
+            counts.append(self.columns.category_size(query.category))
+        return min(counts) if counts else self.size
+    
+    def _collect_strategy(self, matches: float) -> str:
+        """
+        Sort few matches by rank, or walk the permutation with a bitmap for many (private method)
+        
+        Args:
+            matches: (Estimated) number of matches
+        
+        Returns:
+            QueryPlan.SORT_MATCHES or QueryPlan.BITMAP_WALK
+        """
+        if matches * math.log2(matches + 2) <= self.size:
+            return QueryPlan.SORT_MATCHES
+        return QueryPlan.BITMAP_WALK
+    
+    def _order(self, query: BookQuery) -> Optional[np.ndarray]:
+        """
+        Presorted permutation for the query sort (private method)
+        
+        Args:
+            query: Sort
+        
+        Returns:
+            Permutation, or None for catalog order
+        """
+        if not query.sort_field:
+            return None
+        return self.columns.sort_order(query.sort_field, query.sort_descending)
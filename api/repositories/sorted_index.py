@@ -0,0 +1,82 @@
+"""
+Sorted Index - Secondary index answering range filters by binary search
+
+Built once per catalog snapshot for a numeric column: the record positions
+ordered by value, plus the sorted values themselves. A range lookup is two
+binary searches; only the matching positions are touched.
+"""
+from typing import Optional, Tuple
+import numpy as np
+
+
+class SortedIndex:
+    """
+    Value-ordered permutation of a column
+    
+    Responsibilities:
+    - Locate the records whose value falls in a range (binary search)
+    - Count them without materializing positions (selectivity estimates)
+    """
+    
+    __slots__ = ('order', 'values')
+    
+    def __init__(self, column: np.ndarray):
+        """
+        Build the index
+        
+        Args:
+            column: Column values, one per record position
+        """
+        dtype = np.int32 if len(column) < 2 ** 31 else np.int64
+        order = np.argsort(column, kind='stable').astype(dtype)
+        self.order = order
+        self.values = column[order]
+        self.order.flags.writeable = False
+        self.values.flags.writeable = False
+    
+    def bounds(self, low: Optional[float] = None, high: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Locate a range in the sorted values
+        
+        Args:
+            low: Inclusive lower bound (None for unbounded)
+            high: Inclusive upper bound (None for unbounded)
+        
+        Returns:
+            Tuple (start, stop) into `order`
+        """
+        start = 0
+        if low is not None:
+            start = int(np.searchsorted(self.values, low, side='left'))
+        stop = len(self.values)
+        if high is not None:
+            stop = int(np.searchsorted(self.values, high, side='right'))
+        return start, max(start, stop)
+    
+    def count(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """
+        Count the records in a range
+        
+        Args:
+            low: Inclusive lower bound (None for unbounded)
+            high: Inclusive upper bound (None for unbounded)
+        
+        Returns:
+            Number of matching records
+        """
+        start, stop = self.bounds(low, high)
+        return stop - start
+    
+    def positions(self, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """
+        Record positions in a range
+        
+        Args:
+            low: Inclusive lower bound (None for unbounded)
+            high: Inclusive upper bound (None for unbounded)
+        
+        Returns:
+            Matching positions, in value order (view, do not modify)
+        """
+        start, stop = self.bounds(low, high)
+        return self.order[start:stop]
@@ -0,0 +1,752 @@
+"""
+SQLite Book Repository - Book data access backed by the configured DATABASE_URL
+
+Same contract as BookRepository, but filtering, pagination and aggregates
+are pushed down into SQL so per-worker memory stays flat as the catalog
+grows. The database runs in WAL mode: readers keep working (and keep a
+consistent view) while a scrape imports new data in a single transaction.
+Ranked search uses an FTS5 table kept in the same transaction as the books.
+"""
+import os
+import json
+import sqlite3
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from api.repositories.base_repository import BaseBookRepository, DEFAULT_BOOKS, ResumeKey
+from api.repositories.book_query import BookQuery
+from api.repositories.catalog_columns import CatalogColumns
+from api.repositories.encoded_book import EncodedBook
+from api.repositories.file_watcher import FileWatcher
+from api.search import tokenize
+from scraper.binary_catalog import compute_version, to_float, to_int
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    position        INTEGER PRIMARY KEY,
+    id              TEXT NOT NULL,
+    title_lower     TEXT NOT NULL,
+    author_lower    TEXT NOT NULL,
+    category        TEXT NOT NULL,
+    category_folded TEXT NOT NULL,
+    price           REAL NOT NULL,
+    rating          INTEGER NOT NULL,
+    availability    INTEGER NOT NULL,
+    in_stock        INTEGER NOT NULL,
+    data            TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_books_id ON books (id);
+CREATE INDEX IF NOT EXISTS idx_books_category ON books (category_folded);
+CREATE INDEX IF NOT EXISTS idx_books_price ON books (price);
+CREATE INDEX IF NOT EXISTS idx_books_rating ON books (rating);
+CREATE INDEX IF NOT EXISTS idx_books_availability ON books (availability);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books (title_lower);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5 (
+    title, author, description,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Same field weights as the in-memory SearchIndex (title, author, description)
+FTS_RANK = 'bm25(books_fts, 3.0, 2.0, 1.0)'
+
+# Sort field -> column (titles compare lower-cased, like the in-memory sort)
+SORT_COLUMNS = {'price': 'price', 'rating': 'rating', 'title': 'title_lower'}
+
+
+def sqlite_path_from_url(database_url: str) -> str:
+    """
+    Extract the database file path from a SQLAlchemy-style URL
+    
+    Args:
+        database_url: URL such as sqlite:///bookstore.db or sqlite:////abs/path.db
+    
+    Returns:
+        Database file path
+    
+    Raises:
+        ValueError: If the URL is not a file-based sqlite URL
+    """
+    prefix = 'sqlite:///'
+    if not database_url.startswith(prefix):
+        raise ValueError(f"Unsupported DATABASE_URL: {database_url}. Expected sqlite:///<path>")
+    
+    path = database_url[len(prefix):]
+    if not path or path == ':memory:':
+        raise ValueError(
+            "In-memory SQLite databases are not supported (each thread would get its own)"
+        )
+    return path
+
+
+def _like_pattern(term: str) -> str:
+    """Build a LIKE pattern matching term as a literal substring"""
+    escaped = term.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _fts_query(search: str) -> Optional[str]:
+    """Build an FTS5 MATCH expression (all tokens, last one as a prefix)"""
+    tokens = tokenize(search)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' AND '.join(terms)
+
+
+class SqliteBookRepository(BaseBookRepository):
+    """
+    Repository for book data access backed by SQLite
+    
+    Responsibilities:
+    - Import the scraped JSON catalog into SQLite (one transaction per import)
+    - Answer queries with indexed SQL (id, category, price, rating, availability)
+    - Rank full-text searches with FTS5 (BM25)
+    - Return records with their stored JSON as the response fragment
+    - Report the version of the imported data
+    """
+    
+    # Bound parameters per IN (...) lookup (below SQLite's default limit)
+    MAX_PARAMETERS = 500
+    
+    def __init__(
+        self,
+        database_url: str = 'sqlite:///bookstore.db',
+        data_file: str = 'data/output/books.json'
+    ):
+        """
+        Initialize repository
+        
+        Args:
+            database_url: SQLite URL (sqlite:///<path>)
+            data_file: JSON file imported on reload
+        """
+        self.database_path = sqlite_path_from_url(database_url)
+        self.data_file = data_file
+        self._local = threading.local()  # One connection per thread
+        self._import_lock = threading.Lock()
+        self._initialized = False
+        self._checked_mtime: Optional[float] = None  # Data file mtime at the last freshness check
+        self._check_lock = threading.Lock()
+        self._watcher: Optional[FileWatcher] = None
+        
+        directory = os.path.dirname(os.path.abspath(self.database_path))
+        os.makedirs(directory, exist_ok=True)
+        
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._backfill_search(conn)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection (private method)
+        
+        Returns:
+            sqlite3 connection in autocommit mode
+        """
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path, isolation_level=None, timeout=30)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = conn
+        return conn
+    
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run several statements against one consistent database snapshot (private method)
+        
+        In WAL mode a read transaction sees the data as of its first
+        statement, even if an import commits meanwhile.
+        
+        Yields:
+            sqlite3 connection inside a read transaction
+        """
+        self._ensure_loaded()
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn  # Nested use: already inside a read transaction
+            return
+        
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            conn.execute('COMMIT')
+    
+    def _backfill_search(self, conn: sqlite3.Connection) -> None:
+        """
+        Index books imported before the FTS table existed (private method)
+        
+        Args:
+            conn: Connection to use
+        """
+        has_books = conn.execute('SELECT 1 FROM books LIMIT 1').fetchone()
+        has_index = conn.execute('SELECT 1 FROM books_fts LIMIT 1').fetchone()
+        if has_books and not has_index:
+            conn.execute(
+                "INSERT INTO books_fts (rowid, title, author, description) "
+                "SELECT position, json_extract(data, '$.title'), json_extract(data, '$.author'), "
+                "json_extract(data, '$.description') FROM books"
+            )
+    
+    def _ensure_loaded(self) -> None:
+        """
+        Import the JSON catalog if the database is empty or the data file
+        changed since it was imported (private method)
+        
+        Like BookRepository's mtime check: without the background watcher,
+        each read costs one stat() of the data file, and only a changed
+        mtime leads to an import (skipped when the content is unchanged).
+        With the watcher, or inside a read transaction (consistent_view),
+        nothing is checked. While another thread imports, readers keep
+        reading the previous catalog instead of waiting.
+        """
+        if self._initialized and (self.watching or self._connection().in_transaction):
+            return
+        
+        mtime = self._data_mtime()
+        if self._initialized and mtime == self._checked_mtime:
+            return
+        
+        if not self._check_lock.acquire(blocking=not self._initialized):
+            return
+        try:
+            conn = self._connection()
+            meta = dict(conn.execute(
+                "SELECT key, value FROM catalog_meta WHERE key IN ('version', 'source_mtime')"
+            ).fetchall())
+            imported = meta.get('source_mtime')
+            changed = mtime is not None and (imported is None or float(imported) != mtime)
+            if 'version' not in meta or changed:
+                self.reload()
+            self._checked_mtime = mtime
+            self._initialized = True
+        finally:
+            self._check_lock.release()
+    
+    def _data_mtime(self) -> Optional[float]:
+        """
+        Modification time of the JSON data file (private method)
+        
+        Returns:
+            mtime, or None if the file does not exist
+        """
+        try:
+            return os.path.getmtime(self.data_file)
+        except OSError:
+            return None
+    
+    @contextmanager
+    def consistent_view(self) -> Iterator[None]:
+        """
+        Run every read of the calling thread inside one read transaction
+        
+        All reads in the block (version included) see the same database
+        snapshot, even if an import commits meanwhile. Nested use joins the
+        outer transaction.
+        """
+        with self._read() as conn:
+            # BEGIN is deferred: read once so the snapshot is taken on entry
+            conn.execute("SELECT 1 FROM catalog_meta LIMIT 1").fetchone()
+            yield
+    
+    @property
+    def version(self) -> str:
+        """
+        Version id of the imported data
+        
+        Returns:
+            Version string (content hash of the imported JSON file)
+        """
+        self._ensure_loaded()
+        row = self._connection().execute(
+            "SELECT value FROM catalog_meta WHERE key = 'version'"
+        ).fetchone()
+        return row[0] if row else 'default'
+    
+    @property
+    def loaded_at(self) -> float:
+        """
+        Unix time at which the current catalog was imported
+        
+        Returns:
+            Import timestamp (0.0 for databases imported before it was recorded)
+        """
+        self._ensure_loaded()
+        row = self._connection().execute(
+            "SELECT value FROM catalog_meta WHERE key = 'imported_at'"
+        ).fetchone()
+        return float(row[0]) if row else 0.0
+    
+    @property
+    def last_modified(self) -> float:
+        """
+        Unix time at which the imported JSON file was last modified
+        
+        Returns:
+            Source mtime recorded at import (the import time for demo books
+            and for databases imported before it was recorded)
+        """
+        self._ensure_loaded()
+        row = self._connection().execute(
+            "SELECT value FROM catalog_meta WHERE key = 'source_mtime'"
+        ).fetchone()
+        return float(row[0]) if row else self.loaded_at
+    
+    def find_all(self) -> Sequence[Dict[str, Any]]:
+        """
+        Retrieve all books (materializes the whole catalog; prefer find_page)
+        
+        Returns:
+            List of book dictionaries
+        """
+        with self._read() as conn:
+            rows = conn.execute('SELECT data FROM books ORDER BY position').fetchall()
+        return [EncodedBook.from_json(data) for (data,) in rows]
+    
+    def iter_books(self, chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all books inside one read transaction
+        
+        Rows are fetched chunk_size at a time, so memory stays constant;
+        an import committing meanwhile is not seen by the iteration.
+        
+        Args:
+            chunk_size: Rows fetched per round trip
+        
+        Yields:
+            Book records in catalog order
+        """
+        with self._read() as conn:
+            cursor = conn.execute('SELECT data FROM books ORDER BY position')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for (data,) in rows:
+                    yield EncodedBook.from_json(data)
+    
+    def find_by_id(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a specific book by ID (indexed lookup)
+        
+        Args:
+            book_id: Book identifier (UUID4 string)
+        
+        Returns:
+            Book dictionary or None if not found
+        """
+        with self._read() as conn:
+            row = conn.execute(
+                'SELECT data FROM books WHERE id = ? ORDER BY position LIMIT 1', (str(book_id),)
+            ).fetchone()
+        return EncodedBook.from_json(row[0]) if row else None
+    
+    def _where(self, query: BookQuery) -> Tuple[str, List[Any]]:
+        """
+        Translate query filters into a WHERE clause (private method)
+        
+        Args:
+            query: Filters
+        
+        Returns:
+            Tuple (SQL clause, parameters)
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        
+        if query.ranked:
+            clauses.append('books_fts MATCH ?')
+            params.append(_fts_query(query.search))
+        elif query.search:
+            clauses.append("(title_lower LIKE ? ESCAPE '\\' OR author_lower LIKE ? ESCAPE '\\')")
+            params.extend([_like_pattern(query.search)] * 2)
+        
+        if query.title:
+            clauses.append("title_lower LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(query.title))
+        
+        if query.category:
+            clauses.append('category_folded = ?')
+            params.append(query.category.casefold())
+        
+        for column, (low, high) in query.ranges.items():
+            if low is not None:
+                clauses.append(f'{column} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{column} <= ?')
+                params.append(high)
+        
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+    
+    def _source_and_order(self, query: BookQuery) -> Tuple[str, str]:
+        """
+        FROM source and ORDER BY clause of a query (private method)
+        
+        Ties always fall back to catalog order, like the in-memory repository.
+        
+        Args:
+            query: Search mode and sort
+        
+        Returns:
+            Tuple (source, order)
+        """
+        source, order = 'books', 'position'
+        if query.ranked:
+            source = 'books_fts JOIN books ON books.position = books_fts.rowid'
+            order = f'{FTS_RANK}, position'
+        
+        if query.sort_field:
+            column = SORT_COLUMNS[query.sort_field]
+            order = f"{column} {'DESC' if query.sort_descending else 'ASC'}, position"
+        
+        return source, order
+    
+    def find_by_ids(self, book_ids: Sequence[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Find several books by ID with indexed IN lookups, in one read transaction
+        
+        Args:
+            book_ids: Book identifiers
+        
+        Returns:
+            Tuple (found books in request order, ids that were not found)
+        """
+        keys = list(dict.fromkeys(str(book_id) for book_id in book_ids))
+        found: Dict[str, str] = {}
+        with self._read() as conn:
+            for start in range(0, len(keys), self.MAX_PARAMETERS):
+                chunk = keys[start:start + self.MAX_PARAMETERS]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT id, data FROM books WHERE id IN ({placeholders}) "
+                    "ORDER BY position DESC",
+                    chunk
+                ).fetchall()
+                found.update(rows)  # Descending: the first position wins for duplicate ids
+        
+        books, missing = [], []
+        for book_id in book_ids:
+            data = found.get(str(book_id))
+            if data is None:
+                missing.append(book_id)
+            else:
+                books.append(EncodedBook.from_json(data))
+        return books, missing
+    
+    def find_page(self, query: BookQuery) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Find the books matching a query (filtering, sorting and pagination in SQL)
+        
+        Args:
+            query: Filters, sort and window
+        
+        Returns:
+            Tuple (books in the requested window, total number of matches)
+        """
+        if query.ranked and _fts_query(query.search) is None:
+            return [], 0  # Nothing searchable in the term (e.g. only punctuation)
+        
+        where, params = self._where(query)
+        limit = -1 if query.limit is None else query.limit
+        source, order = self._source_and_order(query)
+        
+        with self._read() as conn:
+            total = conn.execute(f'SELECT COUNT(*) FROM {source}{where}', params).fetchone()[0]
+            rows = conn.execute(
+                f'SELECT data FROM {source}{where} ORDER BY {order} LIMIT ? OFFSET ?',
+                params + [limit, query.offset]
+            ).fetchall()
+        
+        return [EncodedBook.from_json(data) for (data,) in rows], total
+    
+    def find_next(self, query: BookQuery) -> Tuple[List[Dict[str, Any]], Optional[ResumeKey], str]:
+        """
+        Find the next page of matches after query.after (keyset pagination)
+        
+        In catalog order the resume key is the position of the last returned
+        book, so the page is read straight from the primary key index. For
+        sorted queries the key is [sort value, position] of the last returned
+        book and the page seeks past it on the column index; for ranked
+        searches it is [BM25 score, position]. No skipped rows are read.
+        
+        Args:
+            query: Filters, sort, resume key and limit
+        
+        Returns:
+            Tuple (books, resume key for the following page or None, data version)
+        
+        Raises:
+            ValueError: If the resume key does not fit the query
+        """
+        limit = query.limit
+        fetch = -1 if limit is None else limit + 1  # One extra row tells whether more follow
+        
+        with self._read() as conn:
+            version = conn.execute(
+                "SELECT value FROM catalog_meta WHERE key = 'version'"
+            ).fetchone()
+            version = version[0] if version else 'default'
+            
+            if query.ranked and _fts_query(query.search) is None:
+                return [], None, version
+            
+            where, params = self._where(query)
+            source, order = self._source_and_order(query)
+            key_column = self._key_column(query)
+            if query.after is not None:
+                seek, seek_params = self._seek(query, key_column)
+                where += f' AND {seek}' if where else f' WHERE {seek}'
+                params += seek_params
+            rows = conn.execute(
+                f'SELECT data, position, {key_column or "position"} FROM {source}{where} '
+                f'ORDER BY {order} LIMIT ?',
+                params + [fetch]
+            ).fetchall()
+        
+        books = [EncodedBook.from_json(data) for data, _, _ in rows[:limit]]
+        next_key = None
+        if limit is not None and len(rows) > limit:
+            _, position, value = rows[limit - 1]
+            next_key = position if key_column is None else [value, position]
+        return books, next_key, version
+    
+    @staticmethod
+    def _key_column(query: BookQuery) -> Optional[str]:
+        """Expression ordering a query before position (None in catalog order) (private method)"""
+        if query.sort_field:
+            return SORT_COLUMNS[query.sort_field]
+        if query.ranked:
+            return FTS_RANK
+        return None
+    
+    @staticmethod
+    def _seek(query: BookQuery, key_column: Optional[str]) -> Tuple[str, List[Any]]:
+        """
+        Predicate keeping the rows ordered after the resume key (private method)
+        
+        `column >= value` bounds the index range; the OR only sorts out ties
+        by position.
+        
+        Args:
+            query: Query with its resume key
+            key_column: Expression ordering the query before position
+        
+        Returns:
+            Tuple (SQL predicate, parameters)
+        
+        Raises:
+            ValueError: If the resume key does not fit the query
+        """
+        if key_column is None:
+            if not isinstance(query.after, int):
+                raise ValueError("Invalid cursor: it does not match this query")
+            return 'position > ?', [query.after]
+        
+        if not isinstance(query.after, list):
+            raise ValueError("Invalid cursor: it does not match this query")
+        value, position = query.after
+        # Descending sorts seek smaller values; ascending sorts and BM25 scores
+        # (lower is better) seek larger ones
+        after = '<' if query.sort_field and query.sort_descending else '>'
+        return (
+            f'{key_column} {after}= ? AND ({key_column} {after} ? OR position > ?)',
+            [value, value, position]
+        )
+    
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Catalog aggregates (computed once at import time and stored with the catalog)
+        
+        Returns:
+            Dictionary with total, average_price, category_counts, price_stats
+            and rating_distribution
+        """
+        with self._read() as conn:
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'statistics'").fetchone()
+            if row is not None:
+                return json.loads(row[0])
+            
+            # Database imported before aggregates were stored: compute them from the columns
+            rows = conn.execute(
+                'SELECT price, rating, category FROM books ORDER BY position'
+            ).fetchall()
+        
+        return CatalogColumns.from_records([
+            {'price': price, 'rating': rating, 'category': category}
+            for price, rating, category in rows
+        ]).summary()
+    
+    def count(self) -> int:
+        """
+        Count total number of books
+        
+        Returns:
+            Total book count
+        """
+        with self._read() as conn:
+            return conn.execute('SELECT COUNT(*) FROM books').fetchone()[0]
+    
+    def reload(self) -> bool:
+        """
+        Import the JSON data file into the database if it changed
+        
+        The import runs in one write transaction; thanks to WAL, concurrent
+        readers keep seeing the previous catalog until it commits. Workers
+        sharing the database skip the import when the version is unchanged.
+        
+        Returns:
+            True if new data was imported
+        """
+        try:
+            if os.path.exists(self.data_file):
+                # Record the mtime before reading, like BookRepository
+                source_mtime = os.path.getmtime(self.data_file)
+                with open(self.data_file, 'rb') as f:
+                    content = f.read()
+                books = json.loads(content)
+                version = compute_version(content)
+            else:
+                # Keep an existing catalog, seed an empty database with demo books
+                logger.warning(f"Data file {self.data_file} not found")
+                books, version, source_mtime = [dict(book) for book in DEFAULT_BOOKS], None, None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error loading books from {self.data_file}: {e}")
+            return False
+        
+        with self._import_lock:
+            return self.import_books(books, version, source_mtime)
+    
+    def import_books(
+        self,
+        books: List[Dict[str, Any]],
+        version: Optional[str],
+        source_mtime: Optional[float] = None
+    ) -> bool:
+        """
+        Replace the catalog with the given books in a single transaction
+        
+        Args:
+            books: Book dictionaries
+            version: Version id of the data (None keeps an existing catalog)
+            source_mtime: Modification time of the imported file (Last-Modified
+                of read endpoints; None uses the import time)
+        
+        Returns:
+            True if the catalog was replaced
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()
+            current_version = row[0] if row else None
+            
+            if version is None and current_version is not None:
+                conn.execute('COMMIT')
+                return False  # No versioned data: keep what was imported before
+            
+            if version is not None and version == current_version:
+                # Touched but unchanged: record the mtime so readers skip the next check
+                if source_mtime is not None:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)',
+                        ('source_mtime', repr(source_mtime))
+                    )
+                conn.execute('COMMIT')
+                return False
+            
+            conn.execute('DELETE FROM books')
+            conn.execute('DELETE FROM books_fts')
+            conn.execute("DELETE FROM catalog_meta WHERE key = 'source_mtime'")
+            conn.executemany(
+                'INSERT INTO books (position, id, title_lower, author_lower, category, '
+                'category_folded, price, rating, availability, in_stock, data) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    (
+                        position,
+                        str(book.get('id', '')),
+                        str(book.get('title', '')).lower(),
+                        str(book.get('author', '')).lower(),
+                        book.get('category', 'General'),
+                        str(book.get('category', 'General')).casefold(),
+                        to_float(book.get('price', 0)),
+                        to_int(book.get('rating', 0)),
+                        to_int(book.get('availability', 0)),
+                        int(bool(book.get('in_stock', False))),
+                        json.dumps(book, ensure_ascii=False, separators=(',', ':'))
+                    )
+                    for position, book in enumerate(books)
+                )
+            )
+            conn.executemany(
+                'INSERT INTO books_fts (rowid, title, author, description) VALUES (?, ?, ?, ?)',
+                (
+                    (
+                        position,
+                        str(book.get('title') or ''),
+                        str(book.get('author') or ''),
+                        str(book.get('description') or '')
+                    )
+                    for position, book in enumerate(books)
+                )
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)',
+                [
+                    ('version', version or 'default'),
+                    ('imported_at', repr(time.time())),
+                    ('statistics', json.dumps(CatalogColumns.from_records(books).summary()))
+                ] + ([('source_mtime', repr(source_mtime))] if source_mtime is not None else [])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        
+        logger.info(f"Imported {len(books)} books into {self.database_path} (version {version})")
+        return True
+    
+    def start_watching(self, poll_interval: float = 2.0, backend: str = 'auto') -> None:
+        """
+        Re-import the JSON data file whenever it changes (no-op if already watching)
+        
+        Args:
+            poll_interval: Seconds between checks when polling is used
+            backend: 'auto' (inotify where available), 'inotify' or 'poll'
+        """
+        if self.watching:
+            return
+        
+        self._watcher = FileWatcher(
+            [self.data_file],
+            callback=self.reload,
+            poll_interval=poll_interval,
+            backend=backend
+        )
+        self._watcher.start()
+    
+    @property
+    def watching(self) -> bool:
+        """Whether a background watcher is keeping the catalog fresh"""
+        return self._watcher is not None and self._watcher.running
+    
+    def stop_watching(self) -> None:
+        """
+        Stop the background watcher (reads fall back to mtime checks)
+        """
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
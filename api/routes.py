@@ -6,24 +6,109 @@ Follows Dependency Inversion Principle (DIP):
 - Controllers are injected with dependencies (repositories)
 """
 import logging
+from typing import Optional
 import pandas as pd
-from flask import Blueprint, jsonify, request, render_template
+from flask import Blueprint, current_app, jsonify, request, render_template
 from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from api.config import Config
 from api.controllers.book_controller import BookController
-from api.repositories.book_repository import BookRepository
+from api.controllers.result_cache import ResultCache
+from api.controllers.book_export import gzip_stream
+from api.batch import parse_batch, run_batch
+from api.http_cache import accepts_gzip, conditional_get
+from api.repositories import create_book_repository
+from api.repositories.encoded_book import FieldProjection
 from api.auth.decorators import admin_required
 
 logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
 
-# Dependency Injection: Controller depends on Repository
-book_repository = BookRepository(data_file='data/output/books.json')
-book_controller = BookController(repository=book_repository)
+# Dependency Injection: Controller depends on Repository (backend chosen by BOOK_REPOSITORY)
+book_repository = create_book_repository(
+    backend=Config.BOOK_REPOSITORY,
+    data_file='data/output/books.json',
+    database_url=Config.DATABASE_URL
+)
+book_controller = BookController(
+    repository=book_repository,
+    cache=ResultCache(max_entries=Config.RESULT_CACHE_SIZE, ttl=Config.RESULT_CACHE_TTL)
+)
+
+# Compressed response bodies, reused until the data version changes (None: no gzip)
+compressed_cache = ResultCache(
+    max_entries=Config.COMPRESSED_CACHE_SIZE,
+    ttl=Config.RESULT_CACHE_TTL
+) if Config.GZIP_ENABLED else None
+
+
+def _encoded_response(operation: str):
+    """
+    JSON response whose body is encoded once per data version
+    
+    Args:
+        operation: Controller read ('stats' or 'categories')
+    
+    Returns:
+        Flask response (compact unless pretty output was requested)
+    """
+    body = book_controller.get_encoded(operation, current_app.json.encode)
+    return current_app.json.raw_response(body)
+
+
+def _range_filter_args() -> dict:
+    """
+    Read the numeric range filters from the query string
+    
+    Returns:
+        Keyword arguments for the controller (None when absent)
+    
+    Raises:
+        ValueError: If a value cannot be parsed
+    """
+    def parse(name, convert):
+        value = request.args.get(name)
+        if value is None or value == '':
+            return None
+        try:
+            return convert(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name}: {value}")
+    
+    def to_bool(value):
+        if value.lower() in ('true', '1', 'yes'):
+            return True
+        if value.lower() in ('false', '0', 'no'):
+            return False
+        raise ValueError(value)
+    
+    return {
+        'price_min': parse('price_min', float),
+        'price_max': parse('price_max', float),
+        'rating_min': parse('rating_min', int),
+        'in_stock': parse('in_stock', to_bool),
+        'availability_min': parse('availability_min', int)
+    }
+
+
+def _books_response(result: dict, projection: Optional[FieldProjection]):
+    """
+    JSON response for a result holding book records
+    
+    Args:
+        result: Controller result
+        projection: Fields to keep in each book (None for every field)
+    
+    Returns:
+        Flask response (books encoded by the compiled projection, not copied)
+    """
+    provider = current_app.json
+    return provider.raw_response(provider.encode(result, projection))
 
 
 @api_bp.route('/books', methods=['GET'])
 @jwt_required()
+@conditional_get(book_repository, compressed_cache)
 def get_books():
     """
     Listar todos os livros (requer autenticação)
@@ -50,6 +135,56 @@ def get_books():
         in: query
         type: string
         description: Buscar por título ou autor
+      - name: search_mode
+        in: query
+        type: string
+        enum: [substring, ranked]
+        default: substring
+        description: >
+          substring: trecho do título/autor, na ordem do catálogo; ranked: busca
+          textual em título, autor e descrição (ignora acentos, aceita prefixo),
+          ordenada por relevância
+      - name: cursor
+        in: query
+        type: string
+        description: >
+          Paginação por cursor: envie vazio na primeira página e depois o
+          next_cursor retornado (ignora page; a resposta não traz total)
+      - name: sort
+        in: query
+        type: string
+        enum: [price, -price, rating, -rating, title, -title]
+        description: >
+          Ordenação (prefixo - para decrescente). Padrão: ordem do catálogo,
+          ou relevância com search_mode=ranked
+      - name: fields
+        in: query
+        type: string
+        description: "Campos de cada livro, separados por vírgula (padrão: todos)"
+        example: "id,title,price,category"
+      - name: price_min
+        in: query
+        type: number
+        description: "Preço mínimo (inclusive)"
+      - name: price_max
+        in: query
+        type: number
+        description: "Preço máximo (inclusive)"
+      - name: rating_min
+        in: query
+        type: integer
+        minimum: 0
+        maximum: 5
+        description: "Avaliação mínima (inclusive)"
+      - name: in_stock
+        in: query
+        type: boolean
+        description: "true: apenas livros em estoque; false: apenas esgotados"
+      - name: availability_min
+        in: query
+        type: integer
+        minimum: 0
+        description: "Quantidade mínima de exemplares disponíveis"
     responses:
       200:
         description: Lista de livros
@@ -91,6 +226,9 @@ def get_books():
             total_pages:
               type: integer
               example: 1
+            next_cursor:
+              type: string
+              description: Cursor da próxima página (somente com o parâmetro cursor; null na última)
       400:
         description: Parâmetros inválidos
         schema:
@@ -106,10 +244,138 @@ def get_books():
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 10, type=int)
     search = request.args.get('search', '', type=str)
+    search_mode = request.args.get('search_mode', 'substring', type=str)
+    cursor = request.args.get('cursor', None, type=str)
+    sort = request.args.get('sort', None, type=str)
+    
+    try:
+        projection = FieldProjection.parse(request.args.get('fields'))
+        result = book_controller.get_all_books(
+            page=page, limit=limit, search=search, search_mode=search_mode,
+            cursor=cursor, sort=sort, **_range_filter_args()
+        )
+        return _books_response(result, projection)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+
+
+@api_bp.route('/books/export', methods=['GET'])
+@jwt_required()
+@conditional_get(book_repository, streams_gzip=Config.GZIP_ENABLED)
+def export_books():
+    """
+    Exportar o catálogo completo em streaming (NDJSON ou CSV) (requer autenticação)
+    ---
+    tags:
+      - Books
+    security:
+      - Bearer: []
+    produces:
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+        description: "Formato: um objeto JSON por linha (ndjson) ou CSV com cabeçalho"
+      - name: fields
+        in: query
+        type: string
+        description: "Campos a exportar, separados por vírgula (padrão: todos)"
+        example: "id,title,price,category"
+    responses:
+      200:
+        description: >
+          Catálogo completo, enviado em partes (memória constante; gzip se
+          Accept-Encoding permitir)
+      400:
+        description: Formato ou campo inválido
+    """
+    export_format = request.args.get('format', 'ndjson', type=str)
+    fields = request.args.get('fields', None, type=str)
+    
+    try:
+        mimetype, chunks = book_controller.export_books(export_format, fields)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    
+    headers = {'Content-Disposition': f'attachment; filename=books.{export_format}'}
+    if Config.GZIP_ENABLED and accepts_gzip():
+        chunks = gzip_stream(chunks, current_app.config.get('GZIP_LEVEL', 6))
+        headers['Content-Encoding'] = 'gzip'
+    
+    return current_app.response_class(chunks, mimetype=mimetype, headers=headers)
+
+
+@api_bp.route('/books/batch', methods=['POST'])
+@jwt_required()
+def get_books_batch():
+    """
+    Buscar vários livros por ID em uma única requisição (requer autenticação)
+    ---
+    tags:
+      - Books
+    security:
+      - Bearer: []
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - ids
+          properties:
+            ids:
+              type: array
+              maxItems: 500
+              items:
+                type: string
+              example:
+                - "550e8400-e29b-41d4-a716-446655440000"
+                - "6f1c2a8e-1d4b-4c1e-9a0b-1f2e3d4c5b6a"
+      - name: fields
+        in: query
+        type: string
+        description: "Campos de cada livro, separados por vírgula (padrão: todos)"
+        example: "id,title,price,category"
+    responses:
+      200:
+        description: Livros encontrados (na ordem pedida) e IDs inexistentes
+        schema:
+          type: object
+          properties:
+            books:
+              type: array
+              items:
+                type: object
+            missing:
+              type: array
+              items:
+                type: string
+              example: ["00000000-0000-0000-0000-000000000000"]
+            total:
+              type: integer
+              description: Número de livros encontrados
+      400:
+        description: Corpo inválido (ids ausente, vazio, com mais de 500 itens ou IDs inválidos)
+    """
+    payload = request.get_json(silent=True)
     
     try:
-        result = book_controller.get_all_books(page=page, limit=limit, search=search)
-        return jsonify(result)
+        projection = FieldProjection.parse(request.args.get('fields'))
+        if not isinstance(payload, dict):
+            raise ValueError("Invalid body: expected a JSON object with an 'ids' list")
+        result = book_controller.get_books_by_ids(payload.get('ids'))
+        return _books_response(result, projection)
     except ValueError as e:
         return jsonify({
             'error': 'Bad Request',
@@ -119,6 +385,7 @@ def get_books():
 
 @api_bp.route('/books/<string:book_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(book_repository, compressed_cache)
 def get_book(book_id):
     """
     Buscar livro específico por ID UUID (requer autenticação)
@@ -134,6 +401,11 @@ def get_book(book_id):
         required: true
         description: ID do livro (UUID4)
         example: "550e8400-e29b-41d4-a716-446655440000"
+      - name: fields
+        in: query
+        type: string
+        description: "Campos de cada livro, separados por vírgula (padrão: todos)"
+        example: "id,title,price,category"
     responses:
       200:
         description: Detalhes do livro
@@ -172,15 +444,24 @@ def get_book(book_id):
               type: string
               example: Book not found
     """
+    try:
+        projection = FieldProjection.parse(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    
     result = book_controller.get_book_by_id(book_id)
     if result.get('error'):
         logger.warning(f"Book with ID {book_id} not found.")
         return jsonify(result), 404
-    return jsonify(result)
+    return _books_response(result, projection)
 
 
 @api_bp.route('/books/search', methods=['GET'])
 @jwt_required()
+@conditional_get(book_repository, compressed_cache)
 def search_books():
     """
     Buscar livros por título e/ou categoria (requer autenticação)
@@ -202,6 +483,34 @@ def search_books():
         required: false
         description: "Buscar por categoria (exata, case-insensitive)"
         example: "Technology"
+      - name: fields
+        in: query
+        type: string
+        description: "Campos de cada livro, separados por vírgula (padrão: todos)"
+        example: "id,title,price,category"
+      - name: price_min
+        in: query
+        type: number
+        description: "Preço mínimo (inclusive)"
+      - name: price_max
+        in: query
+        type: number
+        description: "Preço máximo (inclusive)"
+      - name: rating_min
+        in: query
+        type: integer
+        minimum: 0
+        maximum: 5
+        description: "Avaliação mínima (inclusive)"
+      - name: in_stock
+        in: query
+        type: boolean
+        description: "true: apenas livros em estoque; false: apenas esgotados"
+      - name: availability_min
+        in: query
+        type: integer
+        minimum: 0
+        description: "Quantidade mínima de exemplares disponíveis"
     responses:
       200:
         description: Lista de livros encontrados
@@ -255,12 +564,22 @@ def search_books():
     title = request.args.get('title', None, type=str)
     category = request.args.get('category', None, type=str)
     
-    result = book_controller.search_books(title=title, category=category)
-    return jsonify(result)
+    try:
+        projection = FieldProjection.parse(request.args.get('fields'))
+        result = book_controller.search_books(
+            title=title, category=category, **_range_filter_args()
+        )
+        return _books_response(result, projection)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
 
 
 @api_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@conditional_get(book_repository, compressed_cache)
 def get_stats():
     """
     Obter estatísticas da coleção (requer autenticação)
@@ -290,13 +609,30 @@ def get_stats():
                 Technology: 5
                 Fiction: 3
                 Business: 2
+            price:
+              type: object
+              description: Distribuição de preços (mínimo, percentis e máximo)
+              example:
+                min: 10.0
+                p25: 22.1
+                median: 35.0
+                p75: 47.5
+                p90: 54.3
+                max: 59.99
+            ratings:
+              type: object
+              description: Quantidade de livros por avaliação
+              example:
+                "1": 2
+                "3": 5
+                "5": 3
     """
-    result = book_controller.get_statistics()
-    return jsonify(result)
+    return _encoded_response('stats')
 
 
 @api_bp.route('/categories', methods=['GET'])
 @jwt_required()
+@conditional_get(book_repository, compressed_cache)
 def get_categories():
     """
     Listar todas as categorias de livros disponíveis (requer autenticação)
@@ -339,10 +675,180 @@ def get_categories():
                 count: 2
             total: 3
     """
-    result = book_controller.get_categories()
+    return _encoded_response('categories')
+
+
+@api_bp.route('/categories/<string:name>/books', methods=['GET'])
+@jwt_required()
+@conditional_get(book_repository, compressed_cache)
+def get_category_books(name):
+    """
+    Listar livros de uma categoria com paginação (requer autenticação)
+    ---
+    tags:
+      - Books
+    security:
+      - Bearer: []
+    parameters:
+      - name: name
+        in: path
+        type: string
+        required: true
+        description: Nome da categoria (case-insensitive)
+        example: "Poetry"
+      - name: page
+        in: query
+        type: integer
+        default: 1
+        description: Número da página
+      - name: limit
+        in: query
+        type: integer
+        default: 10
+        description: Itens por página (máximo 100)
+      - name: sort
+        in: query
+        type: string
+        enum: [price, -price, rating, -rating, title, -title]
+        description: "Ordenação (prefixo '-' para decrescente; padrão: ordem do catálogo)"
+    responses:
+      200:
+        description: Livros da categoria
+        schema:
+          type: object
+          properties:
+            category:
+              type: string
+              example: Poetry
+              description: Nome da categoria
+            books:
+              type: array
+              items:
+                type: object
+            total:
+              type: integer
+              description: Número de livros na categoria
+            page:
+              type: integer
+            limit:
+              type: integer
+            total_pages:
+              type: integer
+      400:
+        description: Parâmetros inválidos
+      404:
+        description: Categoria não encontrada
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: Category not found
+    """
+    page = request.args.get('page', 1, type=int)
+    limit = request.args.get('limit', 10, type=int)
+    sort = request.args.get('sort', None, type=str)
+    
+    try:
+        result = book_controller.get_books_by_category(name, page=page, limit=limit, sort=sort)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    
+    if result.get('error'):
+        return jsonify(result), 404
     return jsonify(result)
 
 
+@api_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_requests():
+    """
+    Executar várias leituras em uma única requisição (requer autenticação)
+    ---
+    tags:
+      - Books
+    security:
+      - Bearer: []
+    description: >
+      Todas as sub-requisições são atendidas a partir da mesma versão dos
+      dados carregados, mesmo que um reload ocorra durante o batch. Aceita
+      as rotas GET de livros, busca, categorias e estatísticas; o caminho
+      pode omitir o prefixo /api/v1.
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - requests
+          properties:
+            requests:
+              type: array
+              maxItems: 20
+              items:
+                type: object
+                required:
+                  - path
+                properties:
+                  id:
+                    type: string
+                    description: Identificador da sub-requisição (padrão a posição)
+                  path:
+                    type: string
+                  params:
+                    type: object
+                    description: Parâmetros de query
+              example:
+                - id: stats
+                  path: /stats
+                - id: books
+                  path: /books
+                  params:
+                    limit: 100
+                - id: categories
+                  path: /categories
+    responses:
+      200:
+        description: Respostas na ordem pedida, cada uma com seu status
+        schema:
+          type: object
+          properties:
+            version:
+              type: string
+              example: 3f2a9c1d0b7e6a54
+              description: Versão dos dados usada por todas as respostas
+            responses:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                    example: stats
+                  status:
+                    type: integer
+                    example: 200
+                  body:
+                    type: object
+      400:
+        description: Corpo inválido (requests ausente, vazio ou com mais itens que o permitido)
+    """
+    try:
+        sub_requests = parse_batch(request.get_json(silent=True), Config.BATCH_MAX_REQUESTS)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    
+    prefix = request.path.rsplit('/', 1)[0]  # Mount point of the API, e.g. /api/v1
+    return jsonify(run_batch(book_repository, sub_requests, prefix))
+
+
 @api_bp.route('/metrics', methods=['GET'])
 def metrics_dashboard():
     """
@@ -386,6 +892,10 @@ def force_reload():
               type: integer
               example: 600
               description: Total de livros após reload
+            version:
+              type: string
+              example: 3f2a9c1d0b7e6a54
+              description: Versão (hash do conteúdo) dos dados carregados
             timestamp:
               type: string
               format: date-time
@@ -396,13 +906,14 @@ def force_reload():
         description: Acesso negado (apenas admin)
     """
     try:
-        book_repository.reload()
+        book_controller.reload_books()
         books_count = book_repository.count()
         logger.info(f"Manual reload triggered by admin - {books_count} books loaded")
         
         return jsonify({
             'message': 'Data reloaded successfully',
             'books_count': books_count,
+            'version': book_repository.version,
             'timestamp': pd.Timestamp.now(tz='UTC').isoformat()
         }), 200
     except Exception as e:
@@ -411,3 +922,68 @@ def force_reload():
             'error': 'Reload failed',
             'message': str(e)
         }), 500
+
+
+@api_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@admin_required()
+def cache_stats():
+    """
+    Estatísticas do cache de resultados (admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Contadores do cache de resultados
+        schema:
+          type: object
+          properties:
+            entries:
+              type: integer
+              example: 12
+            max_entries:
+              type: integer
+              example: 256
+            ttl_seconds:
+              type: number
+              example: 300
+            data_version:
+              type: string
+              example: 3f2a9c1d0b7e6a54
+              description: Versão dos dados à qual as entradas pertencem
+            hits:
+              type: integer
+              example: 940
+            misses:
+              type: integer
+              example: 60
+            evictions:
+              type: integer
+              example: 0
+            expirations:
+              type: integer
+              example: 4
+            invalidations:
+              type: integer
+              example: 1
+              description: Vezes em que o cache foi esvaziado por reload dos dados
+            hit_ratio:
+              type: number
+              example: 0.94
+            compressed:
+              type: object
+              description: >
+                Mesmos contadores para o cache de respostas gzip
+                (ausente se GZIP_ENABLED=false)
+      401:
+        description: Não autorizado
+      403:
+        description: Acesso negado (apenas admin)
+    """
+    stats = book_controller.cache_stats()
+    if compressed_cache is not None:
+        stats['compressed'] = compressed_cache.stats()
+    return jsonify(stats)
@@ -57,6 +57,74 @@ def trigger_scraping():
               type: string
               example: books
               description: "Nome do arquivo de saída (padrão: books)"
+            engine:
+              type: string
+              enum:
+                - threads
+                - asyncio
+              example: threads
+              description: "Motor de scraping: threads (requests) ou asyncio (padrão: threads)"
+            workers:
+              type: integer
+              example: 8
+              minimum: 1
+              maximum: 256
+              description: >
+                Concorrência: threads buscando páginas de detalhe (máx. 32,
+                padrão 1) ou requisições simultâneas por host no asyncio
+                (máx. 256, padrão 64)
+            delay:
+              type: number
+              example: 0.25
+              minimum: 0
+              maximum: 60
+              description: "Intervalo mínimo entre requisições ao site, em segundos (padrão: 1.0)"
+            rate:
+              type: number
+              example: 4
+              description: >
+                Requisições por segundo ao site (padrão: 1 / delay; tem
+                precedência sobre delay)
+            burst:
+              type: integer
+              example: 4
+              minimum: 1
+              maximum: 100
+              description: >
+                Requisições que podem iniciar em sequência após um período
+                ocioso (padrão: 1)
+            max_in_flight:
+              type: integer
+              example: 8
+              minimum: 0
+              maximum: 256
+              description: "Requisições simultâneas ao site (padrão: 0, sem limite)"
+            adaptive:
+              type: boolean
+              example: true
+              description: >
+                Ajusta a concorrência à latência e aos erros do site (AIMD: sobe
+                enquanto a latência se mantém, cai pela metade em 429/503 ou picos
+                de latência, respeitando Retry-After) (padrão: false)
+            min_concurrency:
+              type: integer
+              example: 2
+              minimum: 1
+              description: "Limite inferior da concorrência adaptativa (padrão: 1)"
+            max_concurrency:
+              type: integer
+              example: 32
+              minimum: 1
+              description: >
+                Limite superior da concorrência adaptativa, até workers
+                (padrão: workers)
+            cache:
+              type: boolean
+              example: true
+              description: >
+                Revalida as páginas guardadas por jobs anteriores (If-None-Match /
+                If-Modified-Since) em vez de baixá-las de novo; 304 reaproveita o
+                corpo em cache (padrão: false)
     responses:
       202:
         description: Job de scraping iniciado
@@ -81,6 +149,26 @@ def trigger_scraping():
                   type: string
                 output:
                   type: string
+                engine:
+                  type: string
+                workers:
+                  type: integer
+                delay:
+                  type: number
+                rate:
+                  type: number
+                burst:
+                  type: integer
+                max_in_flight:
+                  type: integer
+                adaptive:
+                  type: boolean
+                min_concurrency:
+                  type: integer
+                max_concurrency:
+                  type: integer
+                cache:
+                  type: boolean
       400:
         description: Parâmetros inválidos
         schema:
@@ -180,7 +268,50 @@ def get_job_status(job_id):
                   description: Arquivos gerados
                 report:
                   type: object
-                  description: Relatório do scraping
+                  description: >
+                    Relatório do scraping (inclui http_cache - acertos/erros do
+                    cache de páginas - quando cache está ativo)
+                  example:
+                    http_cache:
+                      hits: 38
+                      misses: 2
+                      hit_ratio: 0.95
+                      evictions: 0
+                      entries: 420
+                      bytes: 2150400
+                      max_bytes: 268435456
+                concurrency:
+                  type: object
+                  description: >
+                    Concorrência final por host (limite AIMD escolhido quando
+                    adaptive, e respostas 429/503 recebidas)
+                  example:
+                    adaptive: true
+                    hosts:
+                      books.toscrape.com:
+                        limit: 12
+                        min: 1
+                        max: 32
+                        decreases: 2
+                        slow_start: false
+                        baseline_ms: 180.4
+                        throttled: 1
+            scheduler:
+              type: object
+              description: >
+                Contadores ao vivo por host (requisições aguardando, em
+                andamento, total e taxa atingida)
+              example:
+                books.toscrape.com:
+                  waiting: 12
+                  in_flight: 4
+                  requests: 380
+                  achieved_rate: 3.9
+                  rate: 4.0
+                  burst: 4
+                  max_in_flight: 8
+                  throttled: 0
+                  blocked_for: 0.0
             error:
               type: string
               description: Presente quando status é failed
@@ -0,0 +1,10 @@
+"""
+Search module - Full-text search over the book catalog
+
+Inverted index with accent folding, prefix matching and BM25 ranking,
+built once per catalog snapshot.
+"""
+from api.search.tokenizer import fold, tokenize
+from api.search.search_index import SearchIndex
+
+__all__ = ['fold', 'tokenize', 'SearchIndex']
@@ -0,0 +1,149 @@
+"""
+Search Index - Inverted index with BM25 ranking
+
+Built once per catalog snapshot. Each posting list stores the matching
+record positions together with their precomputed BM25 contribution, so a
+query is a handful of vectorized NumPy additions.
+"""
+import math
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from api.search.tokenizer import tokenize
+
+
+class SearchIndex:
+    """
+    Full-text index over title, author and description
+    
+    Responsibilities:
+    - Tokenize and fold book fields at build time
+    - Expand the last query token by prefix (search-as-you-type)
+    - Rank matches with BM25 (all query tokens must match)
+    """
+    
+    # Field weights: a title hit counts three times a description hit
+    FIELD_WEIGHTS = {'title': 3.0, 'author': 2.0, 'description': 1.0}
+    K1 = 1.2
+    B = 0.75
+    MAX_PREFIX_EXPANSIONS = 64
+    MIN_PREFIX_LENGTH = 2
+    
+    def __init__(self, books: Sequence[Dict[str, Any]]):
+        """
+        Build the index
+        
+        Args:
+            books: Book dictionaries (positions in this sequence are returned by search)
+        """
+        size = len(books)
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        lengths = np.zeros(size, dtype=np.float64)
+        fields = tuple(self.FIELD_WEIGHTS.items())
+        
+        for position, book in enumerate(books):
+            frequencies: Dict[str, float] = {}
+            length = 0.0
+            for field, weight in fields:
+                tokens = tokenize(book.get(field) or '')
+                length += weight * len(tokens)
+                for token in tokens:
+                    frequencies[token] = frequencies.get(token, 0.0) + weight
+            lengths[position] = length
+            
+            for token, frequency in frequencies.items():
+                entry = postings.get(token)
+                if entry is None:
+                    postings[token] = ([position], [frequency])
+                else:
+                    entry[0].append(position)
+                    entry[1].append(frequency)
+        
+        average_length = float(lengths.mean()) if size else 0.0
+        if average_length > 0:
+            normalization = self.K1 * (1 - self.B + self.B * lengths / average_length)
+        else:
+            normalization = np.full(size, self.K1)
+        
+        self.size = size
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (term_positions, term_frequencies) in postings.items():
+            positions = np.array(term_positions, dtype=np.int32)
+            tf = np.array(term_frequencies, dtype=np.float64)
+            idf = math.log(1 + (size - len(positions) + 0.5) / (len(positions) + 0.5))
+            contribution = idf * tf * (self.K1 + 1) / (tf + normalization[positions])
+            self._postings[term] = (positions, contribution.astype(np.float32))
+        
+        self.vocabulary: List[str] = sorted(self._postings)
+    
+    def expand(self, token: str, prefix: bool = False) -> List[str]:
+        """
+        Find the indexed terms matching a query token
+        
+        Args:
+            token: Folded query token
+            prefix: Also match terms starting with the token
+        
+        Returns:
+            Matching terms (exact match first)
+        """
+        terms = [token] if token in self._postings else []
+        
+        if prefix and len(token) >= self.MIN_PREFIX_LENGTH:
+            start = bisect_left(self.vocabulary, token)
+            for term in self.vocabulary[start:start + self.MAX_PREFIX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    terms.append(term)
+        
+        return terms[:self.MAX_PREFIX_EXPANSIONS]
+    
+    def search(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rank the books matching all tokens of a query
+        
+        The last token is also matched as a prefix. Ties are broken by
+        record position so results are stable.
+        
+        Args:
+            query: Raw query text
+        
+        Returns:
+            Tuple (record positions best-first, BM25 scores)
+        """
+        hits, hit_scores = self.matches(query)
+        order = np.lexsort((hits, -hit_scores))
+        return hits[order], hit_scores[order]
+    
+    def matches(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score the books matching all tokens of a query, without ranking them
+        
+        Args:
+            query: Raw query text
+        
+        Returns:
+            Tuple (record positions in catalog order, BM25 scores)
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.size:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        scores = np.zeros(self.size, dtype=np.float32)
+        matched = np.zeros(self.size, dtype=np.int16)
+        
+        for index, token in enumerate(tokens):
+            terms = self.expand(token, prefix=index == len(tokens) - 1)
+            if not terms:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            
+            token_hits = np.zeros(self.size, dtype=np.bool_)
+            for term in terms:
+                positions, contribution = self._postings[term]
+                scores[positions] += contribution  # Positions are unique within a posting list
+                token_hits[positions] = True
+            matched += token_hits
+        
+        hits = np.flatnonzero(matched == len(tokens))
+        return hits, scores[hits]
@@ -0,0 +1,46 @@
+"""
+Tokenizer - Text normalization shared by indexing and querying
+
+Folds case and accents so that e.g. "Coração" matches "coracao" for our
+Portuguese-speaking users, then splits on non-word characters.
+"""
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Combining diacritical mark blocks left behind by NFKD decomposition
+_COMBINING_PATTERN = re.compile(
+    r'[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]+'
+)
+
+
+def fold(text: str) -> str:
+    """
+    Case- and accent-fold text
+    
+    Args:
+        text: Raw text
+    
+    Returns:
+        Folded text (e.g. "Ação" -> "acao")
+    """
+    if text.isascii():
+        return text.lower()
+    return _COMBINING_PATTERN.sub('', unicodedata.normalize('NFKD', text.casefold()))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into folded tokens
+    
+    Args:
+        text: Raw text
+    
+    Returns:
+        List of tokens, in order of appearance
+    """
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(fold(str(text)))
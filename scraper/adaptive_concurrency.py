@@ -0,0 +1,125 @@
+"""
+Adaptive Concurrency - AIMD limit on the requests in flight to one host
+
+The limit follows TCP congestion control. It starts at the lower bound
+and grows by one per response (doubling every round trip, "slow start")
+until the first sign of overload. After that it grows by one per round
+trip (additive increase). A 429/503, a failed request or a latency spike
+(latency well above the smoothed baseline) cuts it by a constant factor
+(multiplicative decrease).
+
+Responses to requests sent before the last cut reflect the old limit and
+are ignored, so one overload episode cuts only once.
+"""
+import time
+from typing import Any, Dict, Optional
+
+
+class AIMDConcurrency:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit of one host
+    """
+    
+    __slots__ = (
+        'min_limit', 'max_limit', 'decrease_factor', 'spike_ratio', 'smoothing', 'min_samples',
+        'limit', 'baseline', 'samples', 'slow_start', 'decreases', '_last_decrease'
+    )
+    
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        decrease_factor: float = 0.5,
+        spike_ratio: float = 2.0,
+        smoothing: float = 0.2,
+        min_samples: int = 5
+    ):
+        """
+        Initialize the limit at its lower bound
+        
+        Args:
+            min_limit: Lowest concurrency
+            max_limit: Highest concurrency
+            decrease_factor: Multiplier applied on overload (0 < factor < 1)
+            spike_ratio: Latency above baseline * ratio counts as overload
+            smoothing: Weight of a new sample in the latency baseline (EWMA)
+            min_samples: Samples needed before latency spikes are detected
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.spike_ratio = spike_ratio
+        self.smoothing = smoothing
+        self.min_samples = min_samples
+        self.limit = float(self.min_limit)
+        self.baseline: Optional[float] = None  # Smoothed latency of healthy responses (seconds)
+        self.samples = 0
+        self.slow_start = True
+        self.decreases = 0
+        self._last_decrease = float('-inf')
+    
+    @property
+    def current(self) -> int:
+        """
+        Requests allowed in flight now
+        """
+        return int(self.limit)
+    
+    def on_success(self, started: float, latency: float, now: Optional[float] = None) -> None:
+        """
+        Record a successful response
+        
+        Args:
+            started: Monotonic time the request started
+            latency: Seconds until the response was read
+            now: Monotonic time (default: now)
+        """
+        if started < self._last_decrease:
+            return
+        
+        if self.baseline is None:
+            self.baseline = latency
+        elif self.samples >= self.min_samples and latency > self.baseline * self.spike_ratio:
+            self._decrease(time.monotonic() if now is None else now)
+            return
+        else:
+            self.baseline += self.smoothing * (latency - self.baseline)
+        
+        self.samples += 1
+        step = 1.0 if self.slow_start else 1.0 / self.limit
+        self.limit = min(self.max_limit, self.limit + step)
+    
+    def on_overload(self, started: float, now: Optional[float] = None) -> None:
+        """
+        Record a throttled (429/503) or failed request
+        
+        Args:
+            started: Monotonic time the request started
+            now: Monotonic time (default: now)
+        """
+        if started >= self._last_decrease:
+            self._decrease(time.monotonic() if now is None else now)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current limit and bounds
+        
+        Returns:
+            Dictionary with 'limit', 'min', 'max', 'decreases', 'slow_start'
+            and the 'baseline_ms' latency
+        """
+        return {
+            'limit': self.current,
+            'min': self.min_limit,
+            'max': self.max_limit,
+            'decreases': self.decreases,
+            'slow_start': self.slow_start,
+            'baseline_ms': round(self.baseline * 1000, 1) if self.baseline is not None else None
+        }
+    
+    def _decrease(self, now: float) -> None:
+        """Multiplicative decrease (private method)"""
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self.slow_start = False
+        self.decreases += 1
+        self._last_decrease = now
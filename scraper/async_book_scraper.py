@@ -0,0 +1,253 @@
+"""
+Async Book Scraper - asyncio engine for BookScraper
+
+Same scrape/parse_item contract and output as BookScraper, but pages are
+fetched by an event loop (AsyncHTTPClient), so hundreds of requests can be
+in flight without a thread each. The per-host concurrency limit bounds
+them, and the shared host scheduler keeps request starts polite. HTML
+parsing is CPU-bound and page cache lookups hit the disk, so both run on a
+small thread pool and the event loop stays free to drive the network.
+"""
+import os
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from bs4 import BeautifulSoup
+from scraper.async_http import AsyncHTTPClient, HTTPError, HTTPResponse
+from scraper.book_scraper import BookScraper
+from scraper.host_scheduler import THROTTLE_STATUSES, HostScheduler
+from scraper.page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBookScraper(BookScraper):
+    """
+    BookScraper driven by asyncio
+    
+    `workers` is the number of requests in flight per host.
+    """
+    
+    # Requests in flight per host (default and upper bound)
+    DEFAULT_WORKERS = 64
+    MAX_WORKERS = 256
+    
+    def __init__(
+        self,
+        base_url: str = "http://books.toscrape.com",
+        delay: float = 1.0,
+        workers: Optional[int] = None,
+        scheduler: Optional[HostScheduler] = None,
+        cache: Optional[PageCache] = None,
+        parse_workers: int = 0
+    ):
+        """
+        Initialize the async book scraper
+        
+        Args:
+            base_url: Base URL of the website to scrape
+            delay: Minimum delay between requests to the site
+            workers: Requests in flight per host (default DEFAULT_WORKERS)
+            scheduler: Per-host politeness (default: one request every `delay` seconds)
+            cache: Persistent page cache for conditional requests (default: none)
+            parse_workers: Threads parsing HTML (0: up to 4, by CPU count)
+        """
+        super().__init__(base_url, delay, workers, scheduler, cache)
+        self.parse_workers = parse_workers or min(4, os.cpu_count() or 1)
+    
+    def scrape(self, max_pages: int = 1, fetch_details: bool = True) -> List[Dict[str, Any]]:
+        """
+        Scrape books from multiple pages with detailed information
+        
+        Runs scrape_async in a new event loop (call scrape_async directly
+        from a running loop).
+        
+        Args:
+            max_pages: Maximum number of pages to scrape
+            fetch_details: If True, fetches detailed info for each book (UPC, category, etc.)
+        
+        Returns:
+            List of book dictionaries with complete information
+        """
+        return asyncio.run(self.scrape_async(max_pages, fetch_details))
+    
+    async def scrape_async(
+        self,
+        max_pages: int = 1,
+        fetch_details: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Scrape books from multiple pages with detailed information
+        
+        Listing pages are read in order (the first failing page ends the
+        scrape, as in BookScraper); the detail pages of every book are
+        fetched concurrently and merged back in listing order.
+        
+        Args:
+            max_pages: Maximum number of pages to scrape
+            fetch_details: If True, fetches detailed info for each book (UPC, category, etc.)
+        
+        Returns:
+            List of book dictionaries with complete information
+        """
+        all_books = []
+        pending = []  # (book, task fetching its details), in listing order
+        client = AsyncHTTPClient(max_per_host=self.workers, headers=dict(self.session.headers))
+        executor = ThreadPoolExecutor(
+            max_workers=self.parse_workers, thread_name_prefix='book-parser'
+        )
+        
+        try:
+            for page_num in range(1, max_pages + 1):
+                try:
+                    url = f"{self.base_url}/catalogue/page-{page_num}.html"
+                    content = await self._fetch(client, executor, url)
+                    page_books = await self._parse(executor, self.parse_listing, content)
+                except Exception as e:
+                    logger.error(f"Error scraping page {page_num}: {e}")
+                    break
+                
+                logger.info(f"Found {len(page_books)} books on page {page_num}")
+                
+                for book_data in page_books:
+                    if fetch_details and book_data.get('url'):
+                        task = asyncio.create_task(
+                            self._book_details(client, executor, book_data['url'])
+                        )
+                        pending.append((book_data, task))
+                    all_books.append(book_data)
+            
+            # Merge detailed information
+            for book_data, task in pending:
+                details = await task
+                if details:
+                    book_data.update(details)
+        finally:
+            for _, task in pending:
+                task.cancel()
+            # Cancelled tasks cancel their queued executor jobs (cancel_futures needs 3.9)
+            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+            await client.close()
+            executor.shutdown(wait=False)
+        
+        logger.info(
+            f"Total books scraped: {len(all_books)} "
+            f"(with {'detailed' if fetch_details else 'basic'} info)"
+        )
+        return all_books
+    
+    async def _fetch(self, client: AsyncHTTPClient, executor: Executor, url: str) -> bytes:
+        """
+        Fetch a page body once the host scheduler allows it, retrying
+        throttled requests and revalidating cached pages as fetch_page does
+        (private method)
+        
+        Redirects are followed here, one hop at a time, so each hop waits
+        for the scheduler slot of its own host and carries only the
+        validators cached for its own URL. Page cache reads and writes run
+        on the executor, off the event loop.
+        
+        Args:
+            client: HTTP client
+            executor: Thread pool for the page cache
+            url: URL to fetch
+        
+        Returns:
+            Response body
+        
+        Raises:
+            HTTPError: On network errors, error statuses or too many redirects
+        """
+        loop = asyncio.get_running_loop()
+        target = url
+        for _ in range(self.MAX_REDIRECTS + 1):
+            # Validators describe the stored copy of this URL, not of a page redirecting here
+            page = None
+            if self.cache:
+                page = await loop.run_in_executor(executor, self.cache.get, target)
+            response = await self._request(client, target, page.validators() if page else None)
+            if response.location is None:
+                break
+            target = response.location
+        else:
+            raise HTTPError(f"Too many redirects fetching {url}")
+        response.raise_for_status()
+        if self.cache is None:
+            return response.body
+        return await loop.run_in_executor(
+            executor, self.cached_content, target, page, response.status, response.body,
+            response.headers.get('etag'), response.headers.get('last-modified')
+        )
+    
+    async def _request(
+        self,
+        client: AsyncHTTPClient,
+        url: str,
+        headers: Optional[Dict[str, str]]
+    ) -> HTTPResponse:
+        """
+        Send one request (no redirects) in a scheduler slot of its host,
+        retrying throttled requests (private method)
+        
+        Args:
+            client: HTTP client
+            url: URL to request
+            headers: Extra request headers, if any
+        
+        Returns:
+            HTTPResponse (a redirect is returned as is)
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            async with self.scheduler.request_async(url) as slot:
+                logger.info(f"Fetching: {url}")
+                response = await client.get(url, headers, follow_redirects=False)
+                slot.complete(response.status, response.headers.get('retry-after'))
+            if response.status not in THROTTLE_STATUSES or attempt == self.MAX_RETRIES:
+                break
+            logger.warning(f"Throttled ({response.status}) fetching {url}, retrying")
+        return response
+    
+    async def _book_details(
+        self,
+        client: AsyncHTTPClient,
+        executor: Executor,
+        book_url: str
+    ) -> Dict[str, Any]:
+        """
+        Fetch and parse the detail page of a book (private method)
+        
+        Args:
+            client: HTTP client
+            executor: Parsing (and page cache) thread pool
+            book_url: URL of the book detail page
+        
+        Returns:
+            Dictionary with detailed book information (empty on errors)
+        """
+        try:
+            content = await self._fetch(client, executor, book_url)
+            return await self._parse(executor, self.parse_book_details, content)
+        except Exception as e:
+            logger.error(f"Error scraping book details from {book_url}: {e}")
+            return {}
+    
+    @staticmethod
+    async def _parse(
+        executor: Executor,
+        parser: Callable[[BeautifulSoup], Any],
+        content: bytes
+    ) -> Any:
+        """
+        Parse HTML on the executor, off the event loop (private method)
+        
+        Args:
+            executor: Parsing thread pool
+            parser: Parsing method taking the page soup
+            content: HTML bytes
+        
+        Returns:
+            Parser result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, lambda: parser(BeautifulSoup(content, 'lxml')))
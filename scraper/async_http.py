@@ -0,0 +1,290 @@
+"""
+Async HTTP - Minimal asyncio HTTP/1.1 client for the scraping engine
+
+Only what scraping static pages needs, on top of asyncio streams: GET with
+keep-alive connection pooling, Content-Length / chunked / read-to-close
+bodies, redirects and TLS. Each host has a semaphore bounding the requests
+in flight (and so its open connections), while any number of hosts are
+fetched in parallel.
+
+Scraped hrefs are untrusted: the request target is percent-encoded (spaces,
+non-ASCII) and CR/LF anywhere in the URL or a header value is rejected, so a
+link cannot break the request line or inject headers.
+"""
+import ssl
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# (scheme, host, port)
+HostKey = Tuple[str, str, int]
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Characters left as is when encoding the request target (reserved, and already escaped '%')
+TARGET_SAFE = "/%:@!$&'()*+,;=?"
+
+
+class HTTPError(Exception):
+    """
+    Request failed (connection error, timeout or error status)
+    """
+    pass
+
+
+class HTTPResponse:
+    """
+    Fully read response
+    """
+    
+    __slots__ = ('url', 'status', 'headers', 'body')
+    
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """
+        Args:
+            url: Final URL (after redirects)
+            status: Status code
+            headers: Header names lowercased; repeated headers joined with ', '
+            body: Response body
+        """
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+    
+    @property
+    def location(self) -> Optional[str]:
+        """
+        Absolute URL a redirect points to
+        
+        Returns:
+            Location resolved against the response URL, or None when the
+            response is not a redirect
+        """
+        location = self.headers.get('location')
+        if self.status not in REDIRECT_STATUSES or not location:
+            return None
+        return urljoin(self.url, location)
+    
+    def raise_for_status(self) -> None:
+        """
+        Raises:
+            HTTPError: If the status is 4xx or 5xx
+        """
+        if self.status >= 400:
+            raise HTTPError(f"{self.status} Error for url: {self.url}")
+    
+    def __repr__(self) -> str:
+        return f"HTTPResponse({self.status}, {self.url!r}, {len(self.body)} bytes)"
+
+
+class AsyncHTTPClient:
+    """
+    asyncio HTTP/1.1 client with per-host concurrency limits
+    
+    Responsibilities:
+    - Bound the requests in flight per host (max_per_host)
+    - Reuse keep-alive connections (at most max_per_host idle per host)
+    - Follow redirects and enforce a per-request timeout
+    """
+    
+    MAX_REDIRECTS = 5
+    
+    def __init__(
+        self,
+        max_per_host: int = 8,
+        timeout: float = 30.0,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize client (create it inside the event loop that uses it)
+        
+        Args:
+            max_per_host: Requests in flight per host
+            timeout: Seconds allowed for one request, redirects included
+            headers: Headers sent with every request (e.g. User-Agent)
+        """
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self._limits: Dict[HostKey, asyncio.Semaphore] = {}
+        self._idle: Dict[HostKey, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+    
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        follow_redirects: bool = True
+    ) -> HTTPResponse:
+        """
+        GET a URL, following redirects
+        
+        Args:
+            url: Absolute http(s) URL
+            headers: Extra headers for this request (e.g. If-None-Match)
+            follow_redirects: False returns 3xx responses as is, so the caller
+                can schedule each hop against its own host
+        
+        Returns:
+            HTTPResponse (any status; see raise_for_status)
+        
+        Raises:
+            HTTPError: On connection errors, timeouts, invalid responses or too many redirects
+        """
+        request = self._get(url, headers) if follow_redirects else self._request(url, headers)
+        try:
+            return await asyncio.wait_for(request, self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(f"Timeout after {self.timeout}s fetching {url}")
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            raise HTTPError(f"Error fetching {url}: {e}") from e
+    
+    async def close(self) -> None:
+        """
+        Close idle connections
+        """
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+    
+    async def _get(self, url: str, headers: Optional[Dict[str, str]]) -> HTTPResponse:
+        """Follow redirects from url (private method)"""
+        for _ in range(self.MAX_REDIRECTS + 1):
+            response = await self._request(url, headers)
+            if response.location is None:
+                return response
+            url = response.location
+        raise HTTPError(f"Too many redirects fetching {url}")
+    
+    async def _request(
+        self, url: str, extra_headers: Optional[Dict[str, str]] = None
+    ) -> HTTPResponse:
+        """
+        Send one GET over a pooled connection (private method)
+        
+        A reused keep-alive connection may have been closed by the server
+        meanwhile; the request is then retried on another connection (only
+        failures on a fresh connection are errors).
+        """
+        if '\r' in url or '\n' in url:
+            raise ValueError(f"Invalid URL (CR/LF): {url!r}")
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        default_port = key[2] == (443 if parts.scheme == 'https' else 80)
+        target = quote(parts.path or '/', safe=TARGET_SAFE)
+        if parts.query:
+            target += '?' + quote(parts.query, safe=TARGET_SAFE)
+        headers = {
+            'Host': parts.hostname if default_port else f"{parts.hostname}:{key[2]}",
+            **self.headers,
+            **(extra_headers or {}),
+            'Accept-Encoding': 'identity',
+            'Connection': 'keep-alive'
+        }
+        for name, value in headers.items():
+            if any(char in f"{name}{value}" for char in '\r\n'):
+                raise ValueError(f"Invalid header {name!r} (CR/LF)")
+        lines = [f"GET {target} HTTP/1.1"] + [f"{name}: {value}" for name, value in headers.items()]
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        
+        limit = self._limits.setdefault(key, asyncio.Semaphore(self.max_per_host))
+        async with limit:
+            while True:
+                reader, writer, reused = await self._connection(key)
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status, response_headers, body, keep_alive = await self._read_response(reader)
+                except (OSError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        continue  # Stale keep-alive connection: retry on a new one
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                
+                if keep_alive:
+                    self._idle.setdefault(key, []).append((reader, writer))
+                else:
+                    writer.close()
+                return HTTPResponse(url, status, response_headers, body)
+    
+    async def _connection(
+        self,
+        key: HostKey
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """Idle connection to the host, or a new one (private method)"""
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        
+        scheme, host, port = key
+        context = None
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            context = self._ssl_context
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        return reader, writer, False
+    
+    @staticmethod
+    async def _read_response(
+        reader: asyncio.StreamReader
+    ) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """
+        Read status line, headers and body (private method)
+        
+        Returns:
+            Tuple (status, headers, body, whether the connection can be reused)
+        """
+        while True:
+            status_line = (await reader.readuntil(b'\r\n')).decode('latin-1').strip()
+            version, _, rest = status_line.partition(' ')
+            if not version.startswith('HTTP/') or not rest[:3].isdigit():
+                raise ValueError(f"Invalid status line: {status_line!r}")
+            status = int(rest[:3])
+            
+            headers: Dict[str, str] = {}
+            while True:
+                line = (await reader.readuntil(b'\r\n')).decode('latin-1').rstrip('\r\n')
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                name, value = name.strip().lower(), value.strip()
+                headers[name] = f"{headers[name]}, {value}" if name in headers else value
+            
+            if status >= 200:
+                break  # 1xx: informational, the real response follows
+        
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if status in (204, 304):
+            body = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)  # CRLF after each chunk
+            while (await reader.readuntil(b'\r\n')) != b'\r\n':
+                pass  # Trailer headers
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()  # Delimited by connection close
+            keep_alive = False
+        return status, headers, body, keep_alive
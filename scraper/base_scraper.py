@@ -1,12 +1,16 @@
 """
 Base Scraper Class - Abstract base for all scrapers
 """
-import time
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from urllib.parse import urljoin
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from scraper.async_http import REDIRECT_STATUSES
+from scraper.host_scheduler import THROTTLE_STATUSES, HostScheduler
+from scraper.page_cache import CachedPage, PageCache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,41 +19,143 @@ logger = logging.getLogger(__name__)
 class BaseScraper(ABC):
     """
     Abstract base class for web scrapers
+    
+    The session is safe to share between worker threads: its connection
+    pool keeps up to `workers` connections per host alive, and politeness
+    is enforced by the shared host scheduler around each request. With a
+    page cache, pages already stored are revalidated instead of downloaded.
     """
     
-    def __init__(self, delay: float = 1.0):
+    # Retries of a throttled (429/503) request, each after the host's Retry-After pause
+    MAX_RETRIES = 3
+    # Redirect hops followed per page, each scheduled against its own host
+    MAX_REDIRECTS = 5
+    
+    def __init__(
+        self,
+        delay: float = 1.0,
+        workers: int = 1,
+        scheduler: Optional[HostScheduler] = None,
+        cache: Optional[PageCache] = None
+    ):
         """
         Initialize the scraper
         
         Args:
-            delay: Time to wait between requests (in seconds)
+            delay: Minimum time between two requests to the same host (in seconds)
+            workers: Number of concurrent fetchers the session is sized for
+            scheduler: Per-host token buckets, possibly shared with other scrapers
+                (default: one request every `delay` seconds per host)
+            cache: Persistent page cache for conditional requests (default: none;
+                owned by the caller, not closed by close())
         """
         self.delay = delay
+        self.workers = max(1, workers)
+        self.scheduler = scheduler or HostScheduler.from_delay(delay)
+        self.cache = cache
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        adapter = HTTPAdapter(pool_maxsize=max(self.workers, 10))  # Keep-alive connections per host
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def fetch_page(self, url: str) -> BeautifulSoup:
         """
         Fetch a web page and return BeautifulSoup object
         
+        Waits for the host scheduler first (respectful scraping). Throttled
+        requests (429/503) are retried up to MAX_RETRIES times; the scheduler
+        holds the host until the server's Retry-After. Redirects are followed
+        one hop at a time, each scheduled against its own host. Cached pages
+        are requested conditionally and reused on 304 Not Modified; each hop
+        carries only the validators stored for its own URL.
+        
         Args:
             url: URL to fetch
-            
+        
         Returns:
             BeautifulSoup object
         """
         try:
-            logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=30)
+            target = url
+            for _ in range(self.MAX_REDIRECTS + 1):
+                # Validators describe the stored copy of this URL, not of a page redirecting here
+                page = self.cache.get(target) if self.cache else None
+                response = self._request(target, page.validators() if page else None)
+                location = response.headers.get('Location')
+                if response.status_code not in REDIRECT_STATUSES or not location:
+                    break
+                target = urljoin(target, location)
+            else:
+                raise requests.TooManyRedirects(f"Too many redirects fetching {url}")
             response.raise_for_status()
-            time.sleep(self.delay)  # Respectful scraping
-            return BeautifulSoup(response.content, 'lxml')
+            content = self.cached_content(
+                target, page, response.status_code, response.content,
+                response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+            return BeautifulSoup(content, 'lxml')
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
             raise
     
+    def _request(self, url: str, headers: Optional[Dict[str, str]]) -> requests.Response:
+        """
+        Send one request (no redirects) in a scheduler slot of its host,
+        retrying throttled requests (private method)
+        
+        Args:
+            url: URL to request
+            headers: Extra request headers, if any
+        
+        Returns:
+            Response (a redirect is returned as is)
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            with self.scheduler.request(url) as slot:
+                logger.info(f"Fetching: {url}")
+                response = self.session.get(
+                    url, timeout=30, headers=headers, allow_redirects=False
+                )
+                slot.complete(response.status_code, response.headers.get('Retry-After'))
+            if response.status_code not in THROTTLE_STATUSES or attempt == self.MAX_RETRIES:
+                break
+            logger.warning(f"Throttled ({response.status_code}) fetching {url}, retrying")
+        return response
+    
+    def cached_content(
+        self,
+        url: str,
+        page: Optional[CachedPage],
+        status: int,
+        body: bytes,
+        etag: Optional[str],
+        last_modified: Optional[str]
+    ) -> bytes:
+        """
+        Body of a response, going through the page cache
+        
+        Args:
+            url: URL the response came from (after redirects)
+            page: Cached page of url the request was made conditional on, if any
+            status: Response status (2xx or 304)
+            body: Response body
+            etag: ETag header, if any
+            last_modified: Last-Modified header, if any
+        
+        Returns:
+            The cached body on 304 Not Modified, else the response body
+            (stored in the cache when it has validators)
+        """
+        if self.cache is None:
+            return body
+        if status == 304 and page is not None:
+            return self.cache.revalidated(page)
+        if status == 200:
+            self.cache.store(url, body, etag, last_modified)
+        return body
+    
     @abstractmethod
     def scrape(self, *args, **kwargs) -> List[Dict[str, Any]]:
         """
@@ -69,4 +175,3 @@ class BaseScraper(ABC):
         Close the session
         """
         self.session.close()
-
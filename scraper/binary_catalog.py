@@ -0,0 +1,332 @@
+"""
+Binary Catalog - Compact memory-mappable snapshot of the book catalog
+
+Written by DataProcessor next to the JSON output and memory-mapped read-only
+by the API, so every gunicorn worker shares the same page-cache pages instead
+of holding its own json.load copy. Loading decodes only the book ids (for
+the primary-key index, a linear pass); records are decoded on access.
+
+Layout (little-endian, every section aligned to 8 bytes):
+    
+    header      magic, format version, book count, category count,
+                data version, then (offset, length) for each section
+    price       float64[n]
+    rating      int8[n]
+    availability int32[n]
+    in_stock    uint8[n]
+    category    int32[n]      codes into the category table
+    id_offsets  uint64[n + 1] offsets into id_heap
+    id_heap     UTF-8 book ids
+    rec_offsets uint64[n + 1] offsets into rec_heap
+    rec_heap    compact UTF-8 JSON, one object per book
+    cat_offsets uint64[k + 1] offsets into cat_heap
+    cat_heap    UTF-8 category names
+"""
+import os
+import json
+import mmap
+import struct
+import hashlib
+import logging
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BOOKCAT\x00'
+FORMAT_VERSION = 1
+
+SECTIONS = (
+    'price', 'rating', 'availability', 'in_stock', 'category',
+    'id_offsets', 'id_heap', 'rec_offsets', 'rec_heap', 'cat_offsets', 'cat_heap'
+)
+_HEADER = struct.Struct('<8sIQI16s' + 'QQ' * len(SECTIONS))
+_ALIGNMENT = 8
+
+
+class BinaryCatalogError(Exception):
+    """Raised when a binary catalog file is missing, truncated or incompatible"""
+    pass
+
+
+def compute_version(content: bytes) -> str:
+    """
+    Compute the data version id of a JSON catalog
+    
+    Shared by the writer and the API so that the JSON and binary formats of
+    the same scrape report the same version.
+    
+    Args:
+        content: Raw JSON file content
+    
+    Returns:
+        Short hex content hash
+    """
+    return hashlib.blake2b(content, digest_size=8).hexdigest()
+
+
+def binary_path_for(json_path: Union[str, Path]) -> str:
+    """
+    Path of the binary catalog written next to a JSON catalog
+    
+    Args:
+        json_path: Path of the JSON file (e.g. data/output/books.json)
+    
+    Returns:
+        Path with a .bin extension (e.g. data/output/books.bin)
+    """
+    return str(Path(json_path).with_suffix('.bin'))
+
+
+def to_float(value: Any) -> float:
+    """Convert a raw field value to float (0.0 when invalid)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def to_int(value: Any) -> int:
+    """Convert a raw field value to int (0 when invalid)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _heap(values: List[bytes]) -> Tuple[np.ndarray, bytes]:
+    """Build an (offsets, heap) pair for variable-length byte strings"""
+    offsets = np.zeros(len(values) + 1, dtype='<u8')
+    if values:
+        np.cumsum([len(value) for value in values], out=offsets[1:])
+    return offsets, b''.join(values)
+
+
+def _pack(values: List[Any], dtype: str) -> bytes:
+    """Serialize a fixed-width column"""
+    return np.array(values, dtype=dtype).tobytes()
+
+
+def write_binary_catalog(books: List[Dict[str, Any]], path: Union[str, Path], version: str) -> str:
+    """
+    Write books to a binary catalog file (atomically)
+    
+    Args:
+        books: Book dictionaries
+        path: Output file path
+        version: Data version id (see compute_version)
+    
+    Returns:
+        Path to saved file
+    """
+    size = len(books)
+    
+    category_index: Dict[str, int] = {}
+    codes = np.empty(size, dtype='<i4')
+    for position, book in enumerate(books):
+        category = book.get('category', 'General')
+        codes[position] = category_index.setdefault(category, len(category_index))
+    
+    id_offsets, id_heap = _heap([str(book.get('id', '')).encode('utf-8') for book in books])
+    rec_offsets, rec_heap = _heap([
+        json.dumps(book, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        for book in books
+    ])
+    cat_offsets, cat_heap = _heap([name.encode('utf-8') for name in category_index])
+    
+    sections = {
+        'price': _pack([to_float(book.get('price', 0)) for book in books], '<f8'),
+        'rating': _pack([to_int(book.get('rating', 0)) for book in books], 'i1'),
+        'availability': _pack([to_int(book.get('availability', 0)) for book in books], '<i4'),
+        'in_stock': _pack([bool(book.get('in_stock', False)) for book in books], 'u1'),
+        'category': codes.tobytes(),
+        'id_offsets': id_offsets.tobytes(),
+        'id_heap': id_heap,
+        'rec_offsets': rec_offsets.tobytes(),
+        'rec_heap': rec_heap,
+        'cat_offsets': cat_offsets.tobytes(),
+        'cat_heap': cat_heap,
+    }
+    
+    # Lay out sections after the header, each aligned to 8 bytes
+    table = []
+    offset = _HEADER.size
+    for name in SECTIONS:
+        offset += -offset % _ALIGNMENT
+        table.extend((offset, len(sections[name])))
+        offset += len(sections[name])
+    
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, size, len(category_index),
+        version.encode('ascii')[:16].ljust(16, b'\0'), *table
+    )
+    
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        for index, name in enumerate(SECTIONS):
+            f.write(b'\0' * (table[index * 2] - f.tell()))
+            f.write(sections[name])
+    os.replace(temp_path, path)
+    
+    logger.info(f"Binary catalog saved to {path}")
+    return str(path)
+
+
+class MappedRecords(Sequence):
+    """
+    Read-only sequence of book dictionaries decoded on access
+    
+    Records live in the shared memory map; only the books actually accessed
+    by a request are decoded.
+    """
+    
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        heap: memoryview,
+        decode: Callable[[bytes], Any] = json.loads
+    ):
+        self._offsets = offsets
+        self._heap = heap
+        self._decode = decode
+    
+    def decoded_with(self, decode: Callable[[bytes], Any]) -> 'MappedRecords':
+        """
+        Same records, decoded by another function (shares the mapping)
+        
+        Args:
+            decode: Called with the compact JSON bytes of a record
+        
+        Returns:
+            New MappedRecords
+        """
+        return MappedRecords(self._offsets, self._heap, decode)
+    
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+    
+    def raw(self, position: int) -> bytes:
+        """
+        Compact JSON bytes of a single record
+        
+        Args:
+            position: Record position
+        
+        Returns:
+            Encoded record
+        """
+        return bytes(self._heap[int(self._offsets[position]):int(self._offsets[position + 1])])
+    
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[position] for position in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('record index out of range')
+        return self._decode(self.raw(item))
+
+
+class BinaryCatalog:
+    """
+    Read-only, memory-mapped binary catalog
+    
+    Numeric columns are zero-copy NumPy views over the mapping.
+    """
+    
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open and validate a binary catalog
+        
+        Args:
+            path: Binary catalog file
+        
+        Raises:
+            BinaryCatalogError: If the file is missing, truncated or incompatible
+        """
+        self.path = str(path)
+        
+        try:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise BinaryCatalogError(f"Cannot map {self.path}: {e}") from e
+        
+        if len(self._mmap) < _HEADER.size:
+            raise BinaryCatalogError(f"{self.path} is truncated")
+        
+        fields = _HEADER.unpack_from(self._mmap, 0)
+        magic, format_version, size, category_count, version = fields[:5]
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise BinaryCatalogError(
+                f"{self.path} is not a version {FORMAT_VERSION} binary catalog"
+            )
+        
+        self.size = size
+        self.version = version.rstrip(b'\0').decode('ascii')
+        
+        self._sections: Dict[str, memoryview] = {}
+        buffer = memoryview(self._mmap)
+        for index, name in enumerate(SECTIONS):
+            offset, length = fields[5 + index * 2], fields[6 + index * 2]
+            if offset + length > len(self._mmap):
+                raise BinaryCatalogError(f"{self.path} is truncated (section {name})")
+            self._sections[name] = buffer[offset:offset + length]
+        
+        self.price = self._column('price', '<f8', size)
+        self.rating = self._column('rating', 'i1', size)
+        self.availability = self._column('availability', '<i4', size)
+        self.in_stock = self._column('in_stock', 'u1', size).view(np.bool_)
+        self.category_codes = self._column('category', '<i4', size)
+        
+        cat_offsets = self._column('cat_offsets', '<u8', category_count + 1)
+        cat_heap = self._sections['cat_heap']
+        self.categories: Tuple[str, ...] = tuple(
+            bytes(cat_heap[int(cat_offsets[i]):int(cat_offsets[i + 1])]).decode('utf-8')
+            for i in range(category_count)
+        )
+        
+        self.records = MappedRecords(
+            self._column('rec_offsets', '<u8', size + 1), self._sections['rec_heap']
+        )
+    
+    def _column(self, name: str, dtype: str, count: int) -> np.ndarray:
+        """Zero-copy NumPy view over a section"""
+        try:
+            return np.frombuffer(self._sections[name], dtype=dtype, count=count)
+        except ValueError as e:
+            raise BinaryCatalogError(f"{self.path} has a corrupt {name} section") from e
+    
+    def ids(self) -> List[str]:
+        """
+        Decode all book ids (used to build the primary-key index)
+        
+        Returns:
+            List of ids, aligned with the records
+        """
+        offsets = self._column('id_offsets', '<u8', self.size + 1).tolist()
+        heap = bytes(self._sections['id_heap'])
+        return [heap[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self.size)]
+
+
+def open_binary_catalog(path: Union[str, Path]) -> Optional[BinaryCatalog]:
+    """
+    Open a binary catalog if it exists and is valid
+    
+    Args:
+        path: Binary catalog file
+    
+    Returns:
+        BinaryCatalog, or None if the file is missing or unusable
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        return BinaryCatalog(path)
+    except BinaryCatalogError as e:
+        logger.warning(f"Ignoring binary catalog: {e}")
+        return None
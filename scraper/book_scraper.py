@@ -3,8 +3,12 @@ Book Scraper - Scrapes book information from websites
 """
 import logging
 import uuid
-from typing import List, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from bs4 import BeautifulSoup
 from scraper.base_scraper import BaseScraper
+from scraper.host_scheduler import HostScheduler
+from scraper.page_cache import PageCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,76 +18,139 @@ class BookScraper(BaseScraper):
     Scraper for book information
     
     Example usage for http://books.toscrape.com (a practice scraping site)
+    
+    Fetching (scrape, scrape_book_details) is kept apart from parsing
+    (parse_listing, parse_item, parse_book_details), which other engines reuse.
     """
     
-    def __init__(self, base_url: str = "http://books.toscrape.com", delay: float = 1.0):
+    # Concurrent detail fetches (default and upper bound)
+    DEFAULT_WORKERS = 1
+    MAX_WORKERS = 32
+    
+    def __init__(
+        self,
+        base_url: str = "http://books.toscrape.com",
+        delay: float = 1.0,
+        workers: Optional[int] = None,
+        scheduler: Optional[HostScheduler] = None,
+        cache: Optional[PageCache] = None
+    ):
         """
         Initialize the book scraper
         
         Args:
             base_url: Base URL of the website to scrape
-            delay: Delay between requests
+            delay: Minimum delay between requests to the site
+            workers: Detail pages fetched concurrently (default DEFAULT_WORKERS; 1: serial)
+            scheduler: Per-host politeness (default: one request every `delay` seconds)
+            cache: Persistent page cache for conditional requests (default: none)
         """
-        super().__init__(delay)
+        workers = self.DEFAULT_WORKERS if workers is None else workers
+        workers = min(workers, self.MAX_WORKERS)
+        super().__init__(delay, workers=workers, scheduler=scheduler, cache=cache)
         self.base_url = base_url.rstrip('/')
     
     def scrape(self, max_pages: int = 1, fetch_details: bool = True) -> List[Dict[str, Any]]:
         """
         Scrape books from multiple pages with detailed information
         
+        With more than one worker, detail pages are fetched by a thread pool
+        while the next listing pages are read; results are merged back in
+        listing order, so the output matches the serial path.
+        
         Args:
             max_pages: Maximum number of pages to scrape
             fetch_details: If True, fetches detailed info for each book (UPC, category, etc.)
-            
+        
         Returns:
             List of book dictionaries with complete information
         """
         all_books = []
+        pending = []  # (book, details or Future of details), in listing order
+        executor = None
+        if fetch_details and self.workers > 1:
+            executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='book-details'
+            )
         
-        for page_num in range(1, max_pages + 1):
-            try:
-                url = f"{self.base_url}/catalogue/page-{page_num}.html"
-                soup = self.fetch_page(url)
-                
-                # Find all book containers
-                book_elements = soup.find_all('article', class_='product_pod')
-                
-                logger.info(f"Found {len(book_elements)} books on page {page_num}")
-                
-                for idx, element in enumerate(book_elements, 1):
-                    try:
-                        # Get basic info first
-                        book_data = self.parse_item(element)
-                        
+        try:
+            for page_num in range(1, max_pages + 1):
+                try:
+                    url = f"{self.base_url}/catalogue/page-{page_num}.html"
+                    
+                    # Get basic info first
+                    page_books = self.parse_listing(self.fetch_page(url))
+                    
+                    logger.info(f"Found {len(page_books)} books on page {page_num}")
+                    
+                    for idx, book_data in enumerate(page_books, 1):
                         # Fetch detailed information if enabled
                         if fetch_details and book_data.get('url'):
-                            logger.info(f"Fetching details for book {idx}/{len(book_elements)} on page {page_num}: {book_data['title']}")
-                            details = self.scrape_book_details(book_data['url'])
-                            
-                            # Merge detailed information
-                            if details:
-                                book_data.update(details)
+                            if executor is not None:
+                                details = executor.submit(
+                                    self.scrape_book_details, book_data['url']
+                                )
+                            else:
+                                logger.info(
+                                    f"Fetching details for book {idx}/{len(page_books)} "
+                                    f"on page {page_num}: {book_data['title']}"
+                                )
+                                details = self.scrape_book_details(book_data['url'])
+                            pending.append((book_data, details))
                         
                         all_books.append(book_data)
-                        
-                    except Exception as e:
-                        logger.error(f"Error parsing book: {e}")
-                        continue
                 
-            except Exception as e:
-                logger.error(f"Error scraping page {page_num}: {e}")
-                break
+                except Exception as e:
+                    logger.error(f"Error scraping page {page_num}: {e}")
+                    break
+            
+            # Merge detailed information
+            for book_data, details in pending:
+                if isinstance(details, Future):
+                    details = details.result()
+                if details:
+                    book_data.update(details)
+        finally:
+            if executor is not None:
+                # Drop queued detail fetches if the merge failed (cancel_futures needs 3.9)
+                for _, details in pending:
+                    if isinstance(details, Future):
+                        details.cancel()
+                executor.shutdown(wait=True)
         
         logger.info(f"Total books scraped: {len(all_books)} (with {'detailed' if fetch_details else 'basic'} info)")
         return all_books
     
+    def parse_listing(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+        """
+        Parse the basic info of every book on a listing page
+        
+        Books that cannot be parsed are logged and skipped.
+        
+        Args:
+            soup: Parsed listing page
+        
+        Returns:
+            Book dictionaries in page order
+        """
+        books = []
+        
+        # Find all book containers
+        for element in soup.find_all('article', class_='product_pod'):
+            try:
+                books.append(self.parse_item(element))
+            except Exception as e:
+                logger.error(f"Error parsing book: {e}")
+        
+        return books
+    
     def parse_item(self, element) -> Dict[str, Any]:
         """
         Parse a single book element from list page (basic info)
         
         Args:
             element: BeautifulSoup element containing book data
-            
+        
         Returns:
             Dictionary with basic book information
         """
@@ -152,101 +219,110 @@ class BookScraper(BaseScraper):
         
         Args:
             book_url: URL of the book detail page
-            
+        
         Returns:
-            Dictionary with detailed book information
+            Dictionary with detailed book information (empty on errors)
         """
         try:
-            soup = self.fetch_page(book_url)
-            
-            details = {}
-            
-            # Extract title
-            title_element = soup.find('h1')
-            if title_element:
-                details['title'] = title_element.text.strip()
-            
-            # Extract category from breadcrumb
-            breadcrumb = soup.find('ul', class_='breadcrumb')
-            if breadcrumb:
-                category_links = breadcrumb.find_all('a')
-                if len(category_links) >= 3:
-                    details['category'] = category_links[2].text.strip()
-                else:
-                    details['category'] = 'General'
-            else:
-                details['category'] = 'General'
-            
-            # Extract product information table
-            table = soup.find('table', class_='table-striped')
-            
-            if table:
-                rows = table.find_all('tr')
-                for row in rows:
-                    th = row.find('th')
-                    td = row.find('td')
-                    
-                    if th and td:
-                        key = th.text.strip()
-                        value = td.text.strip()
-                        
-                        # Map specific fields
-                        if key == 'UPC':
-                            details['upc'] = value
-                        elif key == 'Product Type':
-                            details['product_type'] = value
-                        elif key == 'Price (excl. tax)':
-                            try:
-                                details['price_excl_tax'] = float(value.replace('£', ''))
-                            except ValueError:
-                                details['price_excl_tax'] = 0.0
-                        elif key == 'Price (incl. tax)':
-                            try:
-                                details['price_incl_tax'] = float(value.replace('£', ''))
-                            except ValueError:
-                                details['price_incl_tax'] = 0.0
-                        elif key == 'Tax':
-                            try:
-                                details['tax'] = float(value.replace('£', ''))
-                            except ValueError:
-                                details['tax'] = 0.0
-                        elif key == 'Availability':
-                            # Extract number from "In stock (22 available)"
-                            import re
-                            match = re.search(r'\((\d+)\s+available\)', value)
-                            if match:
-                                details['availability'] = int(match.group(1))
-                            else:
-                                details['availability'] = 0
-                            details['availability_text'] = value
-                        elif key == 'Number of reviews':
-                            try:
-                                details['num_reviews'] = int(value)
-                            except ValueError:
-                                details['num_reviews'] = 0
-            
-            # Extract description
-            description_element = soup.find('div', id='product_description')
-            description = ''
-            if description_element:
-                desc_p = description_element.find_next_sibling('p')
-                description = desc_p.text.strip() if desc_p else ''
-            details['description'] = description
-            
-            # Extract author (if available in description or other fields)
-            # For books.toscrape.com, author is not explicitly available
-            # but we can try to extract from title or description
-            details['author'] = 'Unknown'  # Default value
-            
-            # Extract ISBN (often same as UPC for this site)
-            if 'upc' in details:
-                details['isbn'] = details['upc']  # Use UPC as ISBN fallback
-            else:
-                details['isbn'] = 'N/A'
-            
-            return details
-            
+            return self.parse_book_details(self.fetch_page(book_url))
         except Exception as e:
             logger.error(f"Error scraping book details from {book_url}: {e}")
             return {}
+    
+    def parse_book_details(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        """
+        Parse the detail page of a book
+        
+        Args:
+            soup: Parsed book detail page
+        
+        Returns:
+            Dictionary with detailed book information
+        """
+        details = {}
+        
+        # Extract title
+        title_element = soup.find('h1')
+        if title_element:
+            details['title'] = title_element.text.strip()
+        
+        # Extract category from breadcrumb
+        breadcrumb = soup.find('ul', class_='breadcrumb')
+        if breadcrumb:
+            category_links = breadcrumb.find_all('a')
+            if len(category_links) >= 3:
+                details['category'] = category_links[2].text.strip()
+            else:
+                details['category'] = 'General'
+        else:
+            details['category'] = 'General'
+        
+        # Extract product information table
+        table = soup.find('table', class_='table-striped')
+        
+        if table:
+            rows = table.find_all('tr')
+            for row in rows:
+                th = row.find('th')
+                td = row.find('td')
+                
+                if th and td:
+                    key = th.text.strip()
+                    value = td.text.strip()
+                    
+                    # Map specific fields
+                    if key == 'UPC':
+                        details['upc'] = value
+                    elif key == 'Product Type':
+                        details['product_type'] = value
+                    elif key == 'Price (excl. tax)':
+                        try:
+                            details['price_excl_tax'] = float(value.replace('£', ''))
+                        except ValueError:
+                            details['price_excl_tax'] = 0.0
+                    elif key == 'Price (incl. tax)':
+                        try:
+                            details['price_incl_tax'] = float(value.replace('£', ''))
+                        except ValueError:
+                            details['price_incl_tax'] = 0.0
+                    elif key == 'Tax':
+                        try:
+                            details['tax'] = float(value.replace('£', ''))
+                        except ValueError:
+                            details['tax'] = 0.0
+                    elif key == 'Availability':
+                        # Extract number from "In stock (22 available)"
+                        import re
+                        match = re.search(r'\((\d+)\s+available\)', value)
+                        if match:
+                            details['availability'] = int(match.group(1))
+                        else:
+                            details['availability'] = 0
+                        details['availability_text'] = value
+                    elif key == 'Number of reviews':
+                        try:
+                            details['num_reviews'] = int(value)
+                        except ValueError:
+                            details['num_reviews'] = 0
+        
+        # Extract description
+        description_element = soup.find('div', id='product_description')
+        description = ''
+        if description_element:
+            desc_p = description_element.find_next_sibling('p')
+            description = desc_p.text.strip() if desc_p else ''
+        details['description'] = description
+        
+        # Extract author (if available in description or other fields)
+        # For books.toscrape.com, author is not explicitly available
+        # but we can try to extract from title or description
+        details['author'] = 'Unknown'  # Default value
+        
+        # Extract ISBN (often same as UPC for this site)
+        if 'upc' in details:
+            details['isbn'] = details['upc']  # Use UPC as ISBN fallback
+        else:
+            details['isbn'] = 'N/A'
+        
+        return details
 
@@ -1,12 +1,14 @@
 """
 Data Processor - Process and save scraped data
 """
+import os
 import json
 import csv
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import pandas as pd
+from scraper.binary_catalog import compute_version, write_binary_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -26,30 +28,77 @@ class DataProcessor:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
-    def save_to_json(self, data: List[Dict[str, Any]], filename: str) -> str:
+    def save_to_json(
+        self,
+        data: List[Dict[str, Any]],
+        filename: str,
+        write_binary: bool = True
+    ) -> str:
         """
         Save data to JSON file
         
+        Also writes the memory-mappable binary catalog (<filename>.bin) used
+        by the API, tagged with the same data version as the JSON content.
+        
         Args:
             data: List of dictionaries to save
             filename: Output filename (without extension)
+            write_binary: Also write the binary catalog next to the JSON file
             
         Returns:
             Path to saved file
         """
         filepath = self.output_dir / f"{filename}.json"
+        temp_path = filepath.with_name(f".{filepath.name}.tmp")
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+            
+            # Write to a temporary file and rename it over the target, so readers
+            # (e.g. the API reloading the catalog) never see a half-written file
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, filepath)
             
             logger.info(f"Data saved to {filepath}")
+            
+            if write_binary:
+                self.save_to_binary(data, filename, version=compute_version(content))
+            
             return str(filepath)
         
         except Exception as e:
             logger.error(f"Error saving JSON: {e}")
             raise
     
+    def save_to_binary(
+        self,
+        data: List[Dict[str, Any]],
+        filename: str,
+        version: Optional[str] = None
+    ) -> str:
+        """
+        Save data to a memory-mappable binary catalog
+        
+        Args:
+            data: List of dictionaries to save
+            filename: Output filename (without extension)
+            version: Data version id (defaults to the hash of the compact JSON)
+            
+        Returns:
+            Path to saved file
+        """
+        filepath = self.output_dir / f"{filename}.bin"
+        
+        try:
+            if version is None:
+                version = compute_version(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+            return write_binary_catalog(data, filepath, version)
+        
+        except Exception as e:
+            logger.error(f"Error saving binary catalog: {e}")
+            raise
+    
     def save_to_csv(self, data: List[Dict[str, Any]], filename: str) -> str:
         """
         Save data to CSV file
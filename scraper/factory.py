@@ -0,0 +1,52 @@
+"""
+Scraper Factory - Builds the book scraper for the selected engine
+
+Keeps the choice of scraping engine (threads over requests, or asyncio)
+out of the CLI and the scraping controller.
+"""
+from typing import Optional
+from scraper.async_book_scraper import AsyncBookScraper
+from scraper.book_scraper import BookScraper
+from scraper.host_scheduler import HostScheduler
+from scraper.page_cache import PageCache
+
+# Engine name -> scraper class (same scrape/parse_item contract)
+ENGINES = {
+    'threads': BookScraper,
+    'asyncio': AsyncBookScraper
+}
+
+
+def create_book_scraper(
+    engine: str = 'threads',
+    base_url: str = 'http://books.toscrape.com',
+    delay: float = 1.0,
+    workers: Optional[int] = None,
+    scheduler: Optional[HostScheduler] = None,
+    cache: Optional[PageCache] = None
+) -> BookScraper:
+    """
+    Create the book scraper for an engine
+    
+    Args:
+        engine: 'threads' (requests session, worker pool for detail pages)
+            or 'asyncio' (event loop, many requests in flight)
+        base_url: Base URL of the website to scrape
+        delay: Minimum delay between requests to the site
+        workers: Concurrency (threads: detail fetchers; asyncio: requests in
+            flight per host); None for the engine default
+        scheduler: Per-host token buckets (default: one request every `delay` seconds)
+        cache: Persistent page cache for conditional requests (default: none)
+    
+    Returns:
+        Book scraper instance
+    
+    Raises:
+        ValueError: If the engine is unknown
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Invalid scraping engine: {engine}. Must be one of: {', '.join(ENGINES)}")
+    
+    return ENGINES[engine](
+        base_url=base_url, delay=delay, workers=workers, scheduler=scheduler, cache=cache
+    )
@@ -0,0 +1,355 @@
+"""
+Host Scheduler - Per-host token-bucket politeness shared by concurrent fetchers
+
+Each host gets a token bucket refilled at `rate` tokens per second, holding
+at most `burst` tokens; starting a request takes one token, and at most
+`max_in_flight` requests to a host run at once. Fetchers only wait when the
+bucket is empty or the host is saturated, so time spent on the network
+counts towards the rate, and the configured rate is never exceeded.
+
+Thread workers block in `request()`; asyncio tasks await `request_async()`.
+Both share the same state, and live counters are available from stats().
+
+Fetchers report the response status on the yielded RequestSlot. A 429 or
+503 pauses the host for its Retry-After (DEFAULT_BACKOFF without one), and
+with adaptive bounds the in-flight cap of each host follows an AIMD limit
+driven by response latency and errors (see adaptive_concurrency).
+"""
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+from scraper.adaptive_concurrency import AIMDConcurrency
+
+# Statuses meaning "slow down" (retried by the scrapers after the pause)
+THROTTLE_STATUSES = (429, 503)
+
+# Pause of a throttled host without Retry-After, and cap on Retry-After (seconds)
+DEFAULT_BACKOFF = 1.0
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header
+    
+    Args:
+        value: Header value, delay-seconds or HTTP-date
+    
+    Returns:
+        Seconds (0 to MAX_RETRY_AFTER), or None if missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        seconds = (date - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+class RequestSlot:
+    """
+    A started request; the fetcher reports the response on it
+    """
+    
+    __slots__ = ('started', 'status', 'retry_after')
+    
+    def __init__(self, started: float):
+        self.started = started
+        self.status: Optional[int] = None
+        self.retry_after: Optional[str] = None
+    
+    def complete(self, status: int, retry_after: Optional[str] = None) -> None:
+        """
+        Record the response
+        
+        Args:
+            status: Response status code
+            retry_after: Retry-After header, if any
+        """
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _HostState:
+    """
+    Bucket and counters of one host
+    """
+    
+    __slots__ = (
+        'tokens', 'updated', 'in_flight', 'waiting', 'requests', 'starts', 'async_waiters',
+        'blocked_until', 'throttled', 'concurrency'
+    )
+    
+    def __init__(self, burst: int, now: float, concurrency: Optional[AIMDConcurrency] = None):
+        self.tokens = float(burst)
+        self.updated = now
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.starts: Deque[float] = deque()  # Request start times within the rate window
+        self.async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.blocked_until = now  # No request starts before (Retry-After)
+        self.throttled = 0
+        self.concurrency = concurrency
+
+
+class HostScheduler:
+    """
+    Token-bucket rate limit and in-flight cap per host (thread-safe)
+    
+    Responsibilities:
+    - Hand out request starts per host at `rate`/s with bursts of `burst`
+    - Cap concurrent requests per host at `max_in_flight`, or at an
+      adaptive (AIMD) limit within `adaptive` bounds
+    - Pause throttled hosts (429/503) until their Retry-After
+    - Report live counters (waiting, in flight, achieved rate, concurrency)
+    """
+    
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 1,
+        max_in_flight: int = 0,
+        window: float = 10.0,
+        adaptive: Optional[Tuple[int, int]] = None
+    ):
+        """
+        Initialize the scheduler
+        
+        Args:
+            rate: Requests per second per host (0: unlimited)
+            burst: Requests that may start back to back after an idle period
+            max_in_flight: Concurrent requests per host (0: unlimited)
+            window: Seconds over which the achieved rate is measured
+            adaptive: (min, max) concurrency per host for the AIMD limit
+                (None: fixed max_in_flight only)
+        """
+        self.rate = max(0.0, rate)
+        self.burst = max(1, burst)
+        self.max_in_flight = max(0, max_in_flight)
+        self.window = window
+        self.adaptive = adaptive
+        self._condition = threading.Condition()
+        self._hosts: Dict[str, _HostState] = {}
+    
+    @classmethod
+    def from_delay(cls, delay: float, **kwargs) -> 'HostScheduler':
+        """
+        Scheduler allowing one request every `delay` seconds per host
+        
+        Args:
+            delay: Seconds between request starts (0: unlimited)
+            kwargs: Other HostScheduler arguments
+        
+        Returns:
+            New HostScheduler
+        """
+        return cls(rate=1.0 / delay if delay > 0 else 0.0, **kwargs)
+    
+    @contextmanager
+    def request(self, url: str) -> Iterator[RequestSlot]:
+        """
+        Block until a request to the host of url may start, and count it in
+        flight until the block exits
+        
+        Args:
+            url: URL about to be fetched
+        
+        Yields:
+            RequestSlot to report the response on (an exception leaving the
+            block counts as a failed request)
+        """
+        state = self._state(url)
+        with self._condition:
+            state.waiting += 1
+            try:
+                while True:
+                    wait = self._try_start(state)
+                    if wait == 0:
+                        break
+                    self._condition.wait(timeout=wait)  # None: until a request finishes
+            finally:
+                state.waiting -= 1
+        slot = RequestSlot(time.monotonic())
+        failed = False
+        try:
+            yield slot
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._finish(state, slot, failed)
+    
+    @asynccontextmanager
+    async def request_async(self, url: str) -> AsyncIterator[RequestSlot]:
+        """
+        Await until a request to the host of url may start, and count it in
+        flight until the block exits (asyncio counterpart of request)
+        
+        Args:
+            url: URL about to be fetched
+        
+        Yields:
+            RequestSlot to report the response on
+        """
+        state = self._state(url)
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            state.waiting += 1
+        try:
+            while True:
+                wakeup = None
+                with self._condition:
+                    wait = self._try_start(state)
+                    if wait == 0:
+                        break
+                    if wait is None:
+                        wakeup = loop.create_future()
+                        state.async_waiters.append((loop, wakeup))
+                if wakeup is not None:
+                    await wakeup  # Resolved when a request to the host finishes
+                else:
+                    await asyncio.sleep(wait)
+        finally:
+            with self._condition:
+                state.waiting -= 1
+        slot = RequestSlot(time.monotonic())
+        failed = False
+        try:
+            yield slot
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._finish(state, slot, failed)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Live counters per host
+        
+        Returns:
+            Host -> {'waiting', 'in_flight', 'requests', 'achieved_rate'
+            (request starts in the last `window` seconds, per second),
+            'rate', 'burst', 'max_in_flight', 'throttled' (429/503 responses),
+            'blocked_for' (seconds left of a Retry-After pause) and, with
+            adaptive bounds, 'concurrency' (AIMDConcurrency.stats())}
+        """
+        with self._condition:
+            now = time.monotonic()
+            stats = {}
+            for host, state in self._hosts.items():
+                self._trim(state, now)
+                stats[host] = {
+                    'waiting': state.waiting,
+                    'in_flight': state.in_flight,
+                    'requests': state.requests,
+                    'achieved_rate': round(self._achieved_rate(state, now), 3),
+                    'rate': self.rate,
+                    'burst': self.burst,
+                    'max_in_flight': self.max_in_flight,
+                    'throttled': state.throttled,
+                    'blocked_for': round(max(0.0, state.blocked_until - now), 3)
+                }
+                if state.concurrency is not None:
+                    stats[host]['concurrency'] = state.concurrency.stats()
+            return stats
+    
+    def _state(self, url: str) -> _HostState:
+        """Counters of the host of url, created on first use (private method)"""
+        host = urlsplit(url).netloc
+        with self._condition:
+            state = self._hosts.get(host)
+            if state is None:
+                concurrency = None
+                if self.adaptive:
+                    concurrency = AIMDConcurrency(*self.adaptive)
+                state = self._hosts[host] = _HostState(self.burst, time.monotonic(), concurrency)
+            return state
+    
+    def _try_start(self, state: _HostState) -> Optional[float]:
+        """
+        Start a request if the host allows it; call with the lock held (private method)
+        
+        Returns:
+            0 if started, seconds until the host pause ends or a token is
+            available, or None if the host is at its in-flight cap
+        """
+        now = time.monotonic()
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        
+        if self.max_in_flight and state.in_flight >= self.max_in_flight:
+            return None
+        if state.concurrency is not None and state.in_flight >= state.concurrency.current:
+            return None
+        
+        if self.rate > 0:
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+            state.updated = now
+            if state.tokens < 1:
+                return (1 - state.tokens) / self.rate
+            state.tokens -= 1
+        
+        state.in_flight += 1
+        state.requests += 1
+        state.starts.append(now)
+        self._trim(state, now)
+        return 0
+    
+    def _finish(self, state: _HostState, slot: RequestSlot, failed: bool) -> None:
+        """
+        Count a request as done, apply its outcome and wake up the host's
+        waiters (private method)
+        
+        Throttled responses pause the host; failures and 5xx cut the
+        adaptive limit, other responses below 400 feed it.
+        """
+        now = time.monotonic()
+        with self._condition:
+            state.in_flight -= 1
+            if slot.status in THROTTLE_STATUSES:
+                state.throttled += 1
+                pause = parse_retry_after(slot.retry_after)
+                pause = DEFAULT_BACKOFF if pause is None else pause
+                state.blocked_until = max(state.blocked_until, now + pause)
+            if state.concurrency is not None:
+                overloaded = slot.status is not None and (
+                    slot.status >= 500 or slot.status in THROTTLE_STATUSES
+                )
+                if failed or overloaded:
+                    state.concurrency.on_overload(slot.started, now)
+                elif slot.status is not None and slot.status < 400:
+                    state.concurrency.on_success(slot.started, now - slot.started, now)
+            waiters, state.async_waiters = state.async_waiters, []
+            self._condition.notify_all()
+        for loop, wakeup in waiters:
+            loop.call_soon_threadsafe(_resolve, wakeup)
+    
+    def _trim(self, state: _HostState, now: float) -> None:
+        """Drop request starts older than the window (private method)"""
+        while state.starts and state.starts[0] <= now - self.window:
+            state.starts.popleft()
+    
+    def _achieved_rate(self, state: _HostState, now: float) -> float:
+        """Request starts in the last window, per second (private method)"""
+        return len(state.starts) / self.window if self.window > 0 else 0.0
+
+
+def _resolve(wakeup: asyncio.Future) -> None:
+    """Wake up an asyncio waiter unless it was cancelled"""
+    if not wakeup.done():
+        wakeup.set_result(None)
@@ -3,7 +3,9 @@ Main script to run the scraper
 """
 import logging
 import argparse
-from scraper.book_scraper import BookScraper
+from scraper.factory import ENGINES, create_book_scraper
+from scraper.host_scheduler import HostScheduler
+from scraper.page_cache import PageCache
 from scraper.data_processor import DataProcessor
 
 logging.basicConfig(
@@ -43,17 +45,105 @@ def main():
         default='both',
         help='Output format'
     )
+    parser.add_argument(
+        '--engine',
+        type=str,
+        choices=list(ENGINES),
+        default='threads',
+        help='Scraping engine'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help=(
+            'Concurrency: detail fetch threads (default 1, serial) or requests in flight '
+            'per host for asyncio (default 64)'
+        )
+    )
+    parser.add_argument(
+        '--delay',
+        type=float,
+        default=1.0,
+        help='Minimum seconds between requests to the site'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=None,
+        help='Requests per second to the site (default: 1 / delay)'
+    )
+    parser.add_argument(
+        '--burst',
+        type=int,
+        default=1,
+        help='Requests that may start back to back after an idle period'
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=0,
+        help='Concurrent requests to the site (0: unlimited)'
+    )
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Adapt the concurrency to the site latency and errors (AIMD)'
+    )
+    parser.add_argument(
+        '--min-concurrency',
+        type=int,
+        default=1,
+        help='Lower bound of the adaptive concurrency'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=None,
+        help='Upper bound of the adaptive concurrency (default: workers)'
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Cache pages on disk and revalidate them (If-None-Match / If-Modified-Since)'
+    )
+    parser.add_argument(
+        '--cache-path',
+        type=str,
+        default='data/cache/pages.sqlite3',
+        help='Page cache file'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=256,
+        help='Maximum size of the cached pages (least recently used evicted first)'
+    )
     
     args = parser.parse_args()
     
     try:
         # Initialize scraper
         logger.info("Starting book scraper...")
-        scraper = BookScraper(base_url=args.url, delay=1.0)
+        workers = args.workers or ENGINES[args.engine].DEFAULT_WORKERS
+        bounds = (args.min_concurrency, args.max_concurrency or workers) if args.adaptive else None
+        limits = {'burst': args.burst, 'max_in_flight': args.max_in_flight, 'adaptive': bounds}
+        if args.rate is None:
+            scheduler = HostScheduler.from_delay(args.delay, **limits)
+        else:
+            scheduler = HostScheduler(rate=args.rate, **limits)
+        cache = PageCache(args.cache_path, args.cache_max_mb * 1024 * 1024) if args.cache else None
+        scraper = create_book_scraper(
+            args.engine, base_url=args.url, workers=args.workers, scheduler=scheduler, cache=cache
+        )
         
         # Scrape data
         books = scraper.scrape(max_pages=args.pages)
         scraper.close()
+        logger.info(f"Request scheduling: {scheduler.stats()}")
+        if cache:
+            logger.info(f"Page cache: {cache.stats()}")
+            cache.close()
         
         if not books:
             logger.warning("No books were scraped!")
@@ -78,7 +168,7 @@ def main():
         logger.info(f"Scraping Report: {report}")
         
         logger.info("✅ Scraping completed successfully!")
-        
+    
     except Exception as e:
         logger.error(f"❌ Error during scraping: {e}")
         raise
@@ -0,0 +1,209 @@
+"""
+Page Cache - Persistent HTTP cache of scraped pages with conditional revalidation
+
+Pages are stored in SQLite by URL, with the body and the validators sent by
+the server (ETag, Last-Modified). The next scrape sends them back as
+If-None-Match / If-Modified-Since; a 304 Not Modified reuses the stored
+body, so unchanged pages cost a round trip but no download. Pages without
+validators are not stored (they could never be revalidated).
+
+The total size of the stored bodies is bounded: the least recently used
+pages are evicted first. The database runs in WAL mode, so several jobs
+(each with its own PageCache and counters) can share the file.
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    body          BLOB NOT NULL,
+    size          INTEGER NOT NULL,
+    accessed      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed);
+"""
+
+
+class CachedPage:
+    """
+    Stored page and its validators
+    """
+    
+    __slots__ = ('url', 'body', 'etag', 'last_modified')
+    
+    def __init__(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+    
+    def validators(self) -> Dict[str, str]:
+        """
+        Conditional request headers for this page
+        
+        Returns:
+            Dictionary with If-None-Match and/or If-Modified-Since
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    Size-bounded LRU cache of pages on disk (thread-safe)
+    
+    Responsibilities:
+    - Look up stored pages and their validators by URL
+    - Store downloaded pages that carry ETag or Last-Modified
+    - Evict least recently used pages beyond max_bytes
+    - Count hits (304, body reused) and misses (full download)
+    """
+    
+    def __init__(self, path: str = 'data/cache/pages.sqlite3', max_bytes: int = 256 * 1024 * 1024):
+        """
+        Open (or create) the cache
+        
+        Args:
+            path: SQLite database file
+            max_bytes: Maximum total size of the stored bodies
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max(0, max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+    
+    def get(self, url: str) -> Optional[CachedPage]:
+        """
+        Stored page of a URL
+        
+        Args:
+            url: Page URL
+        
+        Returns:
+            CachedPage, or None if not cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, etag, last_modified FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedPage(url, row[0], row[1], row[2])
+    
+    def revalidated(self, page: CachedPage) -> bytes:
+        """
+        Record a 304 Not Modified for a stored page
+        
+        Args:
+            page: Page returned by get()
+        
+        Returns:
+            The stored body
+        """
+        with self._lock:
+            self.hits += 1
+            self._conn.execute(
+                'UPDATE pages SET accessed = ? WHERE url = ?', (time.time(), page.url)
+            )
+        return page.body
+    
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> None:
+        """
+        Record a full download, keeping it if it can be revalidated
+        
+        Args:
+            url: Page URL
+            body: Response body
+            etag: ETag header, if any
+            last_modified: Last-Modified header, if any
+        """
+        with self._lock:
+            self.misses += 1
+            if not (etag or last_modified) or len(body) > self.max_bytes:
+                self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+                return
+            
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO pages (url, etag, last_modified, body, size, accessed) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (url, etag, last_modified, sqlite3.Binary(body), len(body), time.time())
+                )
+                self._evict()
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters of this cache instance and size of the shared store
+        
+        Returns:
+            Dictionary with 'hits', 'misses', 'hit_ratio', 'evictions',
+            'entries', 'bytes' and 'max_bytes'
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages'
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes
+            }
+    
+    def close(self) -> None:
+        """
+        Close the database connection
+        """
+        with self._lock:
+            self._conn.close()
+    
+    def _evict(self) -> None:
+        """Delete least recently used pages beyond max_bytes, in a transaction (private method)"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        
+        victims = []
+        for url, size in self._conn.execute('SELECT url, size FROM pages ORDER BY accessed'):
+            victims.append((url,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany('DELETE FROM pages WHERE url = ?', victims)
+        self.evictions += len(victims)
@@ -18,6 +18,7 @@ setup(
         'beautifulsoup4>=4.12.2',
         'lxml>=4.9.3',
         'pandas>=2.1.3',
+        'numpy>=1.26.0',
         'python-dotenv>=1.0.0',
     ],
     extras_require={
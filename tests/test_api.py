@@ -1,8 +1,17 @@
 """
 Tests for the API module
 """
+import gzip
+import json
+import threading
 import pytest
+from contextlib import contextmanager
+from flask import jsonify
+from flask_jwt_extended import create_access_token
+from api import routes
 from api.app import create_app
+from api.http_cache import request_etag
+from api.repositories.encoded_book import EncodedBook, FieldProjection
 
 
 @pytest.fixture
@@ -59,3 +68,208 @@ def test_create_book(client):
     data = response.get_json()
     assert data['book']['title'] == 'Test Book'
 
+
+def test_json_responses_join_book_fragments():
+    """Test responses reuse pre-encoded book fragments and pretty output is opt-in"""
+    app = create_app()
+    book = EncodedBook({'id': 'b1', 'title': 'Coração'})
+    
+    with app.test_request_context('/api/v1/books'):
+        response = jsonify({'books': [book], 'total': 1})
+        assert response.get_data() == b'{"books":[' + book.fragment + b'],"total":1}\n'
+        stored = EncodedBook({'id': 'x'}, b'{"stored":true}')
+        assert app.json.encode({'book': stored}) == b'{"book":{"stored":true}}'
+    
+    with app.test_request_context('/api/v1/books?pretty=1'):
+        response = jsonify({'books': [book], 'total': 1})
+        assert b'\n  "books"' in response.get_data()
+        assert response.get_json() == {'books': [{'id': 'b1', 'title': 'Coração'}], 'total': 1}
+
+
+def test_conditional_get_returns_not_modified(monkeypatch):
+    """Test ETag/Last-Modified validators answer 304 without running the view"""
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity='reader')
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    response = client.get('/api/v1/books?limit=2&page=1', headers=headers)
+    etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    assert client.get('/api/v1/books?page=1&limit=2', headers=headers).headers['ETag'] == etag
+    assert client.get('/api/v1/books?page=2&limit=2', headers=headers).headers['ETag'] != etag
+    
+    def fail(*args, **kwargs):
+        raise AssertionError('controller called for a fresh client copy')
+    monkeypatch.setattr(routes.book_controller, 'get_all_books', fail)
+    
+    response = client.get(
+        '/api/v1/books?limit=2&page=1',
+        headers={**headers, 'If-None-Match': etag}
+    )
+    assert response.status_code == 304 and response.get_data() == b''
+    assert response.headers['ETag'] == etag
+    
+    response = client.get(
+        '/api/v1/books?limit=2&page=1',
+        headers={**headers, 'If-Modified-Since': last_modified}
+    )
+    assert response.status_code == 304
+    response = client.get('/api/v1/books?limit=2&page=1', headers={'If-None-Match': etag})
+    assert response.status_code == 401
+
+
+def test_gzip_bodies_compressed_once_per_version(monkeypatch):
+    """Test gzip negotiation and reuse of compressed bodies"""
+    app = create_app()
+    app.config['GZIP_MIN_SIZE'] = 0
+    with app.app_context():
+        token = create_access_token(identity='reader')
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    url = '/api/v1/books?limit=3&search=o'
+    
+    plain = client.get(url, headers=headers)
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    refused = client.get(url, headers={**headers, 'Accept-Encoding': 'gzip;q=0'})
+    assert refused.get_data() == plain.get_data()
+    
+    response = client.get(url, headers={**headers, 'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert response.headers['ETag'] != plain.headers['ETag']
+    
+    def fail(*args, **kwargs):
+        raise AssertionError('controller called for a cached compressed body')
+    monkeypatch.setattr(routes.book_controller, 'get_all_books', fail)
+    hits = routes.compressed_cache.hits
+    
+    again = client.get(url, headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert again.get_data() == response.get_data()
+    assert routes.compressed_cache.hits == hits + 1
+
+
+def test_reload_during_render_keeps_validators_and_body_together(monkeypatch, tmp_path):
+    """Test a reload published between the validator read and the render mixes no versions"""
+    app = create_app()
+    app.config['GZIP_MIN_SIZE'] = 0
+    with app.app_context():
+        token = create_access_token(identity='reader')
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'}
+    url = '/api/v1/books?limit=3&offset=1'
+    
+    repository = routes.book_repository
+    version, total = repository.version, repository.count()
+    new_file = tmp_path / 'books.json'
+    new_file.write_text(json.dumps([{'id': 'only', 'title': 'Only one', 'price': 1.0}]))
+    with app.test_request_context(url):
+        etag = request_etag(version) + '-gz'
+    
+    get_all_books = routes.book_controller.get_all_books
+    
+    def reload_then_render(*args, **kwargs):
+        reloader = threading.Thread(target=repository.reload)
+        reloader.start()
+        reloader.join()
+        return get_all_books(*args, **kwargs)
+    monkeypatch.setattr(routes.book_controller, 'get_all_books', reload_then_render)
+    
+    data_file, binary_file = repository.data_file, repository.binary_file
+    repository.data_file, repository.binary_file = str(new_file), None
+    try:
+        response = client.get(url, headers=headers)
+        assert repository.version != version
+        assert response.headers['ETag'] == f'"{etag}"'
+        assert json.loads(gzip.decompress(response.get_data()))['total'] == total
+        
+        monkeypatch.setattr(routes.book_controller, 'get_all_books', get_all_books)
+        fresh = client.get(url, headers=headers)
+        assert fresh.headers['ETag'] != response.headers['ETag']
+        assert json.loads(gzip.decompress(fresh.get_data()))['total'] == 1
+    finally:
+        repository.data_file, repository.binary_file = data_file, binary_file
+        repository.reload()
+
+
+def test_field_projection_encodes_selected_values():
+    """Test fields= projections are compiled once and applied during encoding"""
+    projection = FieldProjection.parse('id, title,price,missing,title')
+    book = EncodedBook({'id': 'b1', 'title': 'Ação "1"', 'price': 9.5, 'description': 'long text'})
+    
+    assert projection.fields == ('id', 'title', 'price', 'missing')
+    assert projection is FieldProjection.parse('id,title,price,missing')
+    projected = {'id': 'b1', 'title': 'Ação "1"', 'price': 9.5, 'missing': None}
+    assert json.loads(projection.encode(book)) == projected
+    assert FieldProjection.parse('') is None
+    with pytest.raises(ValueError):
+        FieldProjection.parse('id,author.name')
+    
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity='reader')
+        body = app.json.encode({'books': [book], 'total': 1}, projection)
+    assert json.loads(body)['books'] == [projected]
+    
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/api/v1/books?limit=2&fields=id,price', headers=headers)
+    assert all(set(item) == {'id', 'price'} for item in response.get_json()['books'])
+    response = client.get('/api/v1/books/1?fields=title', headers=headers)
+    assert set(response.get_json()['book']) == {'title'}
+    assert client.get('/api/v1/books/search?fields=a-b', headers=headers).status_code == 400
+
+
+def test_batch_runs_reads_in_one_round_trip(monkeypatch):
+    """Test /batch embeds each sub-response, computed from one data version"""
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity='reader')
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    views, depth = [], [0]
+    consistent_view = routes.book_repository.consistent_view
+    
+    @contextmanager
+    def tracked_view():
+        views.append(depth[0] == 0)  # Outermost views only; controllers nest their own
+        depth[0] += 1
+        try:
+            with consistent_view():
+                yield
+        finally:
+            depth[0] -= 1
+    monkeypatch.setattr(routes.book_repository, 'consistent_view', tracked_view)
+    
+    response = client.post('/api/v1/batch', headers=headers, json={'requests': [
+        {'id': 'stats', 'path': '/stats'},
+        {'id': 'books', 'path': '/api/v1/books?page=1', 'params': {'limit': 3}},
+        {'path': '/categories'},
+        {'id': 'missing', 'path': '/books/00000000-0000-4000-8000-000000000000'},
+        {'id': 'bad', 'path': '/books', 'params': {'limit': 0}},
+        {'id': 'export', 'path': '/books/export'},
+        {'id': 'unknown', 'path': '/nope'}
+    ]})
+    data = response.get_json()
+    assert response.status_code == 200 and views.count(True) == 1
+    assert data['version'] == routes.book_repository.version
+    assert [(item['id'], item['status']) for item in data['responses']] == [
+        ('stats', 200), ('books', 200), (2, 200), ('missing', 404),
+        ('bad', 400), ('export', 400), ('unknown', 404)
+    ]
+    stats = client.get('/api/v1/stats', headers=headers).get_json()
+    books = client.get('/api/v1/books?limit=3', headers=headers).get_json()
+    assert data['responses'][0]['body'] == stats
+    assert data['responses'][1]['body'] == books
+    
+    assert client.post('/api/v1/batch', json={'requests': [{'path': '/stats'}]}).status_code == 401
+    invalid_bodies = (
+        {}, {'requests': []}, {'requests': [{'path': 'stats'}]},
+        {'requests': [{'path': '/stats'}] * 21}
+    )
+    for invalid in invalid_bodies:
+        assert client.post('/api/v1/batch', headers=headers, json=invalid).status_code == 400
@@ -0,0 +1,651 @@
+"""
+Tests for the book repository and controller
+"""
+import io
+import os
+import csv
+import gzip
+import json
+import time
+import random
+import threading
+import pytest
+from api.repositories.book_repository import BookRepository
+from api.repositories.sqlite_book_repository import SqliteBookRepository
+from api.repositories.book_query import BookQuery
+from api.repositories.encoded_book import EncodedBook, encode_book
+from api.repositories.query_planner import QueryPlan, QueryPlanner
+from api.controllers import book_export
+from api.controllers.book_controller import BookController
+from api.controllers.result_cache import ResultCache
+from scraper.data_processor import DataProcessor
+
+
+SAMPLE_BOOKS = [
+    {
+        'id': '6f1c2a8e-1d4b-4c1e-9a0b-1f2e3d4c5b6a',
+        'title': 'A Light in the Attic',
+        'price': 51.77,
+        'rating': 3,
+        'in_stock': True,
+        'availability': 22,
+        'category': 'Poetry'
+    },
+    {
+        'id': '0b7d5c3a-9e8f-4a1b-8c2d-3e4f5a6b7c8d',
+        'title': 'Tipping the Velvet',
+        'price': 53.74,
+        'rating': 1,
+        'in_stock': True,
+        'availability': 20,
+        'category': 'Historical Fiction'
+    },
+    {
+        'id': 'c4d3e2f1-a0b9-4c8d-7e6f-5a4b3c2d1e0f',
+        'title': 'Soumission',
+        'price': 50.10,
+        'rating': 1,
+        'in_stock': False,
+        'availability': 0,
+        'category': 'Fiction'
+    }
+]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    """Write sample books to a temporary JSON file"""
+    path = tmp_path / 'books.json'
+    path.write_text(json.dumps(SAMPLE_BOOKS), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def repository(data_file):
+    """Create repository backed by the sample data file"""
+    return BookRepository(data_file=str(data_file))
+
+
+def test_find_by_id(repository):
+    """Test lookup through the primary-key index"""
+    book = repository.find_by_id(SAMPLE_BOOKS[1]['id'])
+    assert book is not None
+    assert book['title'] == 'Tipping the Velvet'
+
+
+def test_find_by_id_unknown_and_malformed(repository):
+    """Test unknown and malformed ids return None"""
+    assert repository.find_by_id('00000000-0000-4000-8000-000000000000') is None
+    assert repository.find_by_id('not-a-uuid') is None
+    assert repository.find_by_id('') is None
+
+
+def test_find_by_id_after_reload(repository, data_file):
+    """Test index stays consistent across reloads"""
+    new_book = dict(SAMPLE_BOOKS[0], id='11111111-2222-4333-8444-555555555555')
+    data_file.write_text(json.dumps([new_book]), encoding='utf-8')
+    repository.reload()
+    
+    assert repository.find_by_id(new_book['id']) is not None
+    assert repository.find_by_id(SAMPLE_BOOKS[0]['id']) is None
+
+
+def test_default_books_numeric_ids(tmp_path):
+    """Test numeric ids of default books match string lookups"""
+    repository = BookRepository(data_file=str(tmp_path / 'missing.json'))
+    assert repository.find_by_id('1')['title'] == 'Python Machine Learning'
+
+
+def test_controller_get_book_by_id(repository):
+    """Test controller lookup by id"""
+    controller = BookController(repository=repository)
+    assert 'book' in controller.get_book_by_id(SAMPLE_BOOKS[0]['id'])
+    assert controller.get_book_by_id('missing') == {'error': 'Book not found'}
+
+
+def test_reload_publishes_new_snapshot(repository, data_file):
+    """Test reload swaps in a new immutable snapshot"""
+    old_snapshot = repository.snapshot()
+    data_file.write_text(json.dumps(SAMPLE_BOOKS[:1]), encoding='utf-8')
+    new_snapshot = repository.reload()
+    
+    assert new_snapshot is repository.snapshot()
+    assert new_snapshot.version != old_snapshot.version
+    assert old_snapshot.total == 3 and new_snapshot.total == 1
+    with pytest.raises(AttributeError):
+        new_snapshot.total = 10
+
+
+def test_reload_keeps_snapshot_on_invalid_json(repository, data_file):
+    """Test an unreadable data file keeps the previous snapshot"""
+    old_snapshot = repository.snapshot()
+    data_file.write_text('[{"id": ', encoding='utf-8')
+    
+    assert repository.reload() is old_snapshot
+    assert repository.count() == 3
+
+
+def test_controller_statistics(repository):
+    """Test statistics served from snapshot aggregates"""
+    controller = BookController(repository=repository)
+    stats = controller.get_statistics()
+    
+    assert stats['total_books'] == 3
+    assert stats['average_price'] == round((51.77 + 53.74 + 50.10) / 3, 2)
+    assert stats['categories'] == {'Poetry': 1, 'Historical Fiction': 1, 'Fiction': 1}
+    assert controller.get_categories()['total'] == 3
+
+
+@pytest.mark.parametrize('backend', ['inotify', 'poll'])
+def test_watcher_reloads_on_change(repository, data_file, backend):
+    """Test background watcher publishes a new snapshot after a file change"""
+    old_version = repository.snapshot().version
+    repository.start_watching(poll_interval=0.1, backend=backend)
+    try:
+        time.sleep(0.3)
+        data_file.write_text(json.dumps(SAMPLE_BOOKS[:2]), encoding='utf-8')
+        
+        deadline = time.time() + 5
+        while repository.snapshot().version == old_version and time.time() < deadline:
+            time.sleep(0.05)
+        
+        assert repository.count() == 2
+    finally:
+        repository.stop_watching()
+
+
+def test_columns_match_records(repository):
+    """Test columnar view is aligned with the records"""
+    columns = repository.snapshot().columns
+    
+    assert columns.price.dtype.name == 'float64'
+    assert columns.rating.dtype.name == 'int8'
+    assert columns.availability.tolist() == [22, 20, 0]
+    assert columns.in_stock.tolist() == [True, True, False]
+    assert columns.categories[columns.category_codes[1]] == 'Historical Fiction'
+
+
+def test_controller_search_through_columns(repository):
+    """Test title/category filters and paginated search"""
+    controller = BookController(repository=repository)
+    
+    assert controller.search_books(category='fiction')['total'] == 1
+    assert controller.search_books(title='the', category='HISTORICAL FICTION')['total'] == 1
+    assert controller.search_books(category='Unknown')['books'] == []
+    
+    result = controller.get_all_books(page=2, limit=1, search='i')
+    assert result['total'] == 3
+    assert result['books'][0]['title'] == 'Tipping the Velvet'
+
+
+def test_binary_catalog_roundtrip(tmp_path):
+    """Test DataProcessor binary catalog is memory-mapped by the repository"""
+    processor = DataProcessor(output_dir=str(tmp_path))
+    json_path = processor.save_to_json(SAMPLE_BOOKS, 'books')
+    
+    assert (tmp_path / 'books.bin').exists()
+    
+    json_repository = BookRepository(data_file=json_path, use_binary=False)
+    binary_repository = BookRepository(data_file=json_path)
+    snapshot = binary_repository.snapshot()
+    
+    assert snapshot.source.endswith('books.bin')
+    assert snapshot.version == json_repository.snapshot().version
+    assert list(snapshot.books) == SAMPLE_BOOKS
+    assert snapshot.columns.price.tolist() == [51.77, 53.74, 50.10]
+    assert binary_repository.find_by_id(SAMPLE_BOOKS[2]['id'])['title'] == 'Soumission'
+    assert BookController(binary_repository).search_books(category='poetry')['total'] == 1
+
+
+@pytest.fixture
+def sqlite_repository(data_file, tmp_path):
+    """Create SQLite repository importing the sample data file"""
+    return SqliteBookRepository(
+        database_url=f"sqlite:///{tmp_path / 'books.db'}",
+        data_file=str(data_file)
+    )
+
+
+def test_sqlite_repository_queries(sqlite_repository, repository):
+    """Test SQLite repository answers like the in-memory repository"""
+    assert sqlite_repository.count() == 3
+    assert sqlite_repository.version == repository.version
+    assert sqlite_repository.find_by_id(SAMPLE_BOOKS[0]['id']) == SAMPLE_BOOKS[0]
+    assert sqlite_repository.find_by_id('missing') is None
+    
+    sqlite_controller = BookController(repository=sqlite_repository)
+    memory_controller = BookController(repository=repository)
+    
+    assert sqlite_controller.get_statistics() == memory_controller.get_statistics()
+    assert sqlite_controller.get_categories() == memory_controller.get_categories()
+    assert sqlite_controller.get_all_books(page=2, limit=1, search='i') == \
+        memory_controller.get_all_books(page=2, limit=1, search='i')
+    assert sqlite_controller.search_books(title='the', category='historical fiction') == \
+        memory_controller.search_books(title='the', category='historical fiction')
+
+
+def test_sqlite_repository_reload(sqlite_repository, data_file):
+    """Test reload imports a changed data file and skips an unchanged one"""
+    assert sqlite_repository.count() == 3
+    assert sqlite_repository.reload() is False
+    
+    data_file.write_text(json.dumps(SAMPLE_BOOKS[:1]), encoding='utf-8')
+    assert sqlite_repository.reload() is True
+    assert sqlite_repository.count() == 1
+
+
+def test_sqlite_repository_imports_changed_file_without_watcher(sqlite_repository, data_file):
+    """Test reads re-import the data file once its mtime changes"""
+    assert sqlite_repository.count() == 3
+    version = sqlite_repository.version
+    
+    data_file.write_text(json.dumps(SAMPLE_BOOKS[:2]), encoding='utf-8')
+    os.utime(data_file, (1_600_000_000, 1_600_000_000))
+    assert sqlite_repository.count() == 2
+    assert sqlite_repository.version != version
+    
+    with sqlite_repository.consistent_view():
+        data_file.write_text(json.dumps(SAMPLE_BOOKS[:1]), encoding='utf-8')
+        assert sqlite_repository.count() == 2  # Pinned until the view exits
+    assert sqlite_repository.count() == 1
+
+
+def _walk_cursor(controller, **params):
+    """Collect book ids by following next_cursor until the last page"""
+    ids, cursor = [], ''
+    while cursor is not None:
+        result = controller.get_all_books(cursor=cursor, **params)
+        ids.extend(book['id'] for book in result['books'])
+        cursor = result['next_cursor']
+    return ids
+
+
+def test_cursor_pagination_matches_offset_pages(repository, sqlite_repository):
+    """Test keyset pages cover the same books as page/limit, for both repositories"""
+    for controller in (BookController(repository), BookController(sqlite_repository)):
+        assert _walk_cursor(controller, limit=2) == [book['id'] for book in SAMPLE_BOOKS]
+        assert _walk_cursor(controller, limit=1, search='i') == \
+            [book['id'] for book in controller.get_all_books(limit=10, search='i')['books']]
+        assert _walk_cursor(controller, limit=3)  # Exactly one full page
+        assert controller.get_all_books(cursor='', limit=3)['next_cursor'] is None
+
+
+def test_cursor_filtered_scan_in_chunks(repository, monkeypatch):
+    """Test filtered keyset scans resume correctly across scan chunks"""
+    monkeypatch.setattr(QueryPlanner, 'SCAN_CHUNK', 1)
+    controller = BookController(repository)
+    
+    expected = [SAMPLE_BOOKS[0]['id'], SAMPLE_BOOKS[1]['id']]
+    assert _walk_cursor(controller, limit=1, search='t') == expected
+
+
+def test_cursor_rejected_after_reload_or_other_search(repository, data_file, monkeypatch):
+    """Test cursors expire on reload and cannot be replayed with another search"""
+    controller = BookController(repository)
+    cursor = controller.get_all_books(cursor='', limit=1)['next_cursor']
+    
+    with pytest.raises(ValueError):
+        controller.get_all_books(cursor=cursor, limit=1, search='velvet')
+    
+    with pytest.raises(ValueError):
+        controller.get_all_books(cursor='not-a-cursor', limit=1)
+    
+    data_file.write_text(json.dumps(SAMPLE_BOOKS[::-1]), encoding='utf-8')
+    repository.reload()
+    monkeypatch.setattr(
+        repository, 'find_next', lambda query: pytest.fail('expired cursor reached find_next')
+    )
+    with pytest.raises(ValueError, match='expired'):
+        controller.get_all_books(cursor=cursor, limit=1)
+
+
+def test_result_cache_lru_and_ttl():
+    """Test LRU eviction, TTL expiry and version invalidation"""
+    now = [0.0]
+    cache = ResultCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    calls = []
+    
+    def compute(key):
+        def build():
+            calls.append(key)
+            return key
+        return cache.get_or_compute('v1', key, build)
+    
+    compute('a'), compute('b'), compute('a'), compute('c')  # 'b' is least recently used
+    compute('a')
+    compute('b')
+    assert calls == ['a', 'b', 'c', 'b']
+    
+    now[0] = 11
+    compute('b')
+    assert calls[-1] == 'b' and cache.expirations == 1
+    
+    cache.get_or_compute('v2', 'b', lambda: 'new')
+    stats = cache.stats()
+    counters = (stats['hits'], stats['evictions'], stats['invalidations'], stats['entries'])
+    assert counters == (2, 2, 1, 1)
+
+
+def test_controller_cache_follows_data_version(repository, data_file):
+    """Test cached responses are reused until the data changes"""
+    controller = BookController(repository)
+    
+    first = controller.get_all_books(page=1, limit=10)
+    assert controller.get_all_books(page=1, limit=10) is first
+    assert controller.get_statistics() is controller.get_statistics()
+    assert controller.cache_stats()['hits'] == 2
+    
+    data_file.write_text(json.dumps(SAMPLE_BOOKS[:1]), encoding='utf-8')
+    repository.reload()
+    assert controller.get_all_books(page=1, limit=10)['total'] == 1
+    assert controller.get_statistics()['total_books'] == 1
+    assert controller.cache_stats()['invalidations'] == 1
+
+
+def test_statistics_distributions(repository, sqlite_repository):
+    """Test price percentiles and rating distribution are served precomputed"""
+    stats = BookController(repository).get_statistics()
+    
+    assert stats['price'] == {
+        'min': 50.1, 'p25': 50.94, 'median': 51.77, 'p75': 52.76, 'p90': 53.35, 'max': 53.74
+    }
+    assert stats['ratings'] == {'1': 2, '3': 1}
+    assert BookController(sqlite_repository).get_statistics() == stats
+
+
+def test_encoded_statistics_reused(repository):
+    """Test parameterless reads are encoded once per data version"""
+    controller = BookController(repository)
+    
+    def encode(result):
+        return json.dumps(result).encode('utf-8')
+    
+    body = controller.get_encoded('stats', encode)
+    assert json.loads(body)['total_books'] == 3
+    assert controller.get_encoded('stats', encode) is body
+    
+    with pytest.raises(ValueError):
+        controller.get_encoded('books', encode)
+
+
+def test_range_filters(repository, sqlite_repository):
+    """Test price/rating/stock/availability filters through the sorted indexes"""
+    memory_controller = BookController(repository)
+    sqlite_controller = BookController(sqlite_repository)
+    cases = [
+        ({'price_min': 51, 'price_max': 53.74}, ['Tipping the Velvet', 'A Light in the Attic']),
+        ({'rating_min': 2}, ['A Light in the Attic']),
+        ({'in_stock': False}, ['Soumission']),
+        ({'availability_min': 21, 'in_stock': True}, ['A Light in the Attic']),
+        ({'price_max': 49}, [])
+    ]
+    
+    for filters, titles in cases:
+        result = memory_controller.search_books(**filters)
+        assert sorted(book['title'] for book in result['books']) == sorted(titles)
+        assert sqlite_controller.search_books(**filters) == result
+        assert memory_controller.get_all_books(search='t', **filters) == \
+            sqlite_controller.get_all_books(search='t', **filters)
+    
+    expected = [book['id'] for book in SAMPLE_BOOKS[:2]]
+    assert _walk_cursor(memory_controller, limit=1, in_stock=True) == expected
+    
+    with pytest.raises(ValueError):
+        memory_controller.search_books(price_min=10, price_max=5)
+
+
+def test_sorted_index_matches_scan(repository):
+    """Test index intersection returns the same positions as a full scan"""
+    columns = repository.snapshot().columns
+    ranges = {'price': (50.5, None), 'rating': (None, 1)}
+    expected = [
+        position for position, book in enumerate(SAMPLE_BOOKS)
+        if book['price'] >= 50.5 and book['rating'] <= 1
+    ]
+    
+    assert columns.range_candidates(ranges).tolist() == expected
+    assert columns.indexes['price'].count(51, 54) == 2
+
+
+def test_sorted_indexes_are_built_on_first_use(repository):
+    """Test loading a snapshot defers the sorted indexes and category postings"""
+    columns = repository.reload().columns
+    assert columns._postings is None
+    assert 'price' in columns.indexes and not columns.indexes._built
+    
+    assert columns.range_candidates({'price': (50.5, None)}).tolist() == [
+        position for position, book in enumerate(SAMPLE_BOOKS) if book['price'] >= 50.5
+    ]
+    assert list(columns.indexes._built) == ['price']
+    assert columns.category_size('poetry') == 1
+    assert columns._postings is not None
+
+
+@pytest.fixture
+def generated_repositories(tmp_path):
+    """In-memory and SQLite repositories over a larger generated catalog"""
+    rng = random.Random(7)
+    books = [
+        {
+            'id': f'book-{index}',
+            'title': f"{rng.choice(['Alpha', 'beta', 'Gamma', 'delta'])} {rng.randint(1, 50)}",
+            'author': rng.choice(['Ana', 'Bruno', 'Carla']),
+            'price': round(rng.uniform(10, 60), 2),
+            'rating': rng.randint(1, 5),
+            'in_stock': rng.random() < 0.7,
+            'availability': rng.randint(0, 30),
+            'category': rng.choice(['Poetry', 'Fiction', 'History', 'Travel'])
+        }
+        for index in range(600)
+    ]
+    path = tmp_path / 'generated.json'
+    path.write_text(json.dumps(books), encoding='utf-8')
+    return (
+        BookRepository(data_file=str(path)),
+        SqliteBookRepository(
+            database_url=f"sqlite:///{tmp_path / 'generated.db'}", data_file=str(path)
+        )
+    )
+
+
+@pytest.mark.parametrize('sort', ['price', '-price', 'rating', '-rating', 'title', '-title'])
+def test_sorted_queries_match_sqlite(generated_repositories, sort):
+    """Test every planner strategy returns the same pages as SQL ORDER BY"""
+    memory_repository, sqlite_repository = generated_repositories
+    memory_controller = BookController(memory_repository)
+    sqlite_controller = BookController(sqlite_repository)
+    cases = [
+        {},
+        {'category': 'poetry'},
+        {'price_min': 59.5},
+        {'search': 'a', 'in_stock': True},
+        {'rating_min': 2, 'availability_min': 3}
+    ]
+    
+    for filters in cases:
+        params = dict(filters, sort=sort)
+        if 'category' in params:
+            expected = sqlite_repository.find_page(BookQuery(limit=7, offset=14, **params))
+            assert memory_repository.find_page(BookQuery(limit=7, offset=14, **params)) == expected
+            continue
+        
+        for page in (1, 3):
+            assert memory_controller.get_all_books(page=page, limit=9, **params) == \
+                sqlite_controller.get_all_books(page=page, limit=9, **params)
+        
+        total = memory_controller.get_all_books(limit=100, **params)['total']
+        ids = _walk_cursor(memory_controller, limit=25, **params)
+        assert len(ids) == total
+        assert ids == _walk_cursor(sqlite_controller, limit=25, **params)
+
+
+def test_ranked_cursor_resumes_from_score_key(generated_repositories):
+    """Test ranked cursor pages follow the relevance order, resuming from [score, position]"""
+    for repository in generated_repositories:
+        controller = BookController(repository)
+        for params in ({'search': 'alpha ana'}, {'search': 'gamma', 'in_stock': True}):
+            ranked = dict(params, search_mode='ranked')
+            first = controller.get_all_books(limit=100, **ranked)
+            ids = _walk_cursor(controller, limit=7, **ranked)
+            assert len(ids) == first['total'] > 0 and len(set(ids)) == len(ids)
+            assert ids[:100] == [book['id'] for book in first['books']]
+        
+        ranked = {'limit': 7, 'search': 'alpha', 'search_mode': 'ranked'}
+        cursor = controller.get_all_books(cursor='', **ranked)['next_cursor']
+        with pytest.raises(ValueError):
+            controller.get_all_books(cursor=cursor, sort='price', **ranked)
+
+
+def test_query_planner_strategies(generated_repositories):
+    """Test the planner picks scans for dense filters and collection for selective ones"""
+    planner = generated_repositories[0].snapshot().planner
+    
+    def strategy(**params):
+        return planner.plan(BookQuery(**params), 0, 11).strategy
+    
+    assert strategy(sort='price') == QueryPlan.INDEX_SCAN
+    assert strategy(sort='price', in_stock=True) == QueryPlan.INDEX_SCAN
+    assert strategy(sort='price', price_min=59.9) == QueryPlan.SORT_MATCHES
+    assert planner.estimate(BookQuery(category='POETRY')) == \
+        generated_repositories[0].statistics()['category_counts']['Poetry']
+
+
+def test_category_posting_lists(generated_repositories):
+    """Test category lookups come from posting lists and match SQL"""
+    memory_repository, sqlite_repository = generated_repositories
+    columns = memory_repository.snapshot().columns
+    expected = [
+        position for position, book in enumerate(memory_repository.find_all())
+        if book['category'] == 'Travel'
+    ]
+    
+    assert columns.category_positions('TRAVEL').tolist() == expected
+    assert columns.category_size('travel') == len(expected)
+    assert columns.category_positions('Unknown').size == 0
+    
+    memory_controller = BookController(memory_repository)
+    sqlite_controller = BookController(sqlite_repository)
+    for params in ({'page': 2, 'limit': 7}, {'limit': 5, 'sort': '-price'}):
+        result = memory_controller.get_books_by_category('travel', **params)
+        assert result['category'] == 'Travel' and result['total'] == len(expected)
+        assert result == sqlite_controller.get_books_by_category('travel', **params)
+    
+    assert memory_controller.search_books(category='travel', price_min=30) == \
+        sqlite_controller.search_books(category='travel', price_min=30)
+    assert memory_controller.get_books_by_category('Unknown') == {'error': 'Category not found'}
+    with pytest.raises(ValueError):
+        memory_controller.get_books_by_category('travel', page=0)
+
+
+def test_category_postings_merge_spellings(tmp_path):
+    """Test spellings folding to the same name share one posting list"""
+    path = tmp_path / 'books.json'
+    path.write_text(json.dumps([
+        {'id': 'a', 'category': 'Poetry'},
+        {'id': 'b', 'category': 'Fiction'},
+        {'id': 'c', 'category': 'POETRY'}
+    ]), encoding='utf-8')
+    columns = BookRepository(data_file=str(path)).snapshot().columns
+    
+    assert columns.category_positions('poetry').tolist() == [0, 2]
+
+
+def test_records_carry_json_fragments(repository, sqlite_repository, tmp_path):
+    """Test every backend returns records with their compact JSON fragment"""
+    json_path = DataProcessor(output_dir=str(tmp_path)).save_to_json(SAMPLE_BOOKS, 'fragments')
+    binary_repository = BookRepository(data_file=json_path)
+    assert binary_repository.snapshot().source.endswith('fragments.bin')
+    
+    for backend in (repository, sqlite_repository, binary_repository):
+        books, _ = backend.find_page(BookQuery(limit=2))
+        assert all(isinstance(book, EncodedBook) for book in books)
+        assert [json.loads(book.fragment) for book in books] == books
+        assert backend.find_by_id(SAMPLE_BOOKS[0]['id']).fragment == encode_book(SAMPLE_BOOKS[0])
+
+
+def test_repositories_report_load_time(repository, sqlite_repository, data_file):
+    """Test loaded_at follows reloads and last_modified (Last-Modified header) the data file"""
+    for backend in (repository, sqlite_repository):
+        before = backend.loaded_at
+        assert before > 0
+        assert backend.last_modified == os.path.getmtime(data_file)
+        
+        books = json.loads(data_file.read_text(encoding='utf-8'))
+        data_file.write_text(json.dumps(books[:1]), encoding='utf-8')
+        os.utime(data_file, (1_600_000_000, 1_600_000_000))
+        backend.reload()
+        assert backend.loaded_at >= before
+        assert backend.last_modified == 1_600_000_000
+        data_file.write_text(json.dumps(books), encoding='utf-8')
+
+
+def test_export_streams_whole_catalog(generated_repositories, monkeypatch):
+    """Test NDJSON/CSV exports cover every book, in chunks, for both repositories"""
+    monkeypatch.setattr(book_export, 'FLUSH_SIZE', 1024)
+    memory_repository, sqlite_repository = generated_repositories
+    books = list(memory_repository.find_all())
+    
+    for backend in generated_repositories:
+        mimetype, chunks = BookController(backend).export_books('ndjson')
+        chunks = list(chunks)
+        assert mimetype == 'application/x-ndjson' and len(chunks) > 1
+        assert [json.loads(line) for line in b''.join(chunks).splitlines()] == books
+        
+        _, chunks = BookController(backend).export_books('csv', fields='id,price,title')
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        assert rows[0] == ['id', 'price', 'title']
+        assert rows[1:] == [[book['id'], str(book['price']), book['title']] for book in books]
+    
+    _, chunks = BookController(memory_repository).export_books('ndjson', fields='title')
+    compressed = b''.join(book_export.gzip_stream(chunks))
+    assert json.loads(gzip.decompress(compressed).splitlines()[-1]) == {'title': books[-1]['title']}
+    
+    for params in (('xml', None), ('csv', 'id,bad-field')):
+        with pytest.raises(ValueError):
+            BookController(memory_repository).export_books(*params)
+
+
+def test_batch_get_by_ids(repository, sqlite_repository):
+    """Test batch lookups return found books in order plus missing ids"""
+    ids = [SAMPLE_BOOKS[2]['id'], 'unknown', SAMPLE_BOOKS[0]['id'], SAMPLE_BOOKS[2]['id']]
+    
+    for backend in (repository, sqlite_repository):
+        result = BookController(backend).get_books_by_ids(ids)
+        expected = [SAMPLE_BOOKS[2]['id'], SAMPLE_BOOKS[0]['id']]
+        assert [book['id'] for book in result['books']] == expected
+        assert result['missing'] == ['unknown'] and result['total'] == 2
+    
+    controller = BookController(repository)
+    for invalid in ([], 'abc', [None], [True], ['x'] * (BookController.MAX_BATCH_IDS + 1)):
+        with pytest.raises(ValueError):
+            controller.get_books_by_ids(invalid)
+
+
+def test_sqlite_batch_lookup_in_chunks(sqlite_repository, monkeypatch):
+    """Test IN lookups are split when ids exceed the parameter limit"""
+    monkeypatch.setattr(SqliteBookRepository, 'MAX_PARAMETERS', 2)
+    ids = [book['id'] for book in reversed(SAMPLE_BOOKS)] + ['missing']
+    
+    books, missing = sqlite_repository.find_by_ids(ids)
+    assert [book['id'] for book in books] == ids[:-1]
+    assert missing == ['missing']
+
+
+def test_consistent_view_pins_loaded_data(repository, sqlite_repository, data_file):
+    """Test reads inside consistent_view ignore reloads published meanwhile"""
+    books = json.loads(data_file.read_text(encoding='utf-8'))
+    
+    for backend in (repository, sqlite_repository):
+        version, total = backend.version, backend.count()
+        with backend.consistent_view():
+            data_file.write_text(json.dumps(books[:1]), encoding='utf-8')
+            reloader = threading.Thread(target=backend.reload)
+            reloader.start()
+            reloader.join()
+            
+            with backend.consistent_view():
+                assert backend.count() == total
+            assert backend.version == version and len(backend.find_all()) == total
+        
+        assert backend.count() == 1 and backend.version != version
+        data_file.write_text(json.dumps(books), encoding='utf-8')
@@ -1,8 +1,140 @@
 """
 Tests for the scraper module
 """
+import time
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
+import requests
+from scraper.book_scraper import BookScraper
 from scraper.data_processor import DataProcessor
+from scraper.factory import create_book_scraper
+from scraper.adaptive_concurrency import AIMDConcurrency
+from scraper.async_http import AsyncHTTPClient, HTTPError
+from scraper.host_scheduler import HostScheduler, parse_retry_after
+from scraper.page_cache import PageCache
+
+BASE_URL = 'http://books.test'
+
+
+class FakeResponse:
+    """Minimal requests.Response stand-in"""
+    
+    def __init__(self, url, content, status_code=200, headers=None):
+        self.url = url
+        self.content = content.encode('utf-8')
+        self.status_code = status_code
+        self.headers = headers or {}
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for {self.url}")
+
+
+class FakeSite:
+    """In-process books site: listing pages of 3 books, detail pages served with latency"""
+    
+    def __init__(self, pages=2, latency=0.0, throttle=0, etags=False):
+        self.pages = pages
+        self.latency = latency
+        self.throttle = throttle  # Detail requests answered 429 (Retry-After: 1) first
+        self.etags = etags  # Send ETags and answer matching If-None-Match with 304
+        self.moved = {}  # Path -> absolute URL it redirects to (301)
+        self.requests = []
+        self.not_modified = 0
+        self.times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+    
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        with self._lock:
+            self.requests.append(url)
+            self.times.append(time.monotonic())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            throttled = self.throttle > 0 and '/catalogue/page-' not in url
+            if throttled:
+                self.throttle -= 1
+        try:
+            time.sleep(self.latency)
+            if throttled:
+                return FakeResponse(url, 'Too many requests', 429, {'Retry-After': '1'})
+            if url[len(BASE_URL):] in self.moved:
+                return FakeResponse(url, '', 301, {'Location': self.moved[url[len(BASE_URL):]]})
+            content, status = self._page(url)
+            if not self.etags or status != 200:
+                return FakeResponse(url, content, status)
+            etag = '"%s"' % hashlib.md5(content.encode('utf-8')).hexdigest()
+            if (headers or {}).get('If-None-Match') == etag:
+                with self._lock:
+                    self.not_modified += 1
+                return FakeResponse(url, '', 304, {'ETag': etag})
+            return FakeResponse(url, content, 200, {'ETag': etag})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+    
+    def _page(self, url):
+        path = url[len(BASE_URL):]
+        if path.startswith('/catalogue/page-'):
+            page = int(path[len('/catalogue/page-'):-len('.html')])
+            if page > self.pages:
+                return 'Not found', 404
+            return ''.join(
+                f'<article class="product_pod"><p class="star-rating Three"></p>'
+                f'<h3><a href="book-{number}/index.html" title="Book {number}">Book</a></h3>'
+                f'<p class="price_color">£{number}.50</p>'
+                f'<p class="instock availability">In stock</p></article>'
+                for number in range(page * 3 - 2, page * 3 + 1)
+            ), 200
+        number = path.split('/')[2].split('-')[1]
+        return (
+            f'<h1>Book {number}</h1><ul class="breadcrumb"><li><a>Home</a></li>'
+            f'<li><a>Books</a></li><li><a>Category {int(number) % 2}</a></li></ul>'
+            f'<table class="table-striped"><tr><th>UPC</th><td>upc-{number}</td></tr>'
+            f'<tr><th>Number of reviews</th><td>{number}</td></tr></table>'
+        ), 200
+
+
+@pytest.fixture
+def site_server():
+    """Serve a FakeSite over HTTP/1.1 on localhost (listing pages chunked, ETags)"""
+    site = FakeSite(pages=2, latency=0.02, etags=True)
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            etag = self.headers.get('If-None-Match')
+            response = site.get(BASE_URL + self.path, headers={'If-None-Match': etag})
+            self.send_response(response.status_code)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+            if response.status_code == 304:
+                self.end_headers()
+            elif self.path.startswith('/catalogue/page-'):
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                chunk = f"{len(response.content):x}\r\n".encode() + response.content
+                self.wfile.write(chunk + b"\r\n0\r\n\r\n")
+            else:
+                self.send_header('Content-Length', str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", site
+    server.shutdown()
+    server.server_close()
 
 
 def test_data_processor_initialization():
@@ -38,3 +170,258 @@ def test_generate_report():
     assert report['total_items'] == 2
     assert 'columns' in report
 
+
+def test_concurrent_details_match_serial_output():
+    """Test the worker pool fetches details concurrently with output identical to the serial path"""
+    results = []
+    for workers in (1, 4):
+        site = FakeSite(pages=2, latency=0.02)
+        scraper = BookScraper(base_url=BASE_URL, delay=0, workers=workers)
+        scraper.session = site
+        books = scraper.scrape(max_pages=3)
+        results.append(([{k: v for k, v in book.items() if k != 'id'} for book in books], site))
+    
+    (serial, serial_site), (concurrent, concurrent_site) = results
+    assert len(serial) == 6 and concurrent == serial
+    assert [book['upc'] for book in serial] == [f'upc-{number}' for number in range(1, 7)]
+    assert serial_site.max_in_flight == 1 and concurrent_site.max_in_flight > 1
+
+
+def test_async_http_encodes_request_target():
+    """Test scraped hrefs are percent-encoded and CR/LF cannot inject headers"""
+    request_lines = []
+    
+    async def handle(reader, writer):
+        request_lines.append((await reader.readuntil(b'\r\n')).decode('latin-1').rstrip())
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok')
+        await writer.drain()
+        writer.close()
+    
+    async def run():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        base = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        client = AsyncHTTPClient()
+        try:
+            response = await client.get(
+                f"{base}/catalogue/a book/caf\u00e9%20x.html?q=a b&x=\u00e9"
+            )
+            assert response.body == b'ok'
+            injections = (
+                (f"{base}/a\r\nX-Injected: 1", None),
+                (f"{base}/a", {'If-None-Match': '"x"\r\nX: 1'})
+            )
+            for url, headers in injections:
+                with pytest.raises(HTTPError):
+                    await client.get(url, headers)
+            injecting = AsyncHTTPClient(headers={'User-Agent': 'x\r\nX-Injected: 1'})
+            with pytest.raises(HTTPError):
+                await injecting.get(f"{base}/a")
+            await injecting.close()
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+    
+    asyncio.run(run())
+    assert request_lines == ['GET /catalogue/a%20book/caf%C3%A9%20x.html?q=a%20b&x=%C3%A9 HTTP/1.1']
+
+
+def _assert_within_limits(starts, ends, rate, burst, max_in_flight):
+    """Check request start times against a token bucket and an in-flight cap"""
+    origin = starts[0]
+    for index, start in enumerate(sorted(starts)):
+        assert index + 1 <= burst + (start - origin + 0.005) * rate  # 5ms for thread scheduling
+    for start in starts:
+        assert sum(1 for s, e in zip(starts, ends) if s <= start < e) <= max_in_flight
+
+
+def test_host_scheduler_token_bucket_for_threads_and_tasks():
+    """Test threads and asyncio tasks never exceed rate, burst or in-flight cap per host"""
+    rate, burst, max_in_flight = 50.0, 3, 2
+    
+    scheduler = HostScheduler(rate=rate, burst=burst, max_in_flight=max_in_flight)
+    starts, ends, lock = [], [], threading.Lock()
+    
+    def fetch():
+        with scheduler.request('http://a.test/page'):
+            started = time.monotonic()
+            time.sleep(0.01)
+            with lock:
+                starts.append(started)
+                ends.append(time.monotonic())
+    
+    threads = [threading.Thread(target=fetch) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    _assert_within_limits(starts, ends, rate, burst, max_in_flight)
+    stats = scheduler.stats()['a.test']
+    assert stats['requests'] == 12 and stats['in_flight'] == 0 and stats['waiting'] == 0
+    assert 0 < stats['achieved_rate'] <= rate
+    
+    scheduler = HostScheduler(rate=rate, burst=burst, max_in_flight=max_in_flight)
+    starts, ends = [], []
+    
+    async def fetch_async():
+        async with scheduler.request_async('http://b.test/page'):
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            starts.append(started)
+            ends.append(time.monotonic())
+    
+    async def run():
+        await asyncio.gather(*(fetch_async() for _ in range(12)))
+    
+    asyncio.run(run())
+    _assert_within_limits(starts, ends, rate, burst, max_in_flight)
+    assert scheduler.stats()['b.test']['requests'] == 12
+    assert HostScheduler.from_delay(0).rate == 0 and HostScheduler.from_delay(0.5).rate == 2.0
+
+
+def test_asyncio_engine_matches_threads_engine(site_server):
+    """Test the asyncio engine scrapes the same books as the requests engine, concurrently"""
+    url, site = site_server
+    results = {}
+    for engine in ('threads', 'asyncio'):
+        site.max_in_flight = 0
+        scraper = create_book_scraper(engine, base_url=url, delay=0, workers=6)
+        books = scraper.scrape(max_pages=3)
+        scraper.close()
+        results[engine] = [{k: v for k, v in book.items() if k != 'id'} for book in books]
+    
+    assert len(results['threads']) == 6 and results['asyncio'] == results['threads']
+    assert results['asyncio'][0]['url'] == f"{url}/catalogue/book-1/index.html"
+    assert site.max_in_flight > 1
+    with pytest.raises(ValueError):
+        create_book_scraper('curl')
+
+
+def test_asyncio_engine_schedules_each_redirect_hop_by_host(site_server):
+    """Test a cross-host redirect is followed in a scheduler slot of the target host"""
+    url, site = site_server
+    port = url.rsplit(':', 1)[1]
+    target = f"http://localhost:{port}/catalogue/book-1/moved.html"
+    site.moved['/catalogue/book-1/index.html'] = target
+    scheduler = HostScheduler(rate=0)
+    scraper = create_book_scraper('asyncio', base_url=url, delay=0, workers=4, scheduler=scheduler)
+    books = scraper.scrape(max_pages=1)
+    scraper.close()
+    
+    assert [book['upc'] for book in books] == ['upc-1', 'upc-2', 'upc-3']
+    stats = scheduler.stats()
+    assert stats[f"127.0.0.1:{port}"]['requests'] == 4
+    assert stats[f"localhost:{port}"]['requests'] == 1
+
+
+def test_aimd_concurrency_grows_and_backs_off():
+    """Test AIMD slow start, one cut per overload episode, additive increase and latency spikes"""
+    limit = AIMDConcurrency(min_limit=2, max_limit=10, min_samples=3)
+    for now in range(5):
+        limit.on_success(started=now, latency=0.1, now=now + 0.1)
+    assert limit.current == 7 and limit.slow_start
+    
+    limit.on_overload(started=5, now=6)
+    limit.on_overload(started=5.5, now=6.1)  # Sent before the cut: same episode
+    limit.on_success(started=5.9, latency=0.1, now=6.2)
+    assert limit.current == 3 and limit.decreases == 1 and not limit.slow_start
+    
+    for now in range(7, 13):
+        limit.on_success(started=now, latency=0.1, now=now + 0.1)
+    assert limit.current == 4  # +1 per round trip (about `limit` responses)
+    
+    limit.on_success(started=13, latency=0.5, now=13.5)  # Latency spike
+    assert limit.current == 2 and limit.decreases == 2
+    limit.on_overload(started=14, now=15)
+    assert limit.current == 2 and limit.stats()['min'] == 2
+    
+    limit = AIMDConcurrency(min_limit=1, max_limit=3)
+    for now in range(10):
+        limit.on_success(started=now, latency=0.1, now=now + 0.1)
+    assert limit.current == 3
+
+
+def test_throttled_requests_honor_retry_after():
+    """Test a 429 pauses the host for its Retry-After, is retried and cuts the concurrency"""
+    site = FakeSite(pages=1, throttle=1)
+    scheduler = HostScheduler(rate=0, adaptive=(1, 4))
+    scraper = BookScraper(base_url=BASE_URL, delay=0, workers=4, scheduler=scheduler)
+    scraper.session.get = site.get
+    books = scraper.scrape(max_pages=1)
+    scraper.close()
+    
+    assert [book['upc'] for book in books] == ['upc-1', 'upc-2', 'upc-3']
+    throttled = site.requests[1]  # First detail request
+    assert len(site.requests) == 5 and site.requests.count(throttled) == 2
+    retried = site.requests.index(throttled, 2)
+    assert site.times[retried] - site.times[1] >= 0.99  # Retried after the Retry-After pause
+    stats = scheduler.stats()['books.test']
+    assert stats['throttled'] == 1 and stats['concurrency']['decreases'] == 1
+    assert 1 <= stats['concurrency']['limit'] <= 4
+    
+    assert parse_retry_after('120') == 120.0 and parse_retry_after('999999') == 300.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None and parse_retry_after(None) is None
+
+
+def test_page_cache_revalidates_unchanged_pages(tmp_path, site_server):
+    """Test both engines send the stored ETag and reuse the cached body on 304"""
+    url, site = site_server
+    results = []
+    for engine in ('threads', 'asyncio', 'threads'):
+        cache = PageCache(str(tmp_path / 'pages.sqlite3'))
+        scraper = create_book_scraper(engine, base_url=url, delay=0, workers=4, cache=cache)
+        books = scraper.scrape(max_pages=3)
+        scraper.close()
+        books = [{k: v for k, v in book.items() if k != 'id'} for book in books]
+        results.append((books, cache.stats()))
+        cache.close()
+    
+    (first, cold), (second, warm_async), (third, warm) = results
+    assert len(first) == 6 and second == first and third == first
+    assert cold['hits'] == 0 and cold['misses'] == 8 and cold['entries'] == 8
+    assert warm_async['hits'] == 8 and warm_async['misses'] == 0
+    assert warm['hits'] == 8 and warm['hit_ratio'] == 1.0 and site.not_modified == 16
+
+
+def test_page_cache_validators_not_sent_across_redirects(tmp_path, site_server):
+    """Test cached validators only go to their own URL, never to the target of a redirect"""
+    url, site = site_server
+    moved = '/catalogue/book-1/moved.html'
+    site.moved['/catalogue/book-1/index.html'] = url + moved
+    content, _ = site._page(BASE_URL + moved)
+    etag = '"%s"' % hashlib.md5(content.encode('utf-8')).hexdigest()
+    for engine in ('threads', 'asyncio'):
+        cache = PageCache(str(tmp_path / f"{engine}.sqlite3"))
+        # Stale copy of the redirecting URL, with an ETag that happens to match the target's
+        cache.store(f"{url}/catalogue/book-1/index.html", b'<h1>Stale</h1>', etag, None)
+        for _ in range(2):
+            scraper = create_book_scraper(engine, base_url=url, delay=0, workers=4, cache=cache)
+            books = scraper.scrape(max_pages=1)
+            scraper.close()
+            assert [book['upc'] for book in books] == ['upc-1', 'upc-2', 'upc-3']
+        assert cache.get(url + moved).body == content.encode('utf-8')
+        cache.close()
+    
+    # Only the second scrape of each engine revalidates (listing, moved page, books 2 and 3)
+    assert site.not_modified == 8
+
+
+def test_page_cache_evicts_least_recently_used(tmp_path):
+    """Test the page cache stays under max_bytes, evicting the least recently used pages"""
+    cache = PageCache(str(tmp_path / 'pages.sqlite3'), max_bytes=250)
+    for name in ('a', 'b'):
+        cache.store(f'{BASE_URL}/{name}', b'x' * 100, etag=f'"{name}"')
+    cache.store(f'{BASE_URL}/no-validators', b'x' * 10)
+    assert cache.revalidated(cache.get(f'{BASE_URL}/a')) == b'x' * 100
+    assert cache.get(f'{BASE_URL}/a').validators() == {'If-None-Match': '"a"'}
+    
+    cache.store(f'{BASE_URL}/c', b'y' * 100, last_modified='Wed, 21 Oct 2015 07:28:00 GMT')
+    assert cache.get(f'{BASE_URL}/b') is None and cache.get(f'{BASE_URL}/no-validators') is None
+    validators = cache.get(f'{BASE_URL}/c').validators()
+    assert validators == {'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['bytes'] == 200 and stats['evictions'] == 1
+    assert stats['hits'] == 1 and stats['misses'] == 4
+    cache.close()
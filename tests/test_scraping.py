@@ -4,6 +4,13 @@ Tests for scraping endpoints
 import pytest
 import json
 from api.app import create_app
+from api.controllers.scraping_controller import ScrapingController
+
+
+@pytest.fixture(autouse=True)
+def page_cache_path(tmp_path, monkeypatch):
+    """Keep the page cache of jobs started with cache: true out of the working tree"""
+    monkeypatch.setattr(ScrapingController, 'PAGE_CACHE_PATH', str(tmp_path / 'pages.sqlite3'))
 
 
 @pytest.fixture
@@ -104,6 +111,24 @@ def test_trigger_scraping_invalid_params(client, admin_token):
     assert response.status_code == 400
 
 
+def test_trigger_scraping_invalid_engine_options(client, admin_token):
+    """Test engine and concurrency parameters are validated per engine"""
+    invalid = (
+        {'engine': 'curl'}, {'workers': 64}, {'engine': 'asyncio', 'workers': 1000}, {'delay': -1},
+        {'adaptive': 'yes'}, {'workers': 4, 'min_concurrency': 5},
+        {'workers': 4, 'min_concurrency': 2, 'max_concurrency': 1},
+        {'cache': 'no'}
+    )
+    for params in invalid:
+        response = client.post(
+            '/api/v1/scraping/trigger',
+            data=json.dumps(params),
+            content_type='application/json',
+            headers={'Authorization': f'Bearer {admin_token}'}
+        )
+        assert response.status_code == 400
+
+
 def test_list_jobs_as_admin(client, admin_token):
     """Test listing scraping jobs as admin"""
     response = client.get(
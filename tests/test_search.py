@@ -0,0 +1,123 @@
+"""
+Tests for the full-text search index and ranked search mode
+"""
+import json
+import pytest
+from api.search import SearchIndex, fold, tokenize
+from api.repositories.book_repository import BookRepository
+from api.repositories.sqlite_book_repository import SqliteBookRepository
+from api.controllers.book_controller import BookController
+
+
+SEARCH_BOOKS = [
+    {
+        'id': 'a1',
+        'title': 'Dom Casmurro',
+        'author': 'Machado de Assis',
+        'description': 'Bentinho e Capitu, um romance sobre ciúme.',
+        'category': 'Fiction'
+    },
+    {
+        'id': 'a2',
+        'title': 'Memórias Póstumas de Brás Cubas',
+        'author': 'Machado de Assis',
+        'description': 'Um defunto autor narra a própria vida.',
+        'category': 'Fiction'
+    },
+    {
+        'id': 'a3',
+        'title': 'Coração Valente',
+        'author': 'Randall Wallace',
+        'description': 'A história de William Wallace e do coração da Escócia.',
+        'category': 'History'
+    },
+    {
+        'id': 'a4',
+        'title': 'Learning Python',
+        'author': 'Mark Lutz',
+        'description': 'A romance with the Python language.',
+        'category': 'Technology'
+    }
+]
+
+
+def test_tokenize_folds_case_and_accents():
+    """Test tokens are case- and accent-folded"""
+    assert fold('Ação CORAÇÃO') == 'acao coracao'
+    assert tokenize('Memórias Póstumas, de Brás-Cubas!') == [
+        'memorias', 'postumas', 'de', 'bras', 'cubas'
+    ]
+    assert tokenize('') == []
+
+
+def test_search_index_accents_prefix_and_all_tokens():
+    """Test accent-insensitive, prefix and AND matching"""
+    index = SearchIndex(SEARCH_BOOKS)
+    
+    assert index.search('coracao')[0].tolist() == [2]
+    assert index.search('memorias postu')[0].tolist() == [1]  # Last token is a prefix
+    assert index.search('machado python')[0].size == 0
+    assert index.search('   ')[0].size == 0
+
+
+def test_search_index_ranking():
+    """Test title matches outrank description matches"""
+    index = SearchIndex(SEARCH_BOOKS)
+    positions, scores = index.search('romance')
+    
+    assert sorted(positions.tolist()) == [0, 3]
+    assert list(scores) == sorted(scores, reverse=True)
+    
+    positions, _ = index.search('python')
+    assert positions.tolist() == [3]
+    
+    positions, _ = index.search('wallace')
+    assert positions.tolist() == [2]
+
+
+@pytest.fixture
+def search_file(tmp_path):
+    """Write search books to a temporary JSON file"""
+    path = tmp_path / 'books.json'
+    path.write_text(json.dumps(SEARCH_BOOKS), encoding='utf-8')
+    return path
+
+
+def test_ranked_search_mode(search_file, tmp_path):
+    """Test ranked mode in the controller, for both repositories"""
+    memory_controller = BookController(BookRepository(data_file=str(search_file)))
+    sqlite_controller = BookController(SqliteBookRepository(
+        database_url=f"sqlite:///{tmp_path / 'books.db'}",
+        data_file=str(search_file)
+    ))
+    
+    for controller in (memory_controller, sqlite_controller):
+        result = controller.get_all_books(search='assis', search_mode='ranked')
+        assert result['total'] == 2
+        
+        result = controller.get_all_books(search='historia escoc', search_mode='ranked')
+        assert [book['id'] for book in result['books']] == ['a3']
+        
+        result = controller.get_all_books(search='capitu', search_mode='ranked', limit=1, page=2)
+        assert result['total'] == 1 and result['books'] == []
+    
+    assert memory_controller.get_all_books(search='machado', search_mode='ranked') == \
+        sqlite_controller.get_all_books(search='machado', search_mode='ranked')
+    
+    with pytest.raises(ValueError):
+        memory_controller.get_all_books(search='x', search_mode='fuzzy')
+
+
+def test_ranked_search_cursor(search_file):
+    """Test keyset pages follow the ranking"""
+    controller = BookController(BookRepository(data_file=str(search_file)))
+    result = controller.get_all_books(search='a', search_mode='ranked')
+    ranked = [book['id'] for book in result['books']]
+    
+    ids, cursor = [], ''
+    while cursor is not None:
+        result = controller.get_all_books(search='a', search_mode='ranked', limit=1, cursor=cursor)
+        ids.extend(book['id'] for book in result['books'])
+        cursor = result['next_cursor']
+    
+    assert ids == ranked